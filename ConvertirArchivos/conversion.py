@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Conversión incremental de archivos .txt a .dzn
+Solo regenera los .dzn cuyo archivo de origen cambió, según un manifiesto con
+la fecha de modificación, el tamaño y el hash del contenido de cada .txt.
+Los archivos modificados se convierten en paralelo y cada .dzn se escribe en
+un temporal que luego se renombra, así nunca queda un archivo a medio escribir.
+
+Con binary, junto a cada .dzn se escribe también el .mxb (formato binario de
+instance.py), que la interfaz y los motores en Python leen sin parsear texto.
+
+Uso:
+  python ConvertirArchivos/conversion.py
+  python ConvertirArchivos/conversion.py --sources DatosProyecto --workers 4 --force
+  python ConvertirArchivos/conversion.py --binary
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+try:
+  from utils import parse_data_file, generate_dzn_file
+except ImportError:
+  # Importado desde ProyectoGUIFuentes (p. ej. cli.py), donde "utils" es el de
+  # la interfaz: las mismas funciones salen directamente de Instance
+  from instance import Instance
+
+  parse_data_file = Instance.from_txt
+
+  def generate_dzn_file(data, output_path):
+    """Genera un archivo .dzn a partir de los datos parseados (dict o Instance)"""
+    Instance.from_data(data).write_dzn(output_path)
+
+# Se incrementa si cambia el formato de los .dzn generados: obliga a reconvertir
+CONVERTER_VERSION = 1
+
+# Manifiesto guardado en el directorio de salida (oculto: no es un .dzn)
+MANIFEST_NAME = ".manifest.json"
+
+def file_hash(path):
+  """
+  Returns: hash SHA-256 hexadecimal del contenido del archivo
+  """
+  digest = hashlib.sha256()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(1 << 20), b''):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+def write_atomic(path, write):
+  """
+  Escribe un archivo a través de un temporal en el mismo directorio
+  write: función que recibe la ruta temporal y escribe el contenido
+  """
+  path = Path(path)
+  fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+  os.close(fd)
+  try:
+    write(tmp_path)
+    os.replace(tmp_path, path)
+  finally:
+    if os.path.exists(tmp_path):
+      os.remove(tmp_path)
+
+def load_manifest(dzn_dir):
+  """
+  Returns: dict {manifest_key: entrada}; vacío si no existe o es de otra versión
+  """
+  try:
+    with open(Path(dzn_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+      manifest = json.load(f)
+  except (OSError, ValueError):
+    return {}
+  if manifest.get('version') != CONVERTER_VERSION:
+    return {}
+  return manifest.get('files', {})
+
+def save_manifest(dzn_dir, files):
+  """
+  Guarda el manifiesto de forma atómica
+  """
+  def write(tmp_path):
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+      json.dump({'version': CONVERTER_VERSION, 'files': files}, f, indent=2, sort_keys=True)
+  write_atomic(Path(dzn_dir) / MANIFEST_NAME, write)
+
+def manifest_key(txt_file, dzn_dir):
+  """
+  Clave de un .txt en el manifiesto: ruta relativa al directorio padre de
+  dzn_dir (el proyecto), para que el manifiesto no dependa de dónde se clone
+  """
+  txt_file = Path(txt_file).resolve()
+  try:
+    return txt_file.relative_to(Path(dzn_dir).resolve().parent).as_posix()
+  except ValueError:
+    return txt_file.as_posix()
+
+def find_sources(source_dirs):
+  """
+  Returns: lista de Path de los .txt de los directorios que existen
+  """
+  sources = []
+  for source_dir in source_dirs:
+    if Path(source_dir).exists():
+      sources.extend(sorted(Path(source_dir).glob("*.txt")))
+  return sources
+
+def binary_file(dzn_file):
+  """Returns: Path del .mxb que acompaña al .dzn"""
+  return Path(dzn_file).with_suffix(".mxb")
+
+def convert_file(txt_file, dzn_file, known_hash=None, binary=False):
+  """
+  Convierte un .txt si su contenido no coincide con known_hash
+  (se ejecuta dentro de un proceso del pool)
+  binary: escribir también el .mxb junto al .dzn
+  Returns: dict con archivo, salida, estado ('convertido', 'sin cambios' o
+           'error'), error, hash, mtime_ns, size y tiempo
+  """
+  start_time = time.time()
+  stat = os.stat(txt_file)
+  result = {'archivo': str(txt_file), 'salida': str(dzn_file), 'error': None,
+            'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+  try:
+    result['hash'] = file_hash(txt_file)
+    if result['hash'] == known_hash and os.path.exists(dzn_file) and \
+       not (binary and not binary_file(dzn_file).exists()):
+      # Solo cambió la fecha (p. ej. al copiar el archivo): no se reconvierte
+      result['estado'] = 'sin cambios'
+    else:
+      data = parse_data_file(txt_file)
+      write_atomic(dzn_file, lambda tmp_path: generate_dzn_file(data, tmp_path))
+      if binary:
+        # Después del .dzn, para que el binario nunca quede más viejo que él
+        write_atomic(binary_file(dzn_file), data.write_binary)
+      result['estado'] = 'convertido'
+  except Exception as e:
+    result.update({'estado': 'error', 'error': str(e)})
+  result['tiempo'] = round(time.time() - start_time, 3)
+  return result
+
+def convert_all(source_dirs, dzn_dir, workers=None, force=False, on_result=None, binary=False):
+  """
+  Convierte los .txt nuevos o modificados de source_dirs a dzn_dir
+  workers: tamaño del pool de procesos (por defecto, número de núcleos)
+  force: reconvertir todo sin consultar el manifiesto
+  binary: escribir también el .mxb de cada .dzn (se regenera si falta)
+  on_result: callback opcional llamado con cada resultado
+  Returns: lista de resultados (ver convert_file), uno por archivo de origen
+  """
+  dzn_dir = Path(dzn_dir)
+  dzn_dir.mkdir(parents=True, exist_ok=True)
+  manifest = {} if force else load_manifest(dzn_dir)
+  sources = find_sources(source_dirs)
+
+  results = []
+  pending = []
+  for txt_file in sources:
+    dzn_file = dzn_dir / f"{txt_file.stem}.dzn"
+    entry = manifest.get(manifest_key(txt_file, dzn_dir))
+    stat = txt_file.stat()
+    if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size \
+       and entry['salida'] == dzn_file.name and dzn_file.exists() \
+       and not (binary and not binary_file(dzn_file).exists()):
+      result = dict(entry, archivo=str(txt_file), salida=str(dzn_file),
+                    estado='sin cambios', error=None, tiempo=0.0)
+      results.append(result)
+      if on_result:
+        on_result(result)
+    else:
+      pending.append((txt_file, dzn_file, entry['hash'] if entry else None))
+
+  if pending:
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+      futures = [executor.submit(convert_file, txt_file, dzn_file, known_hash, binary)
+                 for txt_file, dzn_file, known_hash in pending]
+      for future in as_completed(futures):
+        result = future.result()
+        results.append(result)
+        if on_result:
+          on_result(result)
+
+  # Solo quedan en el manifiesto los archivos existentes convertidos sin error
+  files = {}
+  for result in results:
+    if result['estado'] != 'error':
+      files[manifest_key(result['archivo'], dzn_dir)] = {
+        'salida': Path(result['salida']).name,
+        'hash': result['hash'],
+        'mtime_ns': result['mtime_ns'],
+        'size': result['size']
+      }
+  save_manifest(dzn_dir, files)
+
+  order = {str(path): index for index, path in enumerate(sources)}
+  results.sort(key=lambda result: order[result['archivo']])
+  return results
+
+def main(argv=None):
+  """Función principal"""
+  project_dir = Path(__file__).resolve().parent.parent
+  parser = argparse.ArgumentParser(description="Convierte de forma incremental los .txt de MinExt a .dzn")
+  parser.add_argument('--sources', nargs='+', type=Path,
+                      default=[project_dir / "DatosProyecto", project_dir / "MisInstancias"],
+                      help="Directorios con archivos .txt")
+  parser.add_argument('--output-dir', type=Path, default=project_dir / "DatosDZN",
+                      help="Directorio de los .dzn generados")
+  parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                      help="Procesos en paralelo (por defecto, número de núcleos)")
+  parser.add_argument('--force', action='store_true',
+                      help="Reconvertir todos los archivos aunque no hayan cambiado")
+  parser.add_argument('--binary', action='store_true',
+                      help="Escribir también el .mxb (formato binario) junto a cada .dzn")
+  args = parser.parse_args(argv)
+
+  def report(result):
+    line = f"  {Path(result['archivo']).name:<40} {result['estado']}"
+    if result['error']:
+      line += f": {result['error']}"
+    print(line)
+
+  start_time = time.time()
+  results = convert_all(args.sources, args.output_dir, args.workers, args.force, on_result=report,
+                        binary=args.binary)
+  if not results:
+    print("No se encontraron archivos .txt", file=sys.stderr)
+    return 1
+
+  counts = {state: sum(result['estado'] == state for result in results)
+            for state in ('convertido', 'sin cambios', 'error')}
+  print(f"{counts['convertido']} convertidos, {counts['sin cambios']} sin cambios, "
+        f"{counts['error']} con errores en {time.time() - start_time:.2f}s")
+  return 1 if counts['error'] else 0
+
+if __name__ == "__main__":
+  sys.exit(main())
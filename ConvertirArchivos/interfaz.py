@@ -12,8 +12,8 @@ import sys
 from pathlib import Path
 import threading
 
-# Importar las funciones del generador principal
-from utils import parse_data_file, generate_dzn_file
+# Importar las funciones de conversión incremental
+from conversion import convert_all, find_sources
 
 class GeneradorDZNGUI:
   def __init__(self, root):
@@ -105,13 +105,11 @@ class GeneradorDZNGUI:
     self.progress.start()
     
     try:
-      all_txt_files = []
-      for source_dir in self.source_dirs:
-        if source_dir.exists():
-          all_txt_files.extend(list(source_dir.glob("*.txt")))
-        else:
-          self.log_message(f"⚠️  Advertencia: El directorio {source_dir} no existe y será omitido.")
+      missing_dirs = [source_dir for source_dir in self.source_dirs if not source_dir.exists()]
+      for source_dir in missing_dirs:
+        self.log_message(f"⚠️  Advertencia: El directorio {source_dir} no existe y será omitido.")
 
+      all_txt_files = find_sources(self.source_dirs)
       if not all_txt_files:
         self.log_message("❌ No se encontraron archivos .txt en los directorios de origen.")
         return
@@ -119,33 +117,28 @@ class GeneradorDZNGUI:
       self.log_message(f"🚀 Iniciando procesamiento de {len(all_txt_files)} archivos...")
       self.log_message("")
       
-      success_count = 0
-      error_count = 0
+      # Solo se convierten (en paralelo) los archivos que cambiaron desde la última vez
+      def log_result(result):
+        name = Path(result['archivo']).name
+        if result['estado'] == 'convertido':
+          self.log_message(f"📝 {name}  ✅ Generado: {Path(result['salida']).name}")
+        elif result['estado'] == 'sin cambios':
+          self.log_message(f"📝 {name}  ⏭️  Sin cambios")
+        else:
+          self.log_message(f"📝 {name}  ❌ Error: {result['error']}")
+      
+      results = convert_all(self.source_dirs, self.dzn_dir, on_result=log_result)
+      self.log_message("")
       
-      for txt_file in all_txt_files:
-        try:
-          self.log_message(f"📝 Procesando: {txt_file.name}")
-          
-          # Parsear datos del archivo
-          data = parse_data_file(txt_file)
-          
-          # Generar archivo .dzn
-          dzn_file = self.dzn_dir / f"{txt_file.stem}.dzn"
-          generate_dzn_file(data, dzn_file)
-          
-          self.log_message(f"   ✅ Generado: {dzn_file.name}")
-          success_count += 1
-          
-        except Exception as e:
-          self.log_message(f"   ❌ Error: {str(e)}")
-          error_count += 1
-        
-        self.log_message("")
+      success_count = sum(result['estado'] == 'convertido' for result in results)
+      unchanged_count = sum(result['estado'] == 'sin cambios' for result in results)
+      error_count = sum(result['estado'] == 'error' for result in results)
       
       # Resumen final
       self.log_message("=" * 50)
       self.log_message(f"✅ Procesamiento completado:")
       self.log_message(f"   - Archivos procesados exitosamente: {success_count}")
+      self.log_message(f"   - Archivos sin cambios (omitidos): {unchanged_count}")
       if error_count > 0:
         self.log_message(f"   - Archivos con errores: {error_count}")
       else:
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ejecución por lotes de MinExt (sin interfaz gráfica)
+Resuelve todas las instancias .dzn de DatosDZN/ y MisInstancias/ repartiendo
+las ejecuciones en un pool de procesos y escribe una fila CSV/JSON por instancia.
+
+Uso:
+  python ProyectoGUIFuentes/batch.py --output resultados.csv
+  python ProyectoGUIFuentes/batch.py --backend native --workers 4 --output resultados.json
+  python ProyectoGUIFuentes/batch.py --backend portfolio --workers 2
+  python ProyectoGUIFuentes/batch.py --gap 0.01 --output resultados.json
+  python ProyectoGUIFuentes/batch.py --backend heuristic --time-limit 1
+  python ProyectoGUIFuentes/batch.py --backend lagrangian --output resultados.csv
+  python ProyectoGUIFuentes/batch.py --backend dp --time-limit 30
+  python ProyectoGUIFuentes/batch.py --warm-start --time-limit 30
+  python ProyectoGUIFuentes/batch.py --presolve --output resultados.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from pathlib import Path
+
+from utils import get_project_paths, build_minizinc_command, release_minizinc_command, get_solution_status
+from utils import PROCESS_MARGIN, natural_sort_key, write_results
+from fzn_cache import FlatZincCache
+from jobs import JobManager, TIMEOUT, run_command
+
+# Motores disponibles por línea de comandos
+BACKENDS = ['minizinc', 'native', 'portfolio', 'heuristic', 'lagrangian', 'dp']
+
+# Columnas del reporte, en orden
+FIELDS = ['instancia', 'archivo', 'motor', 'estado', 'codigo_salida',
+          'extremismo_total', 'cota_inferior', 'gap', 'costo_usado', 'costo_limite',
+          'movimientos_usados', 'movimientos_limite', 'num_movimientos_activos',
+          'verificacion', 'tiempo', 'error']
+
+def find_instances(directories):
+  """
+  Busca los archivos .dzn de los directorios indicados
+  Returns: lista de Path ordenada de forma natural
+  """
+  instances = []
+  for directory in directories:
+    if directory.exists():
+      instances.extend(sorted(directory.glob("*.dzn"), key=natural_sort_key))
+  return instances
+
+def solve_instance(dzn_file, backend, model_file, time_limit, deadline=None, cache_dir=None,
+                   gap=None, warm_start=False, keep_solution=False, presolve=False):
+  """
+  Resuelve una instancia (se ejecuta dentro de un proceso del pool)
+  time_limit: segundos para esta instancia
+  deadline: time.time() límite del lote completo (None = sin límite)
+  cache_dir: directorio de la caché de FlatZinc (None = compilar siempre)
+  gap: gap relativo respecto a la cota inferior con el que se detiene la búsqueda
+  warm_start: arrancar con la solución de la heurística voraz
+  keep_solution: agregar la columna solucion (movimientos dispersos, ver Solution.to_dict)
+  presolve: con minizinc, resolver la instancia reducida (presolve.py) con
+            ProyectoReducido.mzn en lugar de model_file
+  Returns: dict con una fila del reporte
+  """
+  dzn_file = Path(dzn_file)
+  row = dict.fromkeys(FIELDS)
+  row.update({'instancia': dzn_file.stem, 'archivo': str(dzn_file), 'motor': backend})
+
+  # El límite de cada instancia nunca supera lo que queda del lote
+  if deadline is not None:
+    time_limit = min(time_limit, deadline - time.time())
+  if time_limit <= 0:
+    row.update({'estado': 'TIMEOUT', 'tiempo': 0.0, 'error': 'Sin tiempo restante en el lote'})
+    return row
+
+  start_time = time.time()
+  try:
+    from utils import parse_dzn_file
+    from bounds import lower_bound, optimality_gap, gap_reached
+    from solution import Solution, read_solution, empty_metrics
+
+    data = parse_dzn_file(dzn_file)
+    lower = lower_bound(data)['cota_inferior']
+
+    # Arranque con la heurística: incumbente del nativo o cota para MiniZinc
+    warm = None
+    if warm_start and backend in ('minizinc', 'native'):
+      import heuristic
+
+      warm = heuristic.solve(data, time_limit=min(heuristic.SEARCH_TIME, time_limit))
+
+    reduction = None
+    if presolve and backend == 'minizinc':
+      from presolve import presolve as reduce_instance
+
+      reduction = reduce_instance(data)
+
+    if backend == 'heuristic':
+      import heuristic
+
+      result = heuristic.solve(data, time_limit=time_limit)
+      solution = Solution.from_result(result)
+      row.update({'estado': result['status'], 'codigo_salida': 0})
+    elif backend == 'lagrangian':
+      import flow_solver
+
+      result = flow_solver.solve(data)
+      solution = Solution.from_result(result)
+      row.update({'estado': result['status'], 'codigo_salida': 0})
+      lower = max(lower, result['bound'])
+    elif backend == 'dp':
+      import dp_solver
+
+      result = dp_solver.solve(data, time_limit=time_limit)
+      solution = Solution.from_result(result)
+      row.update({'estado': result['status'], 'codigo_salida': 0})
+      if result['fallback']:
+        row['motor'] = 'dp/flujo'
+      lower = max(lower, result['bound'])
+    elif backend == 'native':
+      import native_solver
+
+      result = native_solver.solve(data, time_limit=time_limit, gap=gap,
+                                   initial=warm['x'] if warm else None)
+      solution = Solution.from_result(result)
+      row.update({'estado': result['status'], 'codigo_salida': 0})
+      lower = max(lower, result['bound'])
+    elif backend == 'portfolio':
+      from portfolio import run_portfolio
+
+      cache = FlatZincCache(cache_dir) if cache_dir else None
+      result = run_portfolio(dzn_file, time_limit=time_limit, cache=cache, gap=gap, lower=lower,
+                             warm_start=warm_start)
+      solution = result['solution']
+      row.update({'estado': result['status'], 'codigo_salida': 0 if result['best'] else 1,
+                  'motor': f"portfolio/{result['winner'] or '-'}"})
+      errors = [f"{name}: {racer['error']}" for name, racer in result['racers'].items() if racer['error']]
+      if errors:
+        row['error'] = '; '.join(errors)
+    elif reduction is not None and reduction.m == 0:
+      # Ningún movimiento mejora el extremismo: no hace falta MiniZinc
+      solution = reduction.trivial_solution()
+      row.update({'estado': solution.status, 'codigo_salida': 0})
+    else:
+      cache = FlatZincCache(cache_dir) if cache_dir else None
+      extra_models = [heuristic.write_bound_model(warm['extremismo_total'])] if warm else []
+      temp_files = list(extra_models)
+      if reduction is not None:
+        model_file, dzn_file = get_project_paths()['reduced_model'], reduction.write_dzn()
+        temp_files.append(dzn_file)
+      try:
+        if gap is not None:
+          # Con gap se siguen las soluciones intermedias para cortar a tiempo; como
+          # trabajo del gestor, al cortar o al agotar el margen se termina el
+          # grupo de procesos (los temporales se borran abajo)
+          jobs = JobManager(max_concurrent=1)
+          try:
+            job = jobs.submit_minizinc(
+              model_file, dzn_file, time_limit_ms=time_limit * 1000, cache=cache,
+              extra_models=extra_models, data=data, mapping=reduction, cleanup=[],
+              stop_when=lambda s: gap_reached(s['metrics']['extremismo_total'], lower, gap)
+            )
+            result = job.wait()
+          finally:
+            jobs.shutdown()
+          if 'error' in result:
+            raise result['error']
+          solution = result['solution']
+          row.update({'estado': result['status'], 'codigo_salida': result['returncode']})
+          error = result['stderr']
+          if job.state == TIMEOUT:
+            if solution is None:
+              raise TimeoutError
+            row.update({'estado': 'SATISFIED', 'codigo_salida': 0})
+        else:
+          cmd = build_minizinc_command(model_file, dzn_file, time_limit_ms=time_limit * 1000,
+                                       cache=cache, extra_models=extra_models, json_output=True)
+          # Al agotar el margen se termina el grupo de procesos (el solver incluido)
+          try:
+            process = run_command(cmd, timeout=time_limit + PROCESS_MARGIN)
+          finally:
+            release_minizinc_command(cmd, cache)
+          solution = read_solution(process['stdout'], reduction.reduced if reduction else data)
+          if reduction is not None:
+            solution = reduction.expand(solution)
+          row.update({'estado': get_solution_status(process['stdout']),
+                      'codigo_salida': process['returncode']})
+          error = process['stderr']
+          if process['reason'] == 'timeout':
+            if solution is None:
+              raise TimeoutError
+            row.update({'estado': 'SATISFIED', 'codigo_salida': 0})
+      finally:
+        for path in temp_files:
+          os.remove(path)
+      if row['codigo_salida'] != 0:
+        row['estado'] = 'ERROR'
+        row['error'] = error.strip()
+      elif warm:
+        solution = heuristic.merge_warm_start(row['estado'], solution, warm)
+        row['estado'] = solution.status
+
+    row.update(solution.metrics(data) if solution else empty_metrics())
+    if keep_solution:
+      row['solucion'] = solution.to_dict() if solution else None
+    row['cota_inferior'] = round(lower, 6)
+    gap_value = optimality_gap(row['extremismo_total'], lower, row['estado'])
+    row['gap'] = None if gap_value is None else round(gap_value, 6)
+
+  except TimeoutError:
+    row.update({'estado': 'TIMEOUT', 'error': f"Sin respuesta en {time_limit + PROCESS_MARGIN:.0f}s"})
+  except FileNotFoundError:
+    row.update({'estado': 'ERROR', 'error': "MiniZinc no está instalado o no está en el PATH"})
+  except Exception as e:
+    row.update({'estado': 'ERROR', 'error': str(e)})
+
+  row['tiempo'] = round(time.time() - start_time, 3)
+  return row
+
+def run_batch(instances, backend='minizinc', model_file=None, workers=None,
+              time_limit=60.0, batch_timeout=None, on_result=None, cache_dir=None, gap=None,
+              warm_start=False, presolve=False):
+  """
+  Resuelve las instancias en paralelo con un pool de procesos
+  workers: tamaño del pool (por defecto, número de núcleos)
+  time_limit: segundos por instancia
+  batch_timeout: segundos para el lote completo (None = sin límite)
+  on_result: callback opcional llamado con cada fila al terminar
+  cache_dir: directorio de la caché de FlatZinc compartida por los procesos
+  gap: gap relativo con el que se detiene cada instancia (None = hasta el óptimo)
+  warm_start: arrancar cada instancia con la heurística voraz
+  presolve: reducir cada instancia antes de MiniZinc (ver solve_instance)
+  Returns: lista de filas en el mismo orden que instances
+  """
+  if model_file is None:
+    model_file = get_project_paths()['model']
+  workers = workers or os.cpu_count() or 1
+  deadline = time.time() + batch_timeout if batch_timeout else None
+
+  rows = {}
+  executor = ProcessPoolExecutor(max_workers=min(workers, max(len(instances), 1)))
+  try:
+    futures = {
+      executor.submit(solve_instance, str(path), backend, str(model_file), time_limit, deadline,
+                      str(cache_dir) if cache_dir else None, gap, warm_start,
+                      presolve=presolve): path
+      for path in instances
+    }
+    # Margen para que las instancias en curso terminen y reporten su mejor solución
+    wait = batch_timeout + PROCESS_MARGIN if batch_timeout else None
+    try:
+      for future in as_completed(futures, timeout=wait):
+        row = future.result()
+        rows[futures[future]] = row
+        if on_result:
+          on_result(row)
+    except FuturesTimeout:
+      pass
+  finally:
+    executor.shutdown(wait=False, cancel_futures=True)
+
+  results = []
+  for path in instances:
+    if path not in rows:
+      row = dict.fromkeys(FIELDS)
+      row.update({'instancia': path.stem, 'archivo': str(path), 'motor': backend,
+                  'estado': 'TIMEOUT', 'error': 'Tiempo del lote agotado'})
+      rows[path] = row
+    results.append(rows[path])
+  return results
+
+def progress_line(row):
+  """
+  Línea de progreso de una instancia resuelta (objetivo y tiempo con 3 decimales)
+  Returns: str
+  """
+  objective = '-' if row['extremismo_total'] is None else f"{row['extremismo_total']:.3f}"
+  gap = f"{row['gap'] * 100:.2f}%" if row['gap'] is not None else '-'
+  return f"  {row['instancia']:<35} {row['estado']:<13} {objective:>12}  gap {gap}  ({row['tiempo']:.3f}s)"
+
+def main(argv=None):
+  """Función principal"""
+  paths = get_project_paths()
+  parser = argparse.ArgumentParser(description="Resuelve por lotes las instancias de MinExt")
+  parser.add_argument('--dirs', nargs='+', type=Path,
+                      default=[paths['dzn_dir'], paths['project'] / "MisInstancias"],
+                      help="Directorios con archivos .dzn")
+  parser.add_argument('--backend', choices=BACKENDS, default='minizinc')
+  parser.add_argument('--model', type=Path, default=paths['model'])
+  parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                      help="Procesos en paralelo (por defecto, número de núcleos)")
+  parser.add_argument('--time-limit', type=float, default=60.0,
+                      help="Segundos por instancia")
+  parser.add_argument('--batch-timeout', type=float, default=None,
+                      help="Segundos para el lote completo")
+  parser.add_argument('--output', type=Path, default=Path("resultados_lote.csv"),
+                      help="Archivo de salida (.csv o .json)")
+  parser.add_argument('--gap', type=float, default=None,
+                      help="Detener cada instancia al alcanzar este gap relativo (p. ej. 0.01)")
+  parser.add_argument('--warm-start', action='store_true',
+                      help="Arrancar con la heurística voraz (incumbente inicial y cota del objetivo)")
+  parser.add_argument('--no-cache', action='store_true',
+                      help="Compilar el modelo en cada ejecución (sin caché de FlatZinc)")
+  parser.add_argument('--presolve', action='store_true',
+                      help="Reducir cada instancia antes de MiniZinc (ProyectoReducido.mzn)")
+  args = parser.parse_args(argv)
+  if args.presolve and (args.backend != 'minizinc' or args.model != paths['model']):
+    parser.error("--presolve solo se usa con --backend minizinc y el modelo Proyecto.mzn")
+
+  instances = find_instances(args.dirs)
+  if not instances:
+    print("No se encontraron instancias .dzn", file=sys.stderr)
+    return 1
+
+  print(f"Resolviendo {len(instances)} instancias con {args.workers} procesos ({args.backend})")
+
+  def report(row):
+    print(progress_line(row))
+    if row['verificacion'] not in (None, 'ok'):
+      print(f"    verificación: {row['verificacion']}")
+
+  start_time = time.time()
+  rows = run_batch(instances, args.backend, args.model, args.workers,
+                   args.time_limit, args.batch_timeout, on_result=report,
+                   cache_dir=None if args.no_cache else paths['cache_dir'], gap=args.gap,
+                   warm_start=args.warm_start, presolve=args.presolve)
+  write_results(rows, args.output, FIELDS)
+
+  print(f"Lote completado en {time.time() - start_time:.2f}s. Resultados en: {args.output}")
+  return 0 if all(row['estado'] not in ('ERROR', 'TIMEOUT') for row in rows) else 1
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark por etapas del flujo de solución de MinExt
+Mide por separado la lectura del .txt, la generación del .dzn, el aplanado con
+MiniZinc, la solución y la lectura de la salida, para las instancias de
+DatosProyecto/, MisInstancias/ y otras sintéticas de tamaño creciente. Cada
+etapa se repite varias veces y se reportan la mediana y el percentil 95; el
+resultado se guarda como línea base en JSON para detectar regresiones.
+
+Uso:
+  python ProyectoGUIFuentes/bench.py --repeat 5 --save-baseline bench_base.json
+  python ProyectoGUIFuentes/bench.py --repeat 5 --baseline bench_base.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from utils import get_project_paths, check_minizinc_installation, get_solution_status, JSON_OUTPUT_ARGS
+from utils import natural_sort_key
+from instance import Instance
+from solution import read_solution
+from generator import generate_instance
+
+# Etapas medidas, en el orden en que se ejecutan
+STAGES = ['parse', 'dzn', 'flatten', 'solve', 'output']
+
+# Se incrementa si cambia la forma del archivo de línea base
+BASELINE_VERSION = 1
+
+# Tamaños (m) de las instancias sintéticas por defecto
+SYNTHETIC_SIZES = [50, 200, 1000]
+
+def percentile(values, q):
+  """
+  Returns: percentil q (0-100) de values, interpolado linealmente
+  """
+  return float(np.percentile(values, q))
+
+def summarize(times):
+  """
+  Returns: dict con mediana, p95, mínimo y número de repeticiones (segundos)
+  """
+  return {
+    'median': round(statistics.median(times), 6),
+    'p95': round(percentile(times, 95), 6),
+    'min': round(min(times), 6),
+    'runs': len(times)
+  }
+
+def find_sources(directories):
+  """
+  Returns: lista de Path de los .txt de los directorios, en orden natural
+  """
+  sources = []
+  for directory in directories:
+    if directory.exists():
+      sources.extend(sorted(directory.glob("*.txt"), key=natural_sort_key))
+  return sources
+
+def timed(function, repeat):
+  """
+  Ejecuta function repeat veces
+  Returns: (lista de tiempos en segundos, resultado de la última ejecución)
+  """
+  times = []
+  result = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    result = function()
+    times.append(time.perf_counter() - start)
+  return times, result
+
+def bench_instance(txt_file, workdir, model_file, repeat=5, backend='minizinc',
+                   time_limit=10.0, stages=STAGES, minizinc=True):
+  """
+  Mide cada etapa sobre una instancia; las etapas que no se pueden ejecutar
+  (sin MiniZinc, o porque falló una etapa anterior) quedan como omitidas
+  Returns: dict {etapa: resumen o {'omitido': motivo}}
+  """
+  results = {}
+  dzn_file = Path(workdir) / f"{Path(txt_file).stem}.dzn"
+  fzn_file = Path(workdir) / f"{Path(txt_file).stem}.fzn"
+  ozn_file = Path(workdir) / f"{Path(txt_file).stem}.ozn"
+
+  times, data = timed(lambda: Instance.from_txt(txt_file), repeat if 'parse' in stages else 1)
+  if 'parse' in stages:
+    results['parse'] = summarize(times)
+
+  times, _ = timed(lambda: data.write_dzn(dzn_file), repeat if 'dzn' in stages else 1)
+  if 'dzn' in stages:
+    results['dzn'] = summarize(times)
+
+  stdout = None
+  if backend == 'native':
+    import native_solver
+
+    if 'flatten' in stages:
+      results['flatten'] = {'omitido': "el motor nativo no aplana el modelo"}
+    if 'solve' in stages or 'output' in stages:
+      times, result = timed(lambda: native_solver.solve(data, time_limit=time_limit),
+                            repeat if 'solve' in stages else 1)
+      if 'solve' in stages:
+        results['solve'] = summarize(times)
+        results['solve']['estado'] = result['status']
+      # Misma salida JSON que emite MiniZinc, para medir su lectura
+      stdout = json.dumps({'x': result['x'], 'f': result['f'],
+                           '_objective': result['extremismo_total']}) + "\n----------\n"
+
+  elif not minizinc:
+    for stage in ('flatten', 'solve', 'output'):
+      if stage in stages:
+        results[stage] = {'omitido': "MiniZinc no está disponible"}
+  else:
+    compile_cmd = ["minizinc", "-c", "--solver", "Gecode", "--fzn", str(fzn_file),
+                   "--ozn", str(ozn_file), *JSON_OUTPUT_ARGS, str(model_file), str(dzn_file)]
+    times, process = timed(lambda: subprocess.run(compile_cmd, capture_output=True, text=True,
+                                                  encoding='utf-8'),
+                           repeat if 'flatten' in stages else 1)
+    if process.returncode != 0:
+      for stage in ('flatten', 'solve', 'output'):
+        if stage in stages:
+          results[stage] = {'omitido': f"error al aplanar: {process.stderr.strip()[:200]}"}
+      return results
+    if 'flatten' in stages:
+      results['flatten'] = summarize(times)
+
+    if 'solve' in stages or 'output' in stages:
+      solve_cmd = ["minizinc", "--solver", "Gecode", "--time-limit", str(int(time_limit * 1000)),
+                   "--ozn-file", str(ozn_file), str(fzn_file)]
+      times, process = timed(lambda: subprocess.run(solve_cmd, capture_output=True, text=True,
+                                                    encoding='utf-8'),
+                             repeat if 'solve' in stages else 1)
+      if 'solve' in stages:
+        results['solve'] = summarize(times)
+        results['solve']['estado'] = get_solution_status(process.stdout)
+      stdout = process.stdout
+
+  if 'output' in stages and stdout is not None:
+    times, _ = timed(lambda: read_solution(stdout, data).metrics(data), repeat)
+    results['output'] = summarize(times)
+  return results
+
+def environment():
+  """
+  Returns: dict con la información del entorno que acompaña a la línea base
+  """
+  installed, minizinc = check_minizinc_installation()
+  return {
+    'python': platform.python_version(),
+    'numpy': np.__version__,
+    'plataforma': platform.platform(),
+    'minizinc': minizinc if installed else None,
+    'fecha': time.strftime('%Y-%m-%d %H:%M:%S')
+  }
+
+def compare(results, baseline, threshold=0.25, min_delta=0.005):
+  """
+  Compara las medianas con una línea base
+  threshold: aumento relativo de la mediana que se considera regresión
+  min_delta: diferencia absoluta mínima (s) para no marcar ruido en etapas rápidas
+  Returns: lista de dicts con instancia, etapa, base, actual y razón
+  """
+  regressions = []
+  for instance, stages in results.items():
+    for stage, summary in stages.items():
+      base = baseline.get(instance, {}).get(stage, {})
+      if 'median' not in summary or 'median' not in base:
+        continue
+      ratio = summary['median'] / base['median'] if base['median'] > 0 else float('inf')
+      if ratio > 1 + threshold and summary['median'] - base['median'] > min_delta:
+        regressions.append({'instancia': instance, 'etapa': stage, 'base': base['median'],
+                            'actual': summary['median'], 'razon': round(ratio, 2)})
+  return regressions
+
+def main(argv=None):
+  """Función principal"""
+  paths = get_project_paths()
+  parser = argparse.ArgumentParser(description="Benchmark por etapas del flujo de MinExt")
+  parser.add_argument('--dirs', nargs='+', type=Path,
+                      default=[paths['datos_dir'], paths['project'] / "MisInstancias"],
+                      help="Directorios con archivos .txt")
+  parser.add_argument('--sizes', nargs='*', type=int, default=SYNTHETIC_SIZES,
+                      help="Valores de m de las instancias sintéticas (ninguno = sin sintéticas)")
+  parser.add_argument('--seed', type=int, default=0, help="Semilla de las instancias sintéticas")
+  parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+  parser.add_argument('--backend', choices=['minizinc', 'native'], default='minizinc')
+  parser.add_argument('--model', type=Path, default=paths['model'])
+  parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por etapa")
+  parser.add_argument('--time-limit', type=float, default=10.0, help="Segundos por solución")
+  parser.add_argument('--filter', default=None, help="Solo instancias cuyo nombre contenga este texto")
+  parser.add_argument('--output', type=Path, default=None, help="JSON con los resultados de esta ejecución")
+  parser.add_argument('--save-baseline', type=Path, default=None, help="Guardar esta ejecución como línea base")
+  parser.add_argument('--baseline', type=Path, default=None, help="Línea base contra la que comparar")
+  parser.add_argument('--threshold', type=float, default=0.25,
+                      help="Aumento relativo de la mediana que cuenta como regresión")
+  args = parser.parse_args(argv)
+
+  minizinc = args.backend == 'minizinc' and check_minizinc_installation()[0]
+  if args.backend == 'minizinc' and not minizinc:
+    print("MiniZinc no está disponible: se omiten aplanado, solución y salida", file=sys.stderr)
+
+  results = {}
+  with tempfile.TemporaryDirectory(prefix="minext-bench-") as workdir:
+    sources = [(path.stem, path) for path in find_sources(args.dirs)]
+    for m in args.sizes:
+      summary = generate_instance(workdir, f"Sintetica_m{m}", m, seed=args.seed, formats=('txt',))
+      sources.append((summary['nombre'], Path(summary['archivos']['txt'])))
+    if args.filter:
+      sources = [(name, path) for name, path in sources if args.filter in name]
+
+    print(f"{'instancia':<32} " + " ".join(f"{stage:>17}" for stage in args.stages))
+    for name, txt_file in sources:
+      try:
+        results[name] = bench_instance(txt_file, workdir, args.model, args.repeat, args.backend,
+                                       args.time_limit, args.stages, minizinc)
+      except Exception as e:
+        results[name] = {'error': str(e)}
+        print(f"{name:<32} error: {e}")
+        continue
+      cells = []
+      for stage in args.stages:
+        summary = results[name].get(stage, {})
+        if 'median' in summary:
+          cells.append(f"{summary['median'] * 1000:8.2f}/{summary['p95'] * 1000:8.2f}")
+        else:
+          cells.append(f"{'-':>17}")
+      print(f"{name:<32} " + " ".join(cells))
+  print("(mediana/p95 en milisegundos)")
+
+  report = {'version': BASELINE_VERSION, 'entorno': environment(), 'repeticiones': args.repeat,
+            'motor': args.backend, 'resultados': results}
+  for path in (args.output, args.save_baseline):
+    if path:
+      with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+  if args.save_baseline:
+    print(f"Línea base guardada en: {args.save_baseline}")
+
+  if args.baseline:
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+      baseline = json.load(f)
+    if baseline.get('version') != BASELINE_VERSION:
+      print("La línea base es de otra versión del benchmark", file=sys.stderr)
+      return 2
+    regressions = compare(results, baseline['resultados'], args.threshold)
+    if regressions:
+      print(f"\n{len(regressions)} regresiones respecto a {args.baseline}:")
+      for item in regressions:
+        print(f"  {item['instancia']:<32} {item['etapa']:<8} {item['base'] * 1000:9.2f} ms -> "
+              f"{item['actual'] * 1000:9.2f} ms (x{item['razon']})")
+      return 1
+    print(f"\nSin regresiones respecto a {args.baseline}")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
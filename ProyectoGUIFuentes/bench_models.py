@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comparación de Proyecto.mzn contra la reformulación de flujo (ProyectoFlujo.mzn)
+Resuelve la serie Prueba* e Instancia3_GranEscala con ambos modelos, sin caché
+de FlatZinc (el aplanado es parte de lo que se mide), y resume el tiempo de
+solución en función de m. Solo se mide el subproceso de MiniZinc (lectura,
+cotas y verificación quedan fuera), junto con el flatTime y el solveTime que
+reporta MiniZinc con --statistics.
+
+Uso:
+  python ProyectoGUIFuentes/bench_models.py --repeat 3 --output bench_modelos.csv
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from utils import get_project_paths, parse_dzn_file, natural_sort_key, write_results
+from utils import build_minizinc_command, get_solution_status, PROCESS_MARGIN
+from jobs import run_command
+from profiler import parse_statistics
+from solution import read_solution
+
+# Columnas del detalle, en orden
+FIELDS = ['instancia', 'm', 'modelo', 'estado', 'extremismo_total', 'tiempo', 'aplanado', 'busqueda']
+
+def find_benchmark_instances(dzn_dir):
+  """
+  Instancias de la comparación: Prueba* e Instancia3_GranEscala
+  Returns: lista de Path
+  """
+  instances = sorted(dzn_dir.glob("Prueba*.dzn"), key=natural_sort_key)
+  large = dzn_dir / "Instancia3_GranEscala.dzn"
+  if large.exists():
+    instances.append(large)
+  return instances
+
+def run_model(model_file, dzn_file, data, time_limit=60.0):
+  """
+  Una ejecución de MiniZinc, midiendo solo el subproceso
+  Returns: dict con estado, extremismo_total, tiempo (s del subproceso) y
+           aplanado y busqueda (flatTime y solveTime de MiniZinc, o None)
+  """
+  cmd = build_minizinc_command(model_file, dzn_file, time_limit_ms=time_limit * 1000,
+                               json_output=True, statistics=True)
+  start = time.monotonic()
+  process = run_command(cmd, timeout=time_limit + PROCESS_MARGIN)
+  elapsed = time.monotonic() - start
+  solution = read_solution(process['stdout'], data)
+  status = get_solution_status(process['stdout'])
+  if process['reason'] == 'timeout':
+    status = 'TIMEOUT' if solution is None else 'SATISFIED'
+  elif process['returncode'] != 0:
+    status = 'ERROR'
+  stats = parse_statistics(process['stdout'])
+  return {
+    'estado': status,
+    'extremismo_total': solution.objective if solution else None,
+    'tiempo': elapsed,
+    'aplanado': stats.get('flatTime'),
+    'busqueda': stats.get('solveTime')
+  }
+
+def _median(values):
+  """Mediana redondeada de los valores presentes (None si no hay)"""
+  values = [value for value in values if isinstance(value, (int, float))]
+  return round(statistics.median(values), 3) if values else None
+
+def run_benchmark(instances, models, repeat=3, time_limit=60.0, on_result=None):
+  """
+  Resuelve cada instancia con cada modelo, repeat veces y en serie
+  models: dict {nombre: ruta del modelo}
+  Returns: lista de dicts con las columnas de FIELDS (tiempos como mediana
+           de las repeticiones)
+  """
+  rows = []
+  for path in instances:
+    data = parse_dzn_file(path)
+    for name, model_file in models.items():
+      runs = [run_model(model_file, path, data, time_limit) for _ in range(repeat)]
+      row = {
+        'instancia': path.stem,
+        'm': data['m'],
+        'modelo': name,
+        'estado': runs[-1]['estado'],
+        'extremismo_total': runs[-1]['extremismo_total'],
+        'tiempo': _median(run['tiempo'] for run in runs),
+        'aplanado': _median(run['aplanado'] for run in runs),
+        'busqueda': _median(run['busqueda'] for run in runs)
+      }
+      rows.append(row)
+      if on_result:
+        on_result(row)
+  return rows
+
+def summarize_by_m(rows, models):
+  """
+  Agrupa por m: mediana del tiempo por modelo y razón contra el primer modelo
+  Returns: lista de dicts ordenada por m
+  """
+  names = list(models)
+  summary = []
+  for m in sorted({row['m'] for row in rows}):
+    entry = {'m': m, 'instancias': len({row['instancia'] for row in rows if row['m'] == m})}
+    for name in names:
+      times = [row['tiempo'] for row in rows if row['m'] == m and row['modelo'] == name]
+      entry[name] = round(statistics.median(times), 3) if times else None
+    base, other = entry[names[0]], entry[names[-1]]
+    entry['aceleracion'] = round(base / other, 2) if base and other else None
+    summary.append(entry)
+  return summary
+
+def check_agreement(rows, models):
+  """
+  Instancias donde los modelos terminan en OPTIMAL con objetivos distintos
+  Returns: lista de nombres de instancia
+  """
+  names = list(models)
+  by_instance = {}
+  for row in rows:
+    by_instance.setdefault(row['instancia'], {})[row['modelo']] = row
+  mismatches = []
+  for instance, results in by_instance.items():
+    optimal = [results[name]['extremismo_total'] for name in names
+               if name in results and results[name]['estado'] == 'OPTIMAL']
+    if len(optimal) == len(names) and max(optimal) - min(optimal) > 1e-3:
+      mismatches.append(instance)
+  return mismatches
+
+def main(argv=None):
+  """Función principal"""
+  paths = get_project_paths()
+  parser = argparse.ArgumentParser(description="Compara Proyecto.mzn con la reformulación de flujo")
+  parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por instancia y modelo")
+  parser.add_argument('--time-limit', type=float, default=60.0, help="Segundos por ejecución")
+  parser.add_argument('--output', type=Path, default=Path("bench_modelos.csv"),
+                      help="CSV con el detalle por instancia")
+  args = parser.parse_args(argv)
+
+  models = {'original': paths['model'], 'flujo': paths['flow_model']}
+  instances = find_benchmark_instances(paths['dzn_dir'])
+  if not instances:
+    print(f"No se encontraron instancias en {paths['dzn_dir']}", file=sys.stderr)
+    return 1
+
+  def report(row):
+    objective = '-' if row['extremismo_total'] is None else f"{row['extremismo_total']:.3f}"
+    print(f"  {row['instancia']:<25} m={row['m']:<4} {row['modelo']:<9} "
+          f"{row['estado']:<10} {objective:>10}  {row['tiempo']:.3f}s")
+
+  rows = run_benchmark(instances, models, args.repeat, args.time_limit, on_result=report)
+  write_results(rows, args.output, FIELDS)
+
+  print("\nTiempo mediano (s) por número de opiniones m:")
+  print(f"  {'m':>4} {'inst':>5} {'original':>10} {'flujo':>10} {'aceleración':>12}")
+  for entry in summarize_by_m(rows, models):
+    print(f"  {entry['m']:>4} {entry['instancias']:>5} {entry['original']!s:>10} "
+          f"{entry['flujo']!s:>10} {entry['aceleracion']!s:>12}")
+
+  mismatches = check_agreement(rows, models)
+  if mismatches:
+    print(f"\n¡Objetivos distintos en: {', '.join(mismatches)}!")
+    return 1
+  print(f"\nDetalle en: {args.output}")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cota inferior del extremismo total por relajación lineal
+Resuelve el modelo con las restricciones 1-5 y x continua: con el simplex del
+motor nativo si la instancia es chica, o por su dual lagrangiano (ct y maxM
+relajadas, con la bisección del motor de flujo) si es grande. Cualquier
+multiplicador da una cota válida, así que una búsqueda inexacta solo la debilita.
+"""
+
+import time
+
+import numpy as np
+
+from instance import Instance
+from native_solver import move_arrays, lp_relaxation
+from flow_solver import lagrangian_bound
+
+# Movimientos hasta los que se usa el simplex denso (exacto)
+EXACT_LIMIT = 2000
+
+# Iteraciones de la búsqueda de sección áurea por multiplicador (cada una
+# reduce el intervalo a 0.618; una búsqueda corta solo debilita la cota)
+GOLDEN_ITERATIONS = 16
+
+# Denominador mínimo del gap relativo (objetivos en 0)
+GAP_EPS = 1e-9
+
+def _lagrangian(gains, costs, dists, starts, caps, ct, maxM, lam, mu, out):
+  """
+  Valor de la función dual: lam*ct + mu*maxM + sum_i p_i * max(0, max_j reducido)
+  out: arreglo de trabajo del tamaño de gains
+  """
+  np.multiply(costs, -lam, out=out)
+  out += gains
+  out -= mu * dists
+  best = np.maximum.reduceat(out, starts)
+  return lam * ct + mu * maxM + float(caps @ np.maximum(best, 0.0))
+
+def _golden(function, high):
+  """
+  Minimiza una función convexa en [0, high] por sección áurea
+  Returns: (argumento, valor) del mejor punto evaluado, incluido el 0
+  """
+  ratio = (np.sqrt(5.0) - 1.0) / 2.0
+  a, b = 0.0, high
+  c, d = b - ratio * (b - a), a + ratio * (b - a)
+  fc, fd = function(c), function(d)
+  best = min((0.0, function(0.0)), (c, fc), (d, fd), key=lambda item: item[1])
+  for _ in range(GOLDEN_ITERATIONS):
+    if fc <= fd:
+      b, d, fd = d, c, fc
+      c = b - ratio * (b - a)
+      fc = function(c)
+      point = (c, fc)
+    else:
+      a, c, fc = c, d, fd
+      d = a + ratio * (b - a)
+      fd = function(d)
+      point = (d, fd)
+    if point[1] < best[1]:
+      best = point
+  return best
+
+def lagrangian_dual(rows, gains, costs, dists, p, ct, maxM):
+  """
+  Minimiza el dual lagrangiano de ct y maxM sobre los movimientos dados
+  (agrupados por origen, como los entrega move_arrays)
+  Returns: (valor, lam, mu); valor acota por arriba la ganancia máxima
+  """
+  sources, starts = np.unique(rows, return_index=True)
+  caps = p[sources].astype(float)
+  dists = np.asarray(dists, dtype=float)
+  # El mínimo interno en mu es convexo en lam, así que basta una sección áurea
+  # anidada. Cada evaluación recorre todos los movimientos en un arreglo de
+  # trabajo reutilizado
+  work = np.empty_like(gains)
+  dual = lambda lam, mu: _lagrangian(gains, costs, dists, starts, caps, ct, maxM, lam, mu, work)
+  lam_high = float(np.max(gains / np.maximum(costs, 1e-12)))
+  mu_high = float(np.max(gains / dists))
+  lam, _ = _golden(lambda lam: _golden(lambda mu: dual(lam, mu), mu_high)[1], lam_high)
+  mu, value = _golden(lambda mu: dual(lam, mu), mu_high)
+  return value, lam, mu
+
+def lower_bound(data, exact_limit=EXACT_LIMIT):
+  """
+  Cota inferior del extremismo total (relajación lineal de las restricciones 1-5)
+  Returns: dict con cota_inferior, metodo ('simplex', 'flujo' o 'trivial')
+           y tiempo
+  """
+  start = time.monotonic()
+  inst = Instance.from_data(data)
+  base = float(inst.p @ inst.ext)
+  rows, _, gains, costs, dists, _ = move_arrays(inst)
+  dists = dists.astype(float)
+
+  if len(gains) == 0:
+    return {'cota_inferior': base, 'metodo': 'trivial', 'tiempo': time.monotonic() - start}
+
+  if len(gains) <= exact_limit:
+    sources, groups = np.unique(rows, return_inverse=True)
+    caps = inst.p[sources].astype(float)
+    result = lp_relaxation(gains, costs, dists, groups, caps, inst.ct, float(inst.maxM))
+    if result is not None:
+      return {'cota_inferior': float(base - result[0]), 'metodo': 'simplex',
+              'tiempo': time.monotonic() - start}
+
+  value, _, _ = lagrangian_bound(inst)
+  return {'cota_inferior': float(base - value), 'metodo': 'flujo', 'tiempo': time.monotonic() - start}
+
+def optimality_gap(objective, lower, status=None):
+  """
+  Gap relativo (objetivo - cota) / |objetivo|; 0 si la solución es óptima
+  Returns: float, o None si falta el objetivo o la cota
+  """
+  if status == 'OPTIMAL' and objective is not None:
+    return 0.0
+  if objective is None or lower is None:
+    return None
+  return max(0.0, objective - lower) / max(abs(objective), GAP_EPS)
+
+def gap_reached(objective, lower, target):
+  """
+  Returns: True si el objetivo ya está dentro del gap pedido respecto a la cota
+  """
+  gap = optimality_gap(objective, lower)
+  return target is not None and gap is not None and gap <= target
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Línea de comandos de MinExt (sin interfaz gráfica)
+Reúne en un solo punto de entrada la verificación de MiniZinc, la conversión
+de .txt a .dzn, la resolución de instancias, los lotes y el benchmark, con los
+mismos módulos que usa la interfaz. No importa tkinter y carga cada módulo
+solo al ejecutar su subcomando, así que arranca rápido en servidores sin
+pantalla. Los resultados van a stdout (o a --output) como JSON, JSON Lines o
+CSV; el progreso va a stderr.
+
+Uso:
+  python ProyectoGUIFuentes/cli.py check
+  python ProyectoGUIFuentes/cli.py convert --force --format csv
+  python ProyectoGUIFuentes/cli.py convert --binary
+  python ProyectoGUIFuentes/cli.py convert-file DatosDZN/Prueba1.dzn Prueba1.mxb
+  python ProyectoGUIFuentes/cli.py solve DatosDZN/Prueba1.dzn --backend native --moves
+  python ProyectoGUIFuentes/cli.py solve DatosDZN/Prueba1.dzn --presolve
+  python ProyectoGUIFuentes/cli.py batch --backend heuristic --time-limit 1 --format jsonl
+  python ProyectoGUIFuentes/cli.py bench --repeat 3 --sizes 50
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from utils import get_project_paths, check_minizinc_installation
+
+# Formatos de salida de los resultados
+FORMATS = ['json', 'jsonl', 'csv']
+
+# Motores de solve y batch (flow = MiniZinc con ProyectoFlujo.mzn; lagrangian =
+# flujo con relajación lagrangiana de flow_solver.py; dp = programación
+# dinámica de dp_solver.py)
+BACKENDS = ['minizinc', 'flow', 'native', 'portfolio', 'heuristic', 'lagrangian', 'dp']
+
+# Columnas de los resultados de convert, en orden
+CONVERT_FIELDS = ['archivo', 'salida', 'estado', 'error', 'tiempo']
+
+def output_format(fmt, output):
+  """
+  Formato de salida: el pedido, o según la extensión de output (JSON por defecto)
+  """
+  if fmt:
+    return fmt
+  suffix = Path(output).suffix.lower().lstrip('.') if output and output != '-' else ''
+  return suffix if suffix in FORMATS else 'json'
+
+def write_rows(rows, fields, output=None, fmt=None):
+  """
+  Escribe los resultados en output (None o '-' = stdout)
+  fields: columnas del CSV (las demás claves solo salen en JSON)
+  fmt: 'json', 'jsonl' o 'csv' (ver output_format)
+  """
+  fmt = output_format(fmt, output)
+  to_stdout = output in (None, '-')
+  stream = sys.stdout if to_stdout else open(output, 'w', encoding='utf-8', newline='')
+  try:
+    if fmt == 'csv':
+      writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+      writer.writeheader()
+      writer.writerows(rows)
+    elif fmt == 'jsonl':
+      for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+    else:
+      json.dump(rows, stream, indent=2, ensure_ascii=False)
+      stream.write('\n')
+  finally:
+    if not to_stdout:
+      stream.close()
+
+def progress(message):
+  """Mensaje de progreso (stderr, para no mezclarlo con los resultados)"""
+  print(message, file=sys.stderr, flush=True)
+
+def resolve_model(backend, model, paths):
+  """
+  Modelo y motor de batch.solve_instance para un motor de la línea de comandos
+  Returns: (motor, archivo .mzn)
+  """
+  if backend == 'flow':
+    return 'minizinc', model or paths['flow_model']
+  return backend, model or paths['model']
+
+def cmd_check(args):
+  """Verifica que MiniZinc esté instalado"""
+  installed, message = check_minizinc_installation()
+  write_rows([{'instalado': installed, 'mensaje': message}], ['instalado', 'mensaje'],
+             args.output, args.format)
+  return 0 if installed else 1
+
+def cmd_convert(args):
+  """Convierte de forma incremental los .txt a .dzn"""
+  sys.path.append(str(get_project_paths()['project'] / "ConvertirArchivos"))
+  from conversion import convert_all
+
+  def report(result):
+    progress(f"  {Path(result['archivo']).name:<40} {result['estado']}"
+             + (f": {result['error']}" if result['error'] else ""))
+
+  rows = convert_all(args.sources, args.output_dir, args.workers, args.force,
+                     on_result=None if args.quiet else report, binary=args.binary)
+  write_rows(rows, CONVERT_FIELDS, args.output, args.format)
+  if not rows:
+    progress("No se encontraron archivos .txt")
+    return 1
+  return 1 if any(row['estado'] == 'error' for row in rows) else 0
+
+def cmd_convert_file(args):
+  """Convierte una instancia entre .txt, .dzn y .mxb (binario), sin pérdida"""
+  from instance import convert_instance
+
+  start_time = time.time()
+  data = convert_instance(args.source, args.target)
+  write_rows([{'origen': str(args.source), 'destino': str(args.target), 'n': data.n, 'm': data.m,
+               'tiempo': round(time.time() - start_time, 3)}],
+             ['origen', 'destino', 'n', 'm', 'tiempo'], args.output, args.format)
+  return 0
+
+def cmd_solve(args):
+  """Resuelve una o varias instancias, una tras otra"""
+  from batch import FIELDS, progress_line, solve_instance
+
+  paths = get_project_paths()
+  backend, model_file = resolve_model(args.backend, args.model, paths)
+  cache_dir = None if args.no_cache else paths['cache_dir']
+  rows = []
+  for dzn_file in args.instances:
+    row = solve_instance(str(dzn_file), backend, str(model_file), args.time_limit,
+                         cache_dir=str(cache_dir) if cache_dir else None, gap=args.gap,
+                         warm_start=args.warm_start, keep_solution=args.moves,
+                         presolve=args.presolve)
+    if args.backend == 'flow':
+      row['motor'] = 'flow'
+    rows.append(row)
+    if not args.quiet:
+      progress(progress_line(row))
+  write_rows(rows, FIELDS, args.output, args.format)
+  return 0 if all(row['estado'] not in ('ERROR', 'TIMEOUT') for row in rows) else 1
+
+def cmd_batch(args):
+  """Resuelve en paralelo todas las instancias de los directorios"""
+  from batch import FIELDS, find_instances, progress_line, run_batch
+
+  paths = get_project_paths()
+  instances = find_instances(args.dirs)
+  if not instances:
+    progress("No se encontraron instancias .dzn")
+    return 1
+  backend, model_file = resolve_model(args.backend, args.model, paths)
+  progress(f"Resolviendo {len(instances)} instancias con {args.workers} procesos ({args.backend})")
+
+  def report(row):
+    progress(progress_line(row))
+
+  start_time = time.time()
+  rows = run_batch(instances, backend, model_file, args.workers, args.time_limit,
+                   args.batch_timeout, on_result=None if args.quiet else report,
+                   cache_dir=None if args.no_cache else paths['cache_dir'], gap=args.gap,
+                   warm_start=args.warm_start, presolve=args.presolve)
+  if args.backend == 'flow':
+    for row in rows:
+      row['motor'] = 'flow'
+  write_rows(rows, FIELDS, args.output, args.format)
+  progress(f"Lote completado en {time.time() - start_time:.2f}s")
+  return 0 if all(row['estado'] not in ('ERROR', 'TIMEOUT') for row in rows) else 1
+
+def cmd_bench(args):
+  """Benchmark por etapas (mismas opciones que bench.py)"""
+  import bench
+
+  return bench.main(args.bench_args)
+
+def build_parser():
+  """Returns: argparse.ArgumentParser con los subcomandos"""
+  paths = get_project_paths()
+  parser = argparse.ArgumentParser(description="MinExt por línea de comandos (sin interfaz gráfica)")
+  subparsers = parser.add_subparsers(dest='command', required=True)
+
+  def add_output(subparser):
+    subparser.add_argument('--output', '-o', default=None,
+                           help="Archivo de resultados (por defecto, stdout)")
+    subparser.add_argument('--format', choices=FORMATS, default=None,
+                           help="Formato de los resultados (por defecto, según la extensión; JSON en stdout)")
+    subparser.add_argument('--quiet', '-q', action='store_true', help="Sin mensajes de progreso")
+
+  def add_solver(subparser, time_limit):
+    subparser.add_argument('--backend', choices=BACKENDS, default='minizinc')
+    subparser.add_argument('--model', type=Path, default=None,
+                           help="Modelo MiniZinc (por defecto, el del motor)")
+    subparser.add_argument('--time-limit', type=float, default=time_limit, help="Segundos por instancia")
+    subparser.add_argument('--gap', type=float, default=None,
+                           help="Detener al alcanzar este gap relativo (p. ej. 0.01)")
+    subparser.add_argument('--warm-start', action='store_true',
+                           help="Arrancar con la heurística voraz")
+    subparser.add_argument('--no-cache', action='store_true',
+                           help="Compilar el modelo en cada ejecución (sin caché de FlatZinc)")
+    subparser.add_argument('--presolve', action='store_true',
+                           help="Reducir la instancia antes de MiniZinc (solo --backend minizinc)")
+
+  check = subparsers.add_parser('check', help="Verificar la instalación de MiniZinc")
+  add_output(check)
+  check.set_defaults(handler=cmd_check)
+
+  convert = subparsers.add_parser('convert', help="Convertir .txt a .dzn (incremental)")
+  convert.add_argument('--sources', nargs='+', type=Path,
+                       default=[paths['datos_dir'], paths['project'] / "MisInstancias"],
+                       help="Directorios con archivos .txt")
+  convert.add_argument('--output-dir', type=Path, default=paths['dzn_dir'],
+                       help="Directorio de los .dzn generados")
+  convert.add_argument('--workers', type=int, default=os.cpu_count(),
+                       help="Procesos en paralelo (por defecto, número de núcleos)")
+  convert.add_argument('--force', action='store_true',
+                       help="Reconvertir todos los archivos aunque no hayan cambiado")
+  convert.add_argument('--binary', action='store_true',
+                       help="Escribir también el .mxb (formato binario) junto a cada .dzn")
+  add_output(convert)
+  convert.set_defaults(handler=cmd_convert)
+
+  convert_file = subparsers.add_parser('convert-file',
+                                       help="Convertir una instancia entre .txt, .dzn y .mxb")
+  convert_file.add_argument('source', type=Path, help="Instancia de origen (.txt, .dzn o .mxb)")
+  convert_file.add_argument('target', type=Path, help="Archivo de destino (formato según la extensión)")
+  add_output(convert_file)
+  convert_file.set_defaults(handler=cmd_convert_file)
+
+  solve = subparsers.add_parser('solve', help="Resolver instancias .dzn")
+  solve.add_argument('instances', nargs='+', type=Path, help="Archivos .dzn")
+  add_solver(solve, 60.0)
+  solve.add_argument('--moves', action='store_true',
+                     help="Incluir la solución (movimientos dispersos y f) en la salida JSON")
+  add_output(solve)
+  solve.set_defaults(handler=cmd_solve)
+
+  batch = subparsers.add_parser('batch', help="Resolver en paralelo todas las instancias")
+  batch.add_argument('--dirs', nargs='+', type=Path,
+                     default=[paths['dzn_dir'], paths['project'] / "MisInstancias"],
+                     help="Directorios con archivos .dzn")
+  batch.add_argument('--workers', type=int, default=os.cpu_count(),
+                     help="Procesos en paralelo (por defecto, número de núcleos)")
+  batch.add_argument('--batch-timeout', type=float, default=None,
+                     help="Segundos para el lote completo")
+  add_solver(batch, 60.0)
+  add_output(batch)
+  batch.set_defaults(handler=cmd_batch)
+
+  # Las opciones de bench se pasan tal cual a bench.py (ver main)
+  bench = subparsers.add_parser('bench', help="Benchmark por etapas (opciones de bench.py, p. ej. --repeat 3)")
+  bench.set_defaults(handler=cmd_bench)
+
+  return parser
+
+def main(argv=None):
+  """Función principal"""
+  parser = build_parser()
+  args, extra = parser.parse_known_args(argv)
+  if args.command == 'bench':
+    args.bench_args = extra
+  elif extra:
+    parser.error(f"argumentos no reconocidos: {' '.join(extra)}")
+  if getattr(args, 'presolve', False) and (args.backend != 'minizinc' or args.model):
+    parser.error("--presolve solo se usa con --backend minizinc y el modelo Proyecto.mzn")
+  try:
+    return args.handler(args)
+  except BrokenPipeError:
+    # Salida cortada por la tubería (p. ej. | head): no es un error
+    sys.stderr.close()
+    return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
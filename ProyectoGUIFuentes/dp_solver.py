@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor exacto por programación dinámica para maxM pequeño
+Los costos unitarios dependen solo de la distribución inicial y los destinos
+no tienen capacidad, así que cada origen decide sus movimientos sin afectar a
+los demás salvo por los presupuestos ct y maxM. La programación dinámica
+recorre los orígenes con estados (distancia usada, costo, ganancia):
+  - opciones de un origen: los envíos de hasta p_i personas por sus arcos
+    útiles, generados de a una persona y reducidos por dominancia
+  - etapas: cada estado se combina con las opciones del siguiente origen
+  - dominancia: con la misma distancia, un estado con costo menor o igual y
+    ganancia mayor o igual descarta al otro
+  - dominancia entre distancias: también descarta al estado que usa más
+    distancia sin ser más barato ni ganar más
+  - cota: la ganancia máxima de los orígenes que faltan con la distancia que
+    queda, con ct relajado por precios lagrangianos (el del flujo y algunos
+    múltiplos), descarta los estados que no pueden superar al incumbente,
+    que parte de la solución de flow_solver
+Los estados de cada etapa se combinan y se podan con operaciones vectorizadas
+de NumPy. La distancia es entera y acotada por maxM, así que el número de
+estados crece con maxM y no con n ni con ct: en las instancias de maxM chico
+termina en milisegundos con el óptimo demostrado. Si el número estimado de
+estados, o las tablas de opciones, superan el límite (o se agota el tiempo
+antes de empezar las etapas), la respuesta es la de flow_solver.
+"""
+
+import time
+
+import numpy as np
+
+import flow_solver
+from instance import Instance
+from native_solver import move_arrays, EPS, GAP_TOL
+from presolve import dominated_pairs
+
+# Máximo de estados por etapa; al superarlo se conservan los de mejor cota y
+# la solución deja de estar demostrada óptima (estado SATISFIED). También
+# acota las celdas (opciones x arcos) de todas las tablas de opciones y el
+# número estimado de estados (ver estimated_states)
+STATE_LIMIT = 1 << 20
+
+# Tamaño máximo de cada bloque de combinaciones estado x opción (el tiempo
+# se revisa entre bloques: uno se poda en unas centésimas de segundo)
+CHUNK = 1 << 18
+
+# Múltiplos del precio lagrangiano del flujo con que se calculan las cotas
+PRICE_FACTORS = (0.0, 0.5, 1.0, 2.0)
+
+def _same_distance_front(dists, costs, gains):
+  """
+  Estados no dominados con la misma distancia: por distancia, los de costo
+  creciente con ganancia estrictamente creciente (entre iguales queda uno)
+  Returns: índices ordenados por distancia y costo
+  """
+  order = np.lexsort((-gains, costs, dists))
+  d = dists[order]
+  # Ganancia por rango (enteros exactos) desplazada por grupo de distancia,
+  # así el máximo acumulado no cruza de una distancia a otra
+  ranks = np.unique(np.round(gains[order], 9), return_inverse=True)[1].astype(np.int64)
+  first = np.r_[True, d[1:] != d[:-1]]
+  shifted = ranks + (np.cumsum(first) - 1) * (int(ranks.max()) + 1)
+  previous = np.r_[-1, np.maximum.accumulate(shifted)[:-1]]
+  return order[first | (shifted > previous)]
+
+def pareto(dists, costs, gains, across=True):
+  """
+  Estados no dominados: otro con distancia y costo menores o iguales y
+  ganancia mayor o igual lo descarta
+  across: comparar también entre distancias distintas (si no, solo dentro de
+          cada distancia, que es más barato)
+  Returns: índices de los estados que quedan, ordenados por distancia y costo
+  """
+  if len(dists) == 0:
+    return np.zeros(0, dtype=np.int64)
+  kept = _same_distance_front(dists, costs, gains)
+  d = dists[kept]
+  starts = np.flatnonzero(np.r_[True, d[1:] != d[:-1]])
+  if not across or len(starts) == 1:
+    return kept
+  c, g = costs[kept], np.round(gains[kept], 9)
+  ends = np.r_[starts[1:], len(kept)]
+  keep = np.ones(len(kept), dtype=bool)
+  # Frente acumulado de las distancias menores: costo creciente, ganancia creciente
+  front_c, front_g = c[starts[0]:ends[0]], g[starts[0]:ends[0]]
+  for a, b in zip(starts[1:].tolist(), ends[1:].tolist()):
+    pos = np.searchsorted(front_c, c[a:b], side='right') - 1
+    beaten = (pos >= 0) & (front_g[np.maximum(pos, 0)] >= g[a:b])
+    keep[a:b] = ~beaten
+    if beaten.all():
+      continue
+    merged_c = np.concatenate((front_c, c[a:b][~beaten]))
+    merged_g = np.concatenate((front_g, g[a:b][~beaten]))
+    order = np.lexsort((-merged_g, merged_c))
+    merged_c, merged_g = merged_c[order], merged_g[order]
+    rising = np.r_[True, merged_g[1:] > np.maximum.accumulate(merged_g)[:-1]]
+    front_c, front_g = merged_c[rising], merged_g[rising]
+  return kept[keep]
+
+class _Fallback(Exception):
+  """La programación dinámica no cabe en los límites: se responde con el flujo"""
+
+def estimated_states(inst):
+  """
+  Estimación gruesa de los estados (distancia, costo) de una etapa: las
+  distancias posibles por las personas que se pueden mover (cada una agrega
+  al menos un costo distinto por distancia)
+  Returns: int
+  """
+  dist_limit = int(inst.maxM)
+  return (dist_limit + 1) * int(np.minimum(inst.p, dist_limit).sum())
+
+class _Options:
+  """
+  Envíos no dominados de un origen: distancia, costo y ganancia de cada uno y
+  cuántas personas van por cada arco (counts, una fila por opción; la
+  primera es no mover a nadie)
+  cell_limit: máximo de celdas de counts; si se supera, o si expired() se
+              cumple entre capas, lanza _Fallback
+  """
+
+  def __init__(self, gains, costs, dists, cap, dist_limit, cost_limit, cell_limit=None, expired=None):
+    k = len(gains)
+    cells = k
+    d = np.zeros(1, dtype=np.int64)
+    c = np.zeros(1)
+    g = np.zeros(1)
+    counts = np.zeros((1, k), dtype=np.int64)
+    parts = [(d, c, g, counts)]
+    # Capa t: envíos de exactamente t personas (con la misma cantidad, el
+    # dominado nunca conviene)
+    for _ in range(int(cap)):
+      if expired is not None and expired():
+        raise _Fallback
+      nd = (d[:, None] + dists[None, :]).ravel()
+      nc = (c[:, None] + costs[None, :]).ravel()
+      ng = (g[:, None] + gains[None, :]).ravel()
+      valid = np.flatnonzero((nd <= dist_limit) & (nc <= cost_limit + EPS))
+      if len(valid) == 0:
+        break
+      keep = valid[pareto(nd[valid], nc[valid], ng[valid], across=False)]
+      cells += len(keep) * k
+      if cell_limit is not None and cells > cell_limit:
+        raise _Fallback
+      parents, arcs = np.divmod(keep, k)
+      d, c, g = nd[keep], nc[keep], ng[keep]
+      counts = counts[parents].copy()
+      counts[np.arange(len(keep)), arcs] += 1
+      parts.append((d, c, g, counts))
+    d, c, g, counts = (np.concatenate(arrays) for arrays in zip(*parts))
+    keep = pareto(d, c, g)
+    self.dists, self.costs, self.gains, self.counts = d[keep], c[keep], g[keep], counts[keep]
+
+  @property
+  def cells(self):
+    """Celdas de la tabla counts"""
+    return self.counts.size
+
+  def best_by_distance(self, dist_limit, price):
+    """
+    Returns: arreglo (dist_limit + 1) con la mayor ganancia - price * costo
+             usando distancia menor o igual a cada valor
+    """
+    best = np.zeros(dist_limit + 1)
+    np.maximum.at(best, self.dists, self.gains - price * self.costs)
+    return np.maximum.accumulate(best)
+
+def _remaining_bounds(options, dist_limit, price, expired=None):
+  """
+  Cotas de lo que falta con ct relajado al precio price: bounds[s][r] es la
+  mayor ganancia - price * costo de los orígenes s, s+1, ... con distancia r
+  (convolución max-plus hacia atrás)
+  expired: función opcional; si se cumple entre orígenes lanza _Fallback
+  Returns: arreglo (len(options) + 1, dist_limit + 1)
+  """
+  bounds = np.zeros((len(options) + 1, dist_limit + 1))
+  for stage in range(len(options) - 1, -1, -1):
+    if expired is not None and expired():
+      raise _Fallback
+    option = options[stage]
+    best = option.best_by_distance(dist_limit, price)
+    after = bounds[stage + 1]
+    total = after.copy()
+    for delta in np.unique(option.dists).tolist():
+      if delta == 0:
+        continue
+      np.maximum(total[delta:], best[delta] + after[:dist_limit + 1 - delta], out=total[delta:])
+    bounds[stage] = np.maximum.accumulate(total)
+  return bounds
+
+def solve(data, time_limit=None, stop_event=None, state_limit=STATE_LIMIT):
+  """
+  Resuelve la instancia de forma exacta por programación dinámica
+  data: dict con n, m, p, ext, ce, c, ct, maxM (como parse_data_file)
+  time_limit: segundos máximos (None = sin límite); al agotarse se devuelve
+              la mejor solución encontrada (la del flujo si todavía no
+              empezaron las etapas)
+  stop_event: threading.Event opcional para detener la búsqueda
+  state_limit: estados por etapa, celdas de las tablas de opciones y estados
+               estimados (ver STATE_LIMIT); por encima, se responde con el flujo
+  Returns: dict con x, f, extremismo_total, status (OPTIMAL si se recorrieron
+           todos los estados), bound (cota inferior del objetivo), states
+           (estados generados), fallback (True si la respuesta es la del
+           flujo) y time
+  """
+  start = time.monotonic()
+  deadline = start + time_limit if time_limit else None
+  inst = Instance.from_data(data)
+  base = float(inst.p @ inst.ext)
+  dist_limit = int(inst.maxM)
+  ct = float(inst.ct)
+
+  def expired():
+    """True si se agotó el tiempo o se pidió detener la búsqueda"""
+    return (deadline is not None and time.monotonic() > deadline) or \
+           (stop_event is not None and stop_event.is_set())
+
+  # Incumbente y precio de ct del flujo lagrangiano (si el flujo falla, la
+  # búsqueda arranca sin incumbente, la cota ignora ct y la de respaldo es
+  # la de mover a todos a la opinión menos extrema)
+  try:
+    flow = flow_solver.solve(inst)
+  except Exception:
+    flow = {'x': np.zeros((inst.m, inst.m), dtype=np.int64), 'extremismo_total': base, 'lam': 0.0,
+            'status': 'SATISFIED', 'bound': float(inst.p.sum() * inst.ext.min())}
+  best_gain, best_state = base - flow['extremismo_total'], None
+  prices = sorted({flow['lam'] * factor for factor in PRICE_FACTORS})
+
+  def fallback(states=0):
+    """Respuesta del flujo cuando la programación dinámica no cabe o no alcanza a empezar"""
+    x = np.asarray(flow['x'], dtype=np.int64)
+    return {
+      'x': x.tolist(),
+      'f': inst.final_distribution(x).tolist(),
+      'extremismo_total': inst.objective(x),
+      'status': flow['status'],
+      'bound': flow['bound'],
+      'states': states,
+      'fallback': True,
+      'time': time.monotonic() - start
+    }
+
+  if estimated_states(inst) > state_limit:
+    return fallback()
+
+  rows, cols, gains, costs, dists, _ = move_arrays(inst)
+  keep = ~dominated_pairs(rows, gains, costs, dists)
+  rows, cols, gains, costs, dists = rows[keep], cols[keep], gains[keep], costs[keep], dists[keep]
+  sources, starts = np.unique(rows, return_index=True)
+  ends = np.r_[starts[1:], len(rows)]
+  options = []
+  cells_left = state_limit
+  try:
+    for i, a, b in zip(sources.tolist(), starts.tolist(), ends.tolist()):
+      option = _Options(gains[a:b], costs[a:b], dists[a:b].astype(np.int64),
+                        min(int(inst.p[i]), dist_limit), dist_limit, ct, cells_left, expired)
+      cells_left -= option.cells
+      options.append(option)
+    bounds = [(price, _remaining_bounds(options, dist_limit, price, expired)) for price in prices]
+  except _Fallback:
+    return fallback()
+
+  def optimistic(stage, d, c, g):
+    """Cota de la ganancia final de cada estado tras la etapa stage"""
+    value = np.full(len(d), np.inf)
+    for price, table in bounds:
+      np.minimum(value, g + table[stage + 1][dist_limit - d] + price * (ct - c), out=value)
+    return value
+
+  def prune(stage, d, c, g, parents, choices):
+    """Dominancia y cota sobre los estados candidatos de una etapa"""
+    kept = pareto(d, c, g)
+    kept = kept[optimistic(stage, d[kept], c[kept], g[kept]) > best_gain + GAP_TOL]
+    return d[kept], c[kept], g[kept], parents[kept], choices[kept]
+
+  # Estados: arreglos paralelos; por etapa se guarda de qué estado anterior y
+  # con qué opción del origen viene cada uno
+  d, c, g = np.zeros(1, dtype=np.int64), np.zeros(1), np.zeros(1)
+  history = []
+  states = 1
+  proven = True
+  for stage, option in enumerate(options):
+    if len(d) == 0:
+      break
+    if expired():
+      proven = False
+      break
+    # Cada estado con cada opción, por bloques que se podan al acumularse; el
+    # tiempo se revisa en cada bloque (el incumbente ya es una solución completa)
+    block = max(1, CHUNK // len(d))
+    empty = np.zeros(0, dtype=np.int64)
+    current = (empty, np.zeros(0), np.zeros(0), empty, empty)
+    for first in range(0, len(option.dists), block):
+      if first > 0 and expired():
+        proven = False
+        break
+      od = option.dists[first:first + block]
+      nd = (d[:, None] + od[None, :]).ravel()
+      nc = (c[:, None] + option.costs[first:first + block][None, :]).ravel()
+      ng = (g[:, None] + option.gains[first:first + block][None, :]).ravel()
+      valid = np.flatnonzero((nd <= dist_limit) & (nc <= ct + EPS))
+      states += len(valid)
+      if len(valid) == 0:
+        continue
+      parents, choices = np.divmod(valid, len(od))
+      # Todo estado es una solución factible (los orígenes que faltan no mueven)
+      top = valid[np.argmax(ng[valid])]
+      if ng[top] > best_gain + EPS:
+        best_gain = float(ng[top])
+        best_state = (stage, int(top // len(od)), int(top % len(od)) + first)
+      current = prune(stage, *(np.concatenate(pair) for pair in zip(
+        current, (nd[valid], nc[valid], ng[valid], parents, choices + first))))
+    if not proven:
+      break
+    d, c, g, parents, choices = current
+    if len(d) > state_limit:
+      # Se conservan los de mejor cota; la solución ya no queda demostrada
+      proven = False
+      ranked = np.sort(np.argsort(-optimistic(stage, d, c, g), kind='stable')[:state_limit])
+      d, c, g, parents, choices = d[ranked], c[ranked], g[ranked], parents[ranked], choices[ranked]
+    history.append((parents, choices))
+
+  if best_state is None:
+    x = np.asarray(flow['x'], dtype=np.int64)
+  else:
+    # Reconstrucción: desde el mejor estado hacia atrás por etapa
+    x = np.zeros((inst.m, inst.m), dtype=np.int64)
+    stage, index, choice = best_state
+    while True:
+      a, b = starts[stage], ends[stage]
+      x[rows[a:b], cols[a:b]] += options[stage].counts[choice]
+      stage -= 1
+      if stage < 0:
+        break
+      parents, choices = history[stage]
+      index, choice = parents[index], choices[index]
+
+  upper = best_gain
+  if not proven:
+    upper = max(best_gain, min(float(table[0][dist_limit]) + price * ct for price, table in bounds))
+  return {
+    'x': x.tolist(),
+    'f': inst.final_distribution(x).tolist(),
+    'extremismo_total': inst.objective(x),
+    'status': 'OPTIMAL' if proven else 'SATISFIED',
+    'bound': base - upper,
+    'states': states,
+    'fallback': False,
+    'time': time.monotonic() - start
+  }
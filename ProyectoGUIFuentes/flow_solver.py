@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor de flujo con relajación lagrangiana del costo (ct)
+Sin el presupuesto ct, MinExt es un problema de transporte: cada opinión i
+ofrece p_i personas, los destinos no tienen capacidad y cada persona que va de
+i a j gana ext[i] - ext[j] y consume |j - i| de maxM. Con un precio lam para
+ct, la ganancia de cada arco pasa a ser ganancia - lam * costo y el transporte
+con presupuesto de longitud se resuelve exacto en la relajación continua: con
+un precio mu para maxM, cada origen envía todo por su mejor arco, y la
+bisección en mu (y luego en lam) encuentra los precios que agotan los
+presupuestos. Cualquier par (lam, mu) da una cota válida, y los flujos enteros
+de cada evaluación, completados con un voraz por precio dual, dan soluciones
+factibles; si la mejor alcanza la cota, es óptima.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from instance import Instance
+from native_solver import move_arrays, EPS, GAP_TOL
+from presolve import dominated_pairs
+
+# Pasos máximos de bisección por multiplicador (cada uno parte el intervalo a
+# la mitad) y ancho relativo con el que se detiene
+BISECTION_STEPS = 48
+BISECTION_TOL = 1e-9
+
+# Holgura de la cota inferior que se agrega al modelo (como BOUND_SLACK de la
+# heurística, para no perder el óptimo por redondeo del float)
+BOUND_SLACK = 1e-6
+
+class _Network:
+  """
+  Red de transporte: arcos (i, j) útiles agrupados por origen, como los
+  entrega move_arrays, con la oferta p de cada origen. Los arcos dominados por
+  otro del mismo origen (presolve.dominated_pairs) nunca son el mejor para
+  ningún precio, así que se quitan antes de la bisección
+  """
+
+  def __init__(self, inst):
+    rows, cols, gains, costs, dists, _ = move_arrays(inst)
+    keep = ~dominated_pairs(rows, gains, costs, dists)
+    self.rows, self.cols, self.gains, self.costs = rows[keep], cols[keep], gains[keep], costs[keep]
+    self.dists = dists[keep].astype(float)
+    rows = self.rows
+    sources, self.starts, counts = np.unique(rows, return_index=True, return_counts=True)
+    self.groups = np.repeat(np.arange(len(sources)), counts)
+    self.caps = inst.p[sources].astype(float)
+    self.ct = float(inst.ct)
+    self.maxM = float(inst.maxM)
+    self.work = np.empty_like(self.gains)
+    # Flujos enteros factibles vistos durante la bisección (candidatos)
+    self.best_gain = 0.0
+    self.best_flow = (np.zeros(0, dtype=np.int64), np.zeros(0))
+
+  def route(self, profits, mu):
+    """
+    Flujo óptimo con precio mu para maxM: cada origen envía toda su oferta por
+    el arco de mayor profits - mu * distancia (si es positivo)
+    Returns: (valor dual sin el término de maxM, flujo entero como (arcos, cantidades))
+    """
+    work = self.work
+    np.multiply(self.dists, -mu, out=work)
+    work += profits
+    best = np.maximum.reduceat(work, self.starts)
+    # Primer arco de cada origen que alcanza su máximo
+    hits = np.flatnonzero(work == best[self.groups])
+    first = hits[np.r_[True, self.groups[hits][1:] != self.groups[hits][:-1]]]
+    active = best > 0
+    return float(self.caps @ np.maximum(best, 0.0)), (first[active], self.caps[active])
+
+  def usage(self, flow, resource):
+    """Consumo de un recurso (costs o dists) de un flujo (arcos, cantidades)"""
+    arcs, amounts = flow
+    return float(resource[arcs] @ amounts)
+
+  def dense(self, flow):
+    """Flujo (arcos, cantidades) como arreglo por arco"""
+    values = np.zeros(len(self.gains))
+    values[flow[0]] = flow[1]
+    return values
+
+  def record(self, flow):
+    """Guarda el flujo entero si es factible y mejor que el incumbente"""
+    if self.usage(flow, self.costs) <= self.ct + EPS and self.usage(flow, self.dists) <= self.maxM + EPS:
+      gain = self.usage(flow, self.gains)
+      if gain > self.best_gain + EPS:
+        self.best_gain, self.best_flow = gain, flow
+
+  def transport(self, lam):
+    """
+    Transporte continuo con presupuesto de longitud maxM y ganancias
+    gains - lam * costs, por bisección en el precio mu
+    Returns: (cota de la ganancia lagrangiana, flujo continuo óptimo por arco, mu)
+    """
+    profits = self.gains - lam * self.costs
+    value, flow = self.route(profits, 0.0)
+    self.record(flow)
+    if self.usage(flow, self.dists) <= self.maxM:
+      return value, self.dense(flow), 0.0
+
+    # mu_high anula todos los arcos; el óptimo combina los flujos de los extremos
+    low, high = 0.0, float(np.max(profits / self.dists))
+    low_flow, high_flow = flow, self.route(profits, high)[1]
+    bound = value
+    for _ in range(BISECTION_STEPS):
+      if high - low <= BISECTION_TOL * high:
+        break
+      mu = (low + high) / 2
+      value, flow = self.route(profits, mu)
+      bound = min(bound, value + mu * self.maxM)
+      self.record(flow)
+      if self.usage(flow, self.dists) > self.maxM:
+        low, low_flow = mu, flow
+      else:
+        high, high_flow = mu, flow
+    return bound, _combine(self.dense(low_flow), self.dense(high_flow), self.dists, self.maxM), high
+
+  def relax(self):
+    """
+    Minimiza el dual lagrangiano de ct por bisección en lam
+    Returns: (cota de la ganancia, flujo continuo por arco, lam, mu)
+    """
+    value, flow, mu = self.transport(0.0)
+    if self.costs @ flow <= self.ct:
+      return value, flow, 0.0, mu
+
+    positive = self.costs > 0
+    low, high = 0.0, float(np.max(self.gains[positive] / self.costs[positive]))
+    low_flow, high_flow = flow, np.zeros(len(self.gains))
+    high_mu = 0.0
+    bound = value
+    for _ in range(BISECTION_STEPS):
+      if high - low <= BISECTION_TOL * high:
+        break
+      lam = (low + high) / 2
+      value, flow, mu = self.transport(lam)
+      bound = min(bound, value + lam * self.ct)
+      if self.costs @ flow > self.ct:
+        low, low_flow = lam, flow
+      else:
+        high, high_flow, high_mu = lam, flow, mu
+    return bound, _combine(low_flow, high_flow, self.costs, self.ct), high, high_mu
+
+  def fill(self, flow, lam, mu):
+    """
+    Redondea el flujo hacia abajo y agrega unidades por ganancia sobre el precio
+    dual de los recursos mientras sean factibles
+    Returns: flujo entero (arcos, cantidades)
+    """
+    values = np.floor(flow + 1e-7)
+    caps = self.caps - np.bincount(self.groups, weights=values, minlength=len(self.caps))
+    cost_left = self.ct - float(self.costs @ values)
+    dist_left = self.maxM - float(self.dists @ values)
+    if caps.min() < -EPS or cost_left < -EPS or dist_left < -EPS:
+      # El redondeo no cabe (la combinación convexa roza ct o maxM): el voraz
+      # arranca desde el flujo vacío
+      values = np.zeros(len(values))
+      caps = self.caps.copy()
+      cost_left, dist_left = self.ct, self.maxM
+    # Solo los arcos que todavía caben (tras redondear queda poco presupuesto)
+    fits = np.flatnonzero((self.dists <= dist_left) & (self.costs <= cost_left + EPS) &
+                          (caps[self.groups] >= 1))
+    price = np.maximum(lam * self.costs[fits] + mu * self.dists[fits], EPS)
+    for k in fits[np.argsort(-self.gains[fits] / price, kind='stable')].tolist():
+      if dist_left < 1:
+        break
+      room = min(caps[self.groups[k]], dist_left // self.dists[k])
+      if self.costs[k] > 0:
+        room = min(room, (cost_left + EPS) // self.costs[k])
+      if room > 0:
+        values[k] += room
+        caps[self.groups[k]] -= room
+        cost_left -= room * self.costs[k]
+        dist_left -= room * self.dists[k]
+    arcs = np.flatnonzero(values)
+    return arcs, values[arcs]
+
+def _combine(low_flow, high_flow, usage, limit):
+  """
+  Combinación convexa de los flujos de los extremos de la bisección que usa
+  exactamente limit del recurso (low_flow lo excede, high_flow no)
+  """
+  low_use, high_use = float(usage @ low_flow), float(usage @ high_flow)
+  if low_use - high_use <= EPS:
+    return high_flow
+  theta = (limit - high_use) / (low_use - high_use)
+  return theta * low_flow + (1.0 - theta) * high_flow
+
+def lagrangian_bound(data):
+  """
+  Cota superior de la ganancia (extremismo inicial menos el final) por el dual
+  lagrangiano de ct y maxM, igual a la de la relajación lineal
+  Returns: (valor, lam, mu)
+  """
+  net = _Network(Instance.from_data(data))
+  if len(net.gains) == 0:
+    return 0.0, 0.0, 0.0
+  bound, _, lam, mu = net.relax()
+  return bound, lam, mu
+
+def solve(data):
+  """
+  Resuelve la relajación lagrangiana de ct sobre el transporte con maxM
+  data: dict con n, m, p, ext, ce, c, ct, maxM (como parse_data_file)
+  Returns: dict con x, f, extremismo_total, status (OPTIMAL si la solución
+           alcanza la cota), bound (cota inferior del objetivo), lam y mu
+           (precios de ct y maxM) y time
+  """
+  start = time.monotonic()
+  inst = Instance.from_data(data)
+  base = float(inst.p @ inst.ext)
+  x = np.zeros((inst.m, inst.m), dtype=np.int64)
+  net = _Network(inst)
+
+  bound, lam, mu = 0.0, 0.0, 0.0
+  if len(net.gains):
+    bound, flow, lam, mu = net.relax()
+    for candidate in (flow, net.dense(net.best_flow)):
+      net.record(net.fill(candidate, lam, mu))
+    arcs, amounts = net.best_flow
+    x[net.rows[arcs], net.cols[arcs]] = amounts.astype(np.int64)
+
+  gain = net.best_gain
+  return {
+    'x': x.tolist(),
+    'f': inst.final_distribution(x).tolist(),
+    'extremismo_total': inst.objective(x),
+    'status': 'OPTIMAL' if bound - gain <= GAP_TOL else 'SATISFIED',
+    'bound': base - max(bound, gain),
+    'lam': lam,
+    'mu': mu,
+    'time': time.monotonic() - start
+  }
+
+def write_bound_model(lower, path=None):
+  """
+  Escribe un fragmento .mzn que acota el objetivo por abajo con la cota del
+  flujo; MiniZinc termina apenas encuentra una solución que la alcanza
+  path: destino (por defecto un temporal que el llamador debe borrar)
+  Returns: Path del archivo
+  """
+  if path is None:
+    fd, path = tempfile.mkstemp(prefix="minext-cota-flujo-", suffix=".mzn")
+    os.close(fd)
+  bound = lower - BOUND_SLACK * max(1.0, abs(lower))
+  path = Path(path)
+  with open(path, 'w', encoding='utf-8') as f:
+    f.write("% Cota inferior del objetivo obtenida con el flujo lagrangiano\n")
+    f.write(f"constraint extremismo_total >= {bound!r};\n")
+  return path
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché de modelos compilados (FlatZinc + ozn)
+Guarda en disco el resultado de "minizinc -c" bajo un hash del texto del modelo,
+del archivo de datos y de las opciones de compilación, para que las ejecuciones
+repetidas entreguen el .fzn directamente al solver sin volver a aplanar. Las
+cotas del objetivo (heurística, flujo) cambian en cada ejecución, así que no
+forman parte de la clave: se agregan a una copia del .fzn ya compilado. Cada
+ejecución reserva su entrada hasta terminar y la limpieza nunca borra una
+entrada reservada, aunque la haya reservado otro proceso.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+# Se incrementa si cambia la forma de guardar las entradas
+CACHE_VERSION = 1
+
+FZN_NAME = "model.fzn"
+OZN_NAME = "model.ozn"
+
+# Prefijo de los archivos de reserva de una entrada (".uso-<pid>-<id>")
+LEASE_PREFIX = ".uso-"
+
+# Fragmento de write_bound_model (heuristic.py, flow_solver.py): una cota del objetivo
+BOUND_PATTERN = re.compile(r"constraint\s+extremismo_total\s*(<=|>=)\s*([-+0-9.eE]+)\s*;")
+
+# Variable objetivo del ítem solve del FlatZinc
+OBJECTIVE_PATTERN = re.compile(r"^solve\b.*\b(?:minimize|maximize)\s+([A-Za-z_][A-Za-z0-9_]*)\s*;", re.M)
+
+class CompilationError(RuntimeError):
+  """Error de MiniZinc al compilar el modelo con los datos"""
+
+def read_bound(path):
+  """
+  Lee un fragmento escrito por write_bound_model
+  Returns: (operador, valor), o None si el fragmento tiene otras restricciones
+  """
+  with open(path, encoding='utf-8') as f:
+    lines = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('%')]
+  match = BOUND_PATTERN.fullmatch(lines[0]) if len(lines) == 1 else None
+  if match is None:
+    return None
+  try:
+    return match.group(1), float(match.group(2))
+  except ValueError:
+    return None
+
+def split_bounds(extra_models):
+  """
+  Separa las cotas del objetivo del resto de los fragmentos
+  Returns: (lista de (operador, valor), fragmentos que se compilan con el modelo)
+  """
+  bounds, models = [], []
+  for path in extra_models or []:
+    bound = read_bound(path)
+    if bound is None:
+      models.append(path)
+    else:
+      bounds.append(bound)
+  return bounds, models
+
+def _process_alive(pid):
+  """True si el proceso pid sigue corriendo (sus reservas siguen vigentes)"""
+  if pid == os.getpid() or os.name == 'nt':
+    # En Windows no hay señal 0: las reservas de otro proceso se respetan
+    # siempre y las huérfanas se quitan con clear()
+    return True
+  try:
+    os.kill(pid, 0)
+  except ProcessLookupError:
+    return False
+  except OSError:
+    return True
+  return True
+
+class FlatZincCache:
+  """
+  Caché LRU en disco de modelos aplanados, acotada por número de entradas y bytes
+  Cada entrada es un directorio <hash>/ con model.fzn y model.ozn; la fecha de
+  modificación del directorio se actualiza en cada acierto y marca el uso reciente.
+  compile() reserva la entrada con un archivo .uso-<pid>-<id> que release() borra;
+  evict() salta las entradas reservadas por un proceso vivo.
+  """
+
+  def __init__(self, cache_dir, max_entries=64, max_bytes=256 * 1024 * 1024):
+    self.cache_dir = Path(cache_dir)
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    self._minizinc_version = None
+    # .fzn entregado -> archivos de reserva de este proceso
+    self._leases = {}
+    self._lock = threading.Lock()
+
+  def minizinc_version(self):
+    """Versión de MiniZinc (forma parte de la clave: otro compilador, otro FlatZinc)"""
+    if self._minizinc_version is None:
+      result = subprocess.run(['minizinc', '--version'], capture_output=True, text=True, timeout=10)
+      self._minizinc_version = result.stdout.strip()
+    return self._minizinc_version
+
+  def key(self, model_file, dzn_file, solver="Gecode", compile_args=None, extra_models=None):
+    """
+    Hash de contenido de (modelo, fragmentos adicionales, datos, opciones de compilación)
+    Returns: str hexadecimal
+    """
+    digest = hashlib.sha256()
+    options = {
+      'version': CACHE_VERSION,
+      'minizinc': self.minizinc_version(),
+      'solver': solver,
+      'args': list(compile_args or [])
+    }
+    digest.update(json.dumps(options, sort_keys=True).encode('utf-8'))
+    for path in (model_file, *(extra_models or []), dzn_file):
+      digest.update(b'\0')
+      with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+          digest.update(chunk)
+    return digest.hexdigest()
+
+  def lookup(self, key):
+    """
+    Busca una entrada, la marca como usada y la reserva (ver release)
+    Returns: (fzn, ozn, archivo de reserva) como Path, o None si no está
+    """
+    entry = self.cache_dir / key
+    fzn, ozn = entry / FZN_NAME, entry / OZN_NAME
+    if not (fzn.exists() and ozn.exists()):
+      return None
+    lease = entry / f"{LEASE_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:12]}"
+    try:
+      lease.touch(exist_ok=False)
+      os.utime(entry)
+    except OSError:
+      return None
+    # La limpieza de otro proceso pudo borrar la entrada antes de la reserva
+    if not (fzn.exists() and ozn.exists()):
+      _remove(lease)
+      return None
+    return fzn, ozn, lease
+
+  def compile(self, model_file, dzn_file, solver="Gecode", compile_args=None, extra_models=None):
+    """
+    Compila (o reutiliza) el modelo con los datos y reserva la entrada hasta
+    que se llame release(fzn)
+    extra_models: fragmentos .mzn que se compilan junto al modelo; las cotas de
+                  write_bound_model no entran en la clave, se agregan al .fzn
+    Returns: (fzn, ozn) como Path dentro de la caché
+    """
+    bounds, models = split_bounds(extra_models)
+    fzn, ozn, lease = self._compile(model_file, dzn_file, solver, compile_args, models)
+    if bounds:
+      bounded = self._bound(fzn, lease, bounds)
+      if bounded is None:
+        # Sin objetivo reconocible en el FlatZinc la cota se compila con el modelo
+        _remove(lease)
+        fzn, ozn, lease = self._compile(model_file, dzn_file, solver, compile_args, extra_models)
+      else:
+        fzn = bounded
+    with self._lock:
+      self._leases.setdefault(str(fzn), []).append(lease)
+    return fzn, ozn
+
+  def _compile(self, model_file, dzn_file, solver, compile_args, extra_models):
+    """
+    Busca la entrada y, si no está, la compila y la publica ya reservada
+    Returns: (fzn, ozn, archivo de reserva) como en lookup
+    """
+    key = self.key(model_file, dzn_file, solver, compile_args, extra_models)
+    cached = self.lookup(key)
+    if cached is not None:
+      self.hits += 1
+      return cached
+
+    self.misses += 1
+    self.cache_dir.mkdir(parents=True, exist_ok=True)
+    entry = self.cache_dir / key
+    # Se compila en un directorio temporal y se publica con un rename atómico,
+    # así otro proceso nunca ve una entrada a medio escribir; la reserva se crea
+    # antes de publicar para que ninguna limpieza la alcance sin reservar
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.cache_dir))
+    try:
+      cmd = ["minizinc", "-c", "--solver", solver,
+             "--fzn", str(tmp_dir / FZN_NAME), "--ozn", str(tmp_dir / OZN_NAME)]
+      cmd += list(compile_args or [])
+      cmd += [str(model_file)] + [str(path) for path in extra_models or []] + [str(dzn_file)]
+      result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
+      if result.returncode != 0:
+        raise CompilationError(result.stderr.strip() or result.stdout.strip())
+      lease_name = f"{LEASE_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:12]}"
+      (tmp_dir / lease_name).touch()
+      try:
+        os.replace(tmp_dir, entry)
+      except OSError:
+        # Otro proceso publicó la misma entrada mientras se compilaba
+        cached = self.lookup(key)
+        if cached is not None:
+          return cached
+        os.replace(tmp_dir, entry)
+    finally:
+      if tmp_dir.exists():
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    self.evict(keep=key)
+    return entry / FZN_NAME, entry / OZN_NAME, entry / lease_name
+
+  def _bound(self, fzn, lease, bounds):
+    """
+    Copia el .fzn con las cotas del objetivo como restricciones float_le antes
+    del ítem solve; la copia es de esta reserva y release() la borra
+    bounds: lista de (operador, valor) como split_bounds
+    Returns: Path de la copia, o None si el FlatZinc no tiene objetivo
+    """
+    text = fzn.read_text(encoding='utf-8')
+    match = OBJECTIVE_PATTERN.search(text)
+    if match is None:
+      return None
+    objective = match.group(1)
+    constraints = ''.join(
+      f"constraint float_le({objective}, {value!r});\n" if operator == '<=' else
+      f"constraint float_le({value!r}, {objective});\n"
+      for operator, value in bounds
+    )
+    bounded = fzn.with_name(f"cota{lease.name[len(LEASE_PREFIX) - 1:]}.fzn")
+    bounded.write_text(text[:match.start()] + constraints + text[match.start():], encoding='utf-8')
+    return bounded
+
+  def release(self, fzn_file):
+    """
+    Libera la reserva que hizo compile() para el .fzn que entregó (y borra la
+    copia con cotas, si la había)
+    """
+    fzn_file = Path(fzn_file)
+    with self._lock:
+      leases = self._leases.get(str(fzn_file))
+      if not leases:
+        return
+      lease = leases.pop()
+      if not leases:
+        del self._leases[str(fzn_file)]
+    _remove(lease)
+    if fzn_file.name != FZN_NAME:
+      _remove(fzn_file)
+
+  def in_use(self, entry):
+    """True si algún proceso vivo tiene reservada la entrada"""
+    try:
+      names = [path.name for path in entry.iterdir()]
+    except OSError:
+      return False
+    for name in names:
+      if name.startswith(LEASE_PREFIX):
+        pid = name[len(LEASE_PREFIX):].split('-', 1)[0]
+        if pid.isdigit() and _process_alive(int(pid)):
+          return True
+    return False
+
+  def entries(self):
+    """
+    Returns: lista de (último_uso, bytes, directorio) de las entradas publicadas
+    """
+    if not self.cache_dir.exists():
+      return []
+    result = []
+    for entry in self.cache_dir.iterdir():
+      if not entry.is_dir() or entry.name.startswith('.'):
+        continue
+      try:
+        size = sum(f.stat().st_size for f in entry.iterdir())
+        result.append((entry.stat().st_mtime, size, entry))
+      except OSError:
+        continue
+    return result
+
+  def evict(self, keep=None):
+    """
+    Elimina las entradas usadas hace más tiempo hasta respetar los límites; las
+    reservadas y la de clave keep (la que se está entregando) no se tocan
+    aunque solas excedan los límites
+    Returns: int - entradas eliminadas
+    """
+    entries = sorted(self.entries())
+    count = len(entries)
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, entry in entries:
+      if count <= self.max_entries and total <= self.max_bytes:
+        break
+      if entry.name == keep or self.in_use(entry):
+        continue
+      shutil.rmtree(entry, ignore_errors=True)
+      count -= 1
+      total -= size
+      removed += 1
+    return removed
+
+  def clear(self):
+    """Elimina todas las entradas que no estén reservadas"""
+    for _, _, entry in self.entries():
+      if not self.in_use(entry):
+        shutil.rmtree(entry, ignore_errors=True)
+
+def _remove(path):
+  """Borra un archivo si existe"""
+  try:
+    os.remove(path)
+  except OSError:
+    pass
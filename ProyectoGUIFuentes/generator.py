@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de instancias sintéticas de MinExt para estudios de escala
+Produce instancias reproducibles (semilla) en formato .txt de DatosProyecto,
+.dzn y binario .mxb, con n y m configurables, opiniones vacías, perfiles de extremismo,
+matrices de costo estructuradas por distancia y recursos ajustados u holgados.
+La matriz c se genera y escribe por bloques de filas, así nunca está completa
+en memoria.
+
+Uso:
+  python ProyectoGUIFuentes/generator.py --sizes 100 1000 10000 --output-dir DatosSinteticos
+  python ProyectoGUIFuentes/generator.py --sizes 500 --profiles polarized linear \\
+      --costs distance random --resources tight loose --count 3 --seed 7
+  python ProyectoGUIFuentes/generator.py --sizes 10000 --formats dzn mxb
+"""
+
+import argparse
+import itertools
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from instance import BinaryWriter, DznWriter, TxtWriter, open_for
+
+# Perfiles de extremismo por posición de la opinión (0 = primera, 1 = última)
+PROFILES = ['uniform', 'polarized', 'linear', 'irregular']
+
+# Estructuras de la matriz de costos
+COSTS = ['random', 'distance', 'quadratic']
+
+# Fracción de la población que los recursos permiten mover
+RESOURCES = {'tight': 0.02, 'loose': 0.25}
+
+# Costo máximo de c y de ce, en la escala de DatosProyecto
+COST_SCALE = 5.0
+EXTRA_SCALE = 20.0
+
+WRITERS = {'txt': TxtWriter, 'dzn': DznWriter, 'mxb': BinaryWriter}
+
+# Elementos de c generados y escritos por bloque
+GENERATE_CHUNK = 1 << 18
+
+def instance_seed(seed, name):
+  """
+  Semilla de una instancia a partir de la semilla global y su nombre, para que
+  cada archivo sea reproducible sin importar qué otras instancias se generen
+  """
+  return np.random.SeedSequence([seed, zlib.crc32(name.encode('utf-8'))])
+
+def extremism(m, profile, rng):
+  """
+  Returns: ext (m,) en [0, 1] con 3 decimales según el perfil
+  """
+  position = np.linspace(0.0, 1.0, m) if m > 1 else np.zeros(m)
+  noise = rng.normal(0.0, 0.03, m)
+  if profile == 'uniform':
+    ext = rng.random(m)
+  elif profile == 'polarized':
+    # Extremos en ambas puntas, moderación en el centro
+    ext = np.abs(2.0 * position - 1.0) ** 1.5 + noise
+  elif profile == 'linear':
+    ext = position + noise
+  elif profile == 'irregular':
+    ext = 0.3 * rng.random(m)
+    spikes = rng.random(m) < 0.1
+    ext[spikes] = 0.7 + 0.3 * rng.random(spikes.sum())
+  else:
+    raise ValueError(f"Perfil de extremismo desconocido: {profile}")
+  return np.round(np.clip(ext, 0.0, 1.0), 3)
+
+def population(n, m, sparsity, rng):
+  """
+  Reparte n personas entre las opiniones; una fracción sparsity queda vacía
+  Returns: p (m,) int64 con suma n
+  """
+  occupied = np.ones(m, dtype=bool)
+  empty = int(round(sparsity * m))
+  if empty >= m:
+    empty = m - 1
+  if empty > 0:
+    occupied[rng.choice(m, empty, replace=False)] = False
+  weights = np.where(occupied, rng.gamma(1.0, 1.0, m), 0.0)
+  return rng.multinomial(n, weights / weights.sum()).astype(np.int64)
+
+def cost_rows(start, stop, m, structure, rng):
+  """
+  Filas start..stop-1 de la matriz de costos (diagonal en 0, 3 decimales)
+  Returns: np.ndarray (stop - start, m)
+  """
+  noise = rng.random((stop - start, m))
+  if structure == 'random':
+    block = noise * COST_SCALE
+  else:
+    rows = np.arange(start, stop)[:, None]
+    distance = np.abs(np.arange(m)[None, :] - rows) / max(m - 1, 1)
+    if structure == 'quadratic':
+      distance = distance ** 2
+    elif structure != 'distance':
+      raise ValueError(f"Estructura de costos desconocida: {structure}")
+    block = COST_SCALE * (0.8 * distance + 0.2 * noise)
+  block = np.round(block, 3)
+  block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+  return block
+
+def generate_instance(output_dir, name, m, n=None, seed=0, sparsity=0.0, profile='uniform',
+                      costs='distance', resources='loose', formats=('txt', 'dzn')):
+  """
+  Genera una instancia y la escribe en los formatos pedidos en una sola pasada
+  n: número de personas (por defecto 10 por opinión)
+  sparsity: fracción de opiniones inicialmente vacías (0 a 1)
+  resources: 'tight', 'loose' o la fracción de la población que se podrá mover
+  Returns: dict con nombre, n, m, ct, maxM y las rutas generadas por formato
+  """
+  n = n if n is not None else 10 * m
+  budget = RESOURCES[resources] if isinstance(resources, str) else float(resources)
+  header_seed, cost_seed = instance_seed(seed, name).spawn(2)
+  rng = np.random.default_rng(header_seed)
+  cost_rng = np.random.default_rng(cost_seed)
+
+  p = population(n, m, sparsity, rng)
+  ext = extremism(m, profile, rng)
+  ce = np.round(rng.random(m) * EXTRA_SCALE, 3)
+
+  output_dir = Path(output_dir)
+  output_dir.mkdir(parents=True, exist_ok=True)
+  paths = {fmt: output_dir / f"{name}.{fmt}" for fmt in formats}
+  files = {fmt: open_for(WRITERS[fmt], path) for fmt, path in paths.items()}
+  try:
+    writers = [WRITERS[fmt](f) for fmt, f in files.items()]
+    for writer in writers:
+      writer.header(n, m, p, ext, ce)
+
+    # Costo unitario medio (restricción 4, sin ce) para calibrar ct
+    factor = 1.0 + p / max(n, 1)
+    weighted = 0.0
+    rows = max(1, GENERATE_CHUNK // m)
+    for start in range(0, m, rows):
+      stop = min(start + rows, m)
+      block = cost_rows(start, stop, m, costs, cost_rng)
+      weighted += float(block.sum(axis=1) @ factor[start:stop])
+      for writer in writers:
+        writer.rows(block)
+
+    pairs = max(m * (m - 1), 1)
+    mean_cost = weighted / pairs
+    mean_distance = (m * m - 1) / (3 * m) if m > 1 else 1.0
+    ct = round(max(budget * n * mean_cost, 0.01), 2)
+    maxM = max(1, int(round(budget * n * mean_distance)))
+    for writer in writers:
+      writer.footer(ct, maxM)
+  finally:
+    for f in files.values():
+      f.close()
+
+  return {'nombre': name, 'n': n, 'm': m, 'ct': ct, 'maxM': maxM,
+          'archivos': {fmt: str(path) for fmt, path in paths.items()}}
+
+def generate_directory(output_dir, sizes, n=None, count=1, seed=0, sparsity=0.0,
+                       profiles=('uniform',), costs=('distance',), resources=('loose',),
+                       formats=('txt', 'dzn'), on_instance=None):
+  """
+  Genera en output_dir una instancia por cada combinación de tamaño, perfil,
+  costos y recursos (count de cada una)
+  on_instance: callback opcional con el resumen de cada instancia generada
+  Returns: lista de resúmenes (ver generate_instance)
+  """
+  generated = []
+  for m, profile, structure, budget, index in itertools.product(
+      sizes, profiles, costs, resources, range(1, count + 1)):
+    name = f"Sintetica_m{m}_{profile}_{structure}_{budget}"
+    if count > 1:
+      name += f"_{index}"
+    summary = generate_instance(output_dir, name, m, n, seed, sparsity, profile,
+                                structure, budget, formats)
+    generated.append(summary)
+    if on_instance:
+      on_instance(summary)
+  return generated
+
+def main(argv=None):
+  """Función principal"""
+  from utils import get_project_paths
+
+  parser = argparse.ArgumentParser(description="Genera instancias sintéticas de MinExt")
+  parser.add_argument('--sizes', nargs='+', type=int, required=True, help="Valores de m")
+  parser.add_argument('--n', type=int, default=None, help="Personas por instancia (por defecto 10*m)")
+  parser.add_argument('--count', type=int, default=1, help="Instancias por combinación")
+  parser.add_argument('--seed', type=int, default=0)
+  parser.add_argument('--sparsity', type=float, default=0.0,
+                      help="Fracción de opiniones inicialmente vacías")
+  parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=['uniform'])
+  parser.add_argument('--costs', nargs='+', choices=COSTS, default=['distance'])
+  parser.add_argument('--resources', nargs='+', choices=list(RESOURCES), default=['loose'])
+  parser.add_argument('--formats', nargs='+', choices=list(WRITERS), default=['txt', 'dzn'])
+  parser.add_argument('--output-dir', type=Path,
+                      default=get_project_paths()['project'] / "DatosSinteticos")
+  args = parser.parse_args(argv)
+
+  def report(summary):
+    print(f"  {summary['nombre']:<45} n={summary['n']:<8} ct={summary['ct']:<10} maxM={summary['maxM']}")
+
+  generated = generate_directory(args.output_dir, args.sizes, args.n, args.count, args.seed,
+                                 args.sparsity, args.profiles, args.costs, args.resources,
+                                 args.formats, on_instance=report)
+  print(f"{len(generated)} instancias generadas en: {args.output_dir}")
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
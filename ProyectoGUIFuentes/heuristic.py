@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Heurística voraz con búsqueda local para MinExt
+Arma en milisegundos un plan de movimientos factible ordenando los movimientos
+por reducción de extremismo por unidad de costo y de distancia, y lo mejora
+quitando unidades de un movimiento y rellenando con los demás (intercambios y
+desplazamientos). El resultado sirve como respuesta inmediata, como incumbente
+inicial del motor nativo y como cota superior del objetivo para MiniZinc.
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from instance import Instance
+from native_solver import move_arrays, EPS
+from solution import Solution
+from bounds import lagrangian_dual
+
+# Destinos candidatos por opinión de origen y por criterio de orden
+CANDIDATES = 8
+
+# Mezclas de costo y distancia con que se ordenan los movimientos del voraz
+MIXES = 5
+
+# Segundos de búsqueda local por defecto
+SEARCH_TIME = 1.0
+
+# Holgura de la cota superior: el objetivo se imprime y compara en float
+BOUND_SLACK = 1e-6
+
+def candidate_moves(data, per_source=CANDIDATES):
+  """
+  Movimientos útiles limitados a los mejores destinos de cada origen (por
+  ganancia, por ganancia/costo y por ganancia/distancia)
+  Returns: (Instance, i, j, ganancia, costo, distancia, cota_superior)
+  """
+  inst = Instance.from_data(data)
+  rows, cols, gains, costs, dists, bounds = move_arrays(inst)
+  if len(rows) == 0:
+    return inst, rows, cols, gains, costs, dists, bounds
+
+  # Selección por fila sobre la matriz m×m (argpartition es lineal en m)
+  keep = np.zeros(len(rows), dtype=bool)
+  matrix = np.empty((inst.m, inst.m))
+  for score in (gains, gains / np.maximum(costs, EPS), gains / dists):
+    matrix.fill(-np.inf)
+    matrix[rows, cols] = score
+    if per_source < inst.m:
+      best = np.argpartition(-matrix, per_source - 1, axis=1)[:, :per_source]
+    else:
+      best = np.broadcast_to(np.arange(inst.m), (inst.m, inst.m))
+    selected = np.zeros((inst.m, inst.m), dtype=bool)
+    np.put_along_axis(selected, best, True, axis=1)
+    keep |= selected[rows, cols]
+  return (inst,) + tuple(array[keep] for array in (rows, cols, gains, costs, dists, bounds))
+
+class _Plan:
+  """Plan de movimientos sobre los candidatos, con relleno voraz en un orden dado"""
+
+  def __init__(self, inst, rows, cols, gains, costs, dists, bounds):
+    self.inst = inst
+    self.rows, self.cols = rows, cols
+    self.gains = gains.tolist()
+    self.costs = costs.tolist()
+    self.dists = dists.tolist()
+    self.bounds = bounds.tolist()
+    self.source = rows.tolist()
+    self.gain_array = gains
+
+    # Precios de los recursos con que se arman los órdenes voraces: mezclas
+    # alpha*costo + (1-alpha)*distancia relativas a su límite y el precio del
+    # dual lagrangiano
+    cost_usage = costs / max(inst.ct, EPS)
+    dist_usage = dists / max(inst.maxM, 1)
+    _, lam, mu = lagrangian_dual(rows, gains, costs, dists, inst.p, inst.ct, inst.maxM)
+    self.prices = [lam * costs + mu * dists]
+    self.prices += [alpha * cost_usage + (1.0 - alpha) * dist_usage
+                    for alpha in np.linspace(0.0, 1.0, MIXES)]
+    self.orders = [np.argsort(-gains / np.maximum(price, EPS), kind='stable').tolist()
+                   for price in self.prices]
+    self.groups = np.split(np.arange(len(rows)), np.flatnonzero(rows[1:] != rows[:-1]) + 1)
+
+  def fill(self, values, order, skip=None):
+    """
+    Agrega unidades en el orden dado mientras sea factible (sin tocar skip)
+    Returns: values completado (se modifica en el lugar)
+    """
+    caps = self.inst.p.tolist()
+    cost_left = self.inst.ct
+    dist_left = self.inst.maxM
+    for k, amount in enumerate(values):
+      if amount:
+        caps[self.source[k]] -= amount
+        cost_left -= amount * self.costs[k]
+        dist_left -= amount * self.dists[k]
+
+    for k in order:
+      if dist_left < 1:
+        break
+      if k == skip:
+        continue
+      room = min(self.bounds[k] - values[k], caps[self.source[k]], dist_left // self.dists[k])
+      if self.costs[k] > 0:
+        room = min(room, int((cost_left + EPS) // self.costs[k]))
+      if room > 0:
+        values[k] += room
+        caps[self.source[k]] -= room
+        cost_left -= room * self.costs[k]
+        dist_left -= room * self.dists[k]
+    return values
+
+  def upgrades(self, price):
+    """
+    Pasos del voraz de mochila de elección múltiple: por cada origen, la
+    envolvente cóncava de (precio, ganancia) de sus destinos; cada paso mueve
+    unidades del destino anterior de la envolvente (o de quedarse) al siguiente
+    Returns: lista de (origen_k o -1, destino_k) ordenada por ganancia marginal
+    """
+    steps = []
+    for group in self.groups:
+      group = group[np.argsort(price[group], kind='stable')]
+      hull = []
+      for k in group:
+        while hull:
+          last = hull[-1]
+          prev_price, prev_gain = (price[hull[-2]], self.gains[hull[-2]]) if len(hull) > 1 else (0.0, 0.0)
+          # Se descarta el último punto si queda bajo la recta hacia k
+          if self.gains[last] <= prev_gain or \
+             (self.gains[last] - prev_gain) * (price[k] - prev_price) <= \
+             (self.gains[k] - prev_gain) * (price[last] - prev_price):
+            hull.pop()
+          else:
+            break
+        if self.gains[k] > (self.gains[hull[-1]] if hull else 0.0):
+          hull.append(k)
+      previous, prev_price, prev_gain = -1, 0.0, 0.0
+      for k in hull:
+        rate = (self.gains[k] - prev_gain) / max(price[k] - prev_price, EPS)
+        steps.append((rate, previous, k))
+        previous, prev_price, prev_gain = k, price[k], self.gains[k]
+    steps.sort(key=lambda step: -step[0])
+    return [(origin, k) for _, origin, k in steps]
+
+  def fill_upgrades(self, steps):
+    """
+    Voraz por pasos de envolvente: asigna unidades libres de cada origen o
+    las pasa a un destino de mayor ganancia mientras alcancen los recursos
+    Returns: values
+    """
+    values = [0] * len(self.gains)
+    caps = self.inst.p.tolist()
+    cost_left = self.inst.ct
+    dist_left = self.inst.maxM
+    for origin, k in steps:
+      if origin < 0:
+        room = caps[self.source[k]]
+        extra_cost, extra_dist = self.costs[k], self.dists[k]
+      else:
+        room = values[origin]
+        extra_cost = self.costs[k] - self.costs[origin]
+        extra_dist = self.dists[k] - self.dists[origin]
+      room = min(room, self.bounds[k] - values[k])
+      if extra_dist > 0:
+        room = min(room, dist_left // extra_dist)
+      if extra_cost > 0:
+        room = min(room, int((cost_left + EPS) // extra_cost))
+      if room > 0:
+        values[k] += room
+        if origin < 0:
+          caps[self.source[k]] -= room
+        else:
+          values[origin] -= room
+        cost_left -= room * extra_cost
+        dist_left -= room * extra_dist
+    return values
+
+  def gain(self, values):
+    return float(self.gain_array @ np.asarray(values, dtype=float))
+
+def _local_search(plan, values, orders, deadline):
+  """
+  Mejora por primera mejora: quita todas las unidades (o una) de un movimiento
+  activo, de menor a mayor ganancia unitaria, y rellena con el resto
+  Returns: (values, ganancia, iteraciones aceptadas)
+  """
+  best = plan.gain(values)
+  accepted = 0
+  improved = True
+  while improved and time.monotonic() < deadline:
+    improved = False
+    active = sorted((k for k, amount in enumerate(values) if amount), key=lambda k: plan.gains[k])
+    for k in active:
+      for removed in sorted({values[k], 1}, reverse=True):
+        for order in orders:
+          trial = list(values)
+          trial[k] -= removed
+          plan.fill(trial, order, skip=k)
+          gain = plan.gain(trial)
+          if gain > best + EPS:
+            values, best = trial, gain
+            accepted += 1
+            improved = True
+            break
+        if improved or time.monotonic() >= deadline:
+          break
+      if improved or time.monotonic() >= deadline:
+        break
+  return values, best, accepted
+
+def solve(data, time_limit=SEARCH_TIME, per_source=CANDIDATES):
+  """
+  Resuelve una instancia de forma heurística (sin garantía de optimalidad)
+  time_limit: segundos de búsqueda local (0 = solo el voraz)
+  Returns: dict con x, f, extremismo_total, status, voraz (objetivo del voraz),
+           mejoras (intercambios aceptados) y time, como native_solver.solve
+  """
+  start = time.monotonic()
+  inst, rows, cols, gains, costs, dists, bounds = candidate_moves(data, per_source)
+  x = np.zeros((inst.m, inst.m), dtype=np.int64)
+  greedy = accepted = None
+
+  if len(rows):
+    plan = _Plan(inst, rows, cols, gains, costs, dists, bounds)
+    starts = [(plan.fill([0] * len(rows), order), order) for order in plan.orders]
+    starts += [(plan.fill(plan.fill_upgrades(plan.upgrades(price)), order), order)
+               for price, order in zip(plan.prices, plan.orders)]
+    values, order = max(starts, key=lambda start: plan.gain(start[0]))
+    greedy = inst.objective(_to_matrix(inst, rows, cols, values))
+    # El relleno de la búsqueda local usa el orden del mejor arranque y el del dual
+    orders = [order] if order is plan.orders[0] else [order, plan.orders[0]]
+    values, _, accepted = _local_search(plan, values, orders, start + (time_limit or 0))
+    x = _to_matrix(inst, rows, cols, values)
+
+  objective = inst.objective(x)
+  return {
+    'x': x.tolist(),
+    'f': inst.final_distribution(x).tolist(),
+    'extremismo_total': objective,
+    # Sin movimientos útiles no hay nada que mejorar
+    'status': 'OPTIMAL' if len(rows) == 0 else 'SATISFIED',
+    'voraz': objective if greedy is None else greedy,
+    'mejoras': accepted or 0,
+    'time': time.monotonic() - start
+  }
+
+def _to_matrix(inst, rows, cols, values):
+  """Matriz x m×m a partir de las cantidades de cada candidato"""
+  x = np.zeros((inst.m, inst.m), dtype=np.int64)
+  x[rows, cols] = np.asarray(values, dtype=np.int64)
+  return x
+
+def write_bound_model(objective, path=None):
+  """
+  Escribe un fragmento .mzn que acota el objetivo por la solución heurística;
+  se pasa a MiniZinc junto al modelo para que no explore planes peores
+  path: destino (por defecto un temporal que el llamador debe borrar)
+  Returns: Path del archivo
+  """
+  if path is None:
+    fd, path = tempfile.mkstemp(prefix="minext-cota-", suffix=".mzn")
+    os.close(fd)
+  bound = objective + BOUND_SLACK * max(1.0, abs(objective))
+  path = Path(path)
+  with open(path, 'w', encoding='utf-8') as f:
+    f.write("% Cota superior del objetivo obtenida con la heurística voraz\n")
+    f.write(f"constraint extremismo_total <= {bound!r};\n")
+  return path
+
+def merge_warm_start(status, solution, result):
+  """
+  Combina la solución de MiniZinc acotada por la heurística con la solución
+  heurística: si MiniZinc no encontró nada mejor, la respuesta es la heurística
+  (y es óptima si demostró que no hay nada por debajo de la cota)
+  status: estado de la ejecución de MiniZinc
+  solution: Solution de MiniZinc, o None
+  Returns: Solution
+  """
+  if status == 'UNSATISFIABLE':
+    return Solution.from_result(result, 'OPTIMAL')
+  if solution is None or status == 'UNKNOWN':
+    return Solution.from_result(result, 'SATISFIED')
+  return solution
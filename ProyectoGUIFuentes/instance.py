@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Representación vectorizada de una instancia MinExt
+Guarda p, ext, ce y c como arreglos NumPy, los lee y escribe (.txt, .dzn y el
+formato binario .mxb) sin recorrer elemento por elemento en Python y evalúa
+objetivo, costo y movimientos de una solución x con operaciones sobre la matriz
+completa.
+
+Formato binario .mxb (little-endian): encabezado fijo (BINARY_HEADER con la
+marca, la versión, el desplazamiento de c, n, m, ct y maxM), p (int64), ext y ce
+(float64) y, alineada a 64 bytes, la matriz c (float64, m×m por filas) como un
+bloque contiguo que se abre con numpy.memmap sin copiarlo ni convertir texto.
+"""
+
+import os
+import re
+import struct
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+# Parámetros de una instancia, en el orden de los archivos de datos
+KEYS = ('n', 'm', 'p', 'ext', 'ce', 'c', 'ct', 'maxM')
+
+# Elementos de c que se formatean por bloque al escribir (acota la memoria)
+WRITE_CHUNK = 1 << 20
+
+# Máximo de decimales para el formateo vectorizado; con más se usa repr
+MAX_DECIMALS = 6
+
+# Formato binario: marca, versión, extensión y encabezado
+# (marca, versión, reservado, desplazamiento de c, n, m, ct, maxM)
+BINARY_MAGIC = b"MINEXTB\0"
+BINARY_VERSION = 1
+BINARY_SUFFIX = ".mxb"
+BINARY_HEADER = struct.Struct('<8sIIqqqdq')
+
+# Alineación del bloque de c dentro del archivo binario
+BINARY_ALIGN = 64
+
+def parse_array(text, dtype, size, name):
+  """
+  Convierte una lista de números separados por comas en un arreglo
+  Returns: np.ndarray de tamaño size
+  """
+  try:
+    with warnings.catch_warnings():
+      # NumPy solo advierte (y trunca) cuando encuentra un valor inválido
+      warnings.simplefilter('error', DeprecationWarning)
+      values = np.fromstring(text, dtype=dtype, sep=',')
+  except (ValueError, DeprecationWarning):
+    raise ValueError(f"Valor no numérico en {name}") from None
+  if values.size != size:
+    raise ValueError(f"{name} tiene {values.size} elementos, se esperaban {size}")
+  return values
+
+def _fixed_decimals(values):
+  """
+  Menor número de decimales con el que todos los valores se escriben exactos
+  Returns: int, o None si hace falta la notación de repr (exponentes, negativos,
+           más de MAX_DECIMALS decimales)
+  """
+  if values.size == 0:
+    return 0
+  nonzero = np.abs(values[values != 0])
+  if (values < 0).any() or not np.isfinite(values).all() or \
+     (nonzero.size and (nonzero.min() < 1e-4 or nonzero.max() >= 1e15)):
+    return None
+  for decimals in range(MAX_DECIMALS + 1):
+    scale = 10.0 ** decimals
+    if (np.rint(values * scale) / scale == values).all():
+      return decimals
+  return None
+
+def format_floats(values, sep=", ", line_length=None):
+  """
+  Escribe los valores con el mismo texto que repr(float) separados por sep
+  Los dígitos se arman como una matriz de caracteres y se compactan con una
+  máscara, sin formatear cada número en Python.
+  line_length: si se da, cada line_length valores se separan con un salto de
+               línea (y el texto termina en salto de línea)
+  Returns: str
+  """
+  values = np.ascontiguousarray(values, dtype=np.float64).ravel()
+  decimals = _fixed_decimals(values)
+  if decimals is None:
+    if line_length:
+      lines = values.reshape(-1, line_length).tolist()
+      return ''.join(sep.join(map(repr, line)) + "\n" for line in lines)
+    return sep.join(map(repr, values.tolist()))
+  if values.size == 0:
+    return ""
+
+  # repr siempre lleva al menos un decimal (12.0)
+  decimals = max(decimals, 1)
+  scaled = np.rint(values * 10.0 ** decimals).astype(np.int64)
+  integer, fraction = np.divmod(scaled, 10 ** decimals)
+  width = max(len(str(int(integer.max()))), 1)
+
+  # Una columna por carácter: dígitos enteros, punto, decimales y separador
+  sep_bytes = sep.encode('ascii')
+  columns = width + 1 + decimals + len(sep_bytes)
+  chars = np.empty((values.size, columns), dtype=np.uint8)
+  mask = np.ones((values.size, columns), dtype=bool)
+  col = 0
+  for pos in range(width - 1, -1, -1):
+    chars[:, col] = integer // 10 ** pos % 10 + ord('0')
+    # sin ceros a la izquierda, salvo el de las unidades
+    if pos:
+      mask[:, col] = integer >= 10 ** pos
+    col += 1
+  chars[:, col] = ord('.')
+  col += 1
+  for k in range(decimals):
+    chars[:, col] = fraction // 10 ** (decimals - 1 - k) % 10 + ord('0')
+    # sin ceros a la derecha, salvo el primer decimal
+    if k:
+      mask[:, col] = fraction % 10 ** (decimals - k) != 0
+    col += 1
+  chars[:, col:] = np.frombuffer(sep_bytes, dtype=np.uint8)
+  if line_length:
+    chars[line_length - 1::line_length, col] = ord('\n')
+    mask[line_length - 1::line_length, col + 1:] = False
+
+  text = chars[mask].tobytes().decode('ascii')
+  if line_length:
+    return text
+  return text[:len(text) - len(sep)] if sep else text
+
+def _data_lines(f):
+  """
+  Recorre las líneas no vacías de un archivo
+  Returns: generador de (texto sin espacios en los extremos, número de línea)
+  """
+  for lineno, line in enumerate(f, start=1):
+    line = line.strip()
+    if line:
+      yield line, lineno
+
+class DznWriter:
+  """
+  Escritura incremental de un .dzn: encabezado, bloques de filas de c (en
+  orden) y recursos, sin tener la matriz completa en memoria
+  """
+
+  def __init__(self, f):
+    self.f = f
+    self.first_block = True
+
+  def header(self, n, m, p, ext, ce):
+    f = self.f
+    f.write("% Archivo de datos generado automáticamente\n")
+    f.write("% MinExt - Minimización del Extremismo\n\n")
+
+    f.write(f"n = {n};\n")
+    f.write(f"m = {m};\n\n")
+
+    f.write("% Distribución inicial de personas por opinión\n")
+    f.write(f"p = {np.asarray(p).tolist()};\n\n")
+
+    f.write("% Valores de extremismo por opinión\n")
+    f.write(f"ext = [{format_floats(ext)}];\n\n")
+
+    f.write("% Costos extra por mover hacia opinión inicialmente vacía\n")
+    f.write(f"ce = [{format_floats(ce)}];\n\n")
+
+    f.write("% Matriz de costos de movimiento entre opiniones\n")
+    f.write("c = array2d(1..m, 1..m, [")
+
+  def rows(self, block):
+    if not self.first_block:
+      self.f.write(", ")
+    self.f.write(format_floats(block))
+    self.first_block = False
+
+  def footer(self, ct, maxM):
+    f = self.f
+    f.write("]);\n\n")
+    f.write("% Restricciones de recursos\n")
+    f.write(f"ct = {float(ct)};\n")
+    f.write(f"maxM = {int(maxM)};\n")
+
+class TxtWriter:
+  """
+  Escritura incremental en el formato plano de DatosProyecto (misma interfaz
+  que DznWriter)
+  """
+
+  def __init__(self, f):
+    self.f = f
+
+  def header(self, n, m, p, ext, ce):
+    self.m = m
+    self.f.write(f"{n}\n{m}\n")
+    self.f.write(','.join(map(str, np.asarray(p).tolist())) + "\n")
+    self.f.write(format_floats(ext, ',') + "\n")
+    self.f.write(format_floats(ce, ',') + "\n")
+
+  def rows(self, block):
+    self.f.write(format_floats(block, ',', line_length=self.m))
+
+  def footer(self, ct, maxM):
+    self.f.write(f"{float(ct)}\n{int(maxM)}\n")
+
+def binary_offset(m):
+  """
+  Returns: posición (bytes) de la matriz c en el archivo binario de una instancia con m opiniones
+  """
+  offset = BINARY_HEADER.size + 3 * 8 * m
+  return -(-offset // BINARY_ALIGN) * BINARY_ALIGN
+
+class BinaryWriter:
+  """
+  Escritura incremental del formato binario (misma interfaz que DznWriter); el
+  archivo se abre en modo binario (ver binary) y ct y maxM, que llegan al
+  final, se completan en el encabezado
+  """
+
+  binary = True
+
+  def __init__(self, f):
+    self.f = f
+
+  def _pack_header(self, ct, maxM):
+    return BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, 0, binary_offset(self.m),
+                              self.n, self.m, float(ct), int(maxM))
+
+  def header(self, n, m, p, ext, ce):
+    self.n, self.m = int(n), int(m)
+    self.f.write(self._pack_header(0.0, 0))
+    self.f.write(np.ascontiguousarray(p, dtype='<i8').tobytes())
+    self.f.write(np.ascontiguousarray(ext, dtype='<f8').tobytes())
+    self.f.write(np.ascontiguousarray(ce, dtype='<f8').tobytes())
+    self.f.write(b"\0" * (binary_offset(self.m) - BINARY_HEADER.size - 3 * 8 * self.m))
+
+  def rows(self, block):
+    self.f.write(np.ascontiguousarray(block, dtype='<f8').tobytes())
+
+  def footer(self, ct, maxM):
+    end = self.f.tell()
+    self.f.seek(0)
+    self.f.write(self._pack_header(ct, maxM))
+    self.f.seek(end)
+
+def open_for(writer_class, output_path):
+  """Abre output_path en el modo (texto o binario) que usa el escritor"""
+  if getattr(writer_class, 'binary', False):
+    return open(output_path, 'wb')
+  return open(output_path, 'w', encoding='utf-8')
+
+def binary_sidecar(file_path):
+  """
+  Archivo binario que acompaña a un .txt o .dzn (mismo nombre, extensión .mxb)
+  Returns: Path
+  """
+  return Path(file_path).with_suffix(BINARY_SUFFIX)
+
+def load_instance(file_path, mmap=True):
+  """
+  Lee una instancia .txt, .dzn o .mxb. Si junto al .txt o .dzn hay un .mxb al
+  menos tan reciente, se usa ese: la matriz c se mapea en memoria y solo se lee
+  del disco la parte que se usa
+  Returns: Instance
+  """
+  file_path = Path(file_path)
+  sidecar = binary_sidecar(file_path)
+  if file_path.suffix.lower() != BINARY_SUFFIX and sidecar.exists():
+    try:
+      if sidecar.stat().st_mtime_ns >= file_path.stat().st_mtime_ns:
+        return Instance.from_binary(sidecar, mmap)
+    except (OSError, ValueError):
+      pass
+  return Instance.load(file_path, mmap)
+
+def convert_instance(source, target):
+  """
+  Convierte una instancia entre .txt, .dzn y .mxb sin pérdida (los float64 del
+  binario se escriben en texto con el mismo valor que repr)
+  Returns: Instance leída de source
+  """
+  data = Instance.load(source)
+  data.save(target)
+  return data
+
+class Instance:
+  """
+  Instancia MinExt respaldada por arreglos NumPy
+  p: int64 (m,), ext y ce: float64 (m,), c: float64 (m, m) contigua por filas.
+  Se puede indexar como el dict de parse_data_file (data['p'], data['c'], ...).
+  """
+
+  def __init__(self, n, m, p, ext, ce, c, ct, maxM):
+    self.n = int(n)
+    self.m = int(m)
+    self.p = np.ascontiguousarray(p, dtype=np.int64)
+    self.ext = np.ascontiguousarray(ext, dtype=np.float64)
+    self.ce = np.ascontiguousarray(ce, dtype=np.float64)
+    self.c = np.ascontiguousarray(c, dtype=np.float64)
+    self.ct = float(ct)
+    self.maxM = int(maxM)
+
+    for name in ('p', 'ext', 'ce'):
+      if getattr(self, name).shape != (self.m,):
+        raise ValueError(f"{name} tiene {getattr(self, name).size} elementos, se esperaban {self.m}")
+    if self.c.shape != (self.m, self.m):
+      raise ValueError(f"La matriz c tiene forma {self.c.shape}, se esperaba ({self.m}, {self.m})")
+
+  @classmethod
+  def from_data(cls, data):
+    """
+    Crea la instancia desde un dict (como parse_data_file) u otra Instance
+    """
+    if isinstance(data, cls):
+      return data
+    return cls(*(data[key] for key in KEYS))
+
+  @classmethod
+  def from_txt(cls, file_path):
+    """
+    Lee el formato plano de DatosProyecto: n, m, p, ext, ce, las m filas de c y
+    ct y maxM (en la misma línea o en líneas separadas)
+    El archivo se recorre línea por línea y cada fila de c se escribe directo en
+    una matriz reservada de antemano, así el pico de memoria es el de la matriz.
+    Los errores indican el número de línea del archivo.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+      lines = _data_lines(f)
+
+      def next_line(what):
+        try:
+          return next(lines)
+        except StopIteration:
+          raise ValueError(f"Archivo incompleto: falta {what} en {file_path}") from None
+
+      def parse(what, cast, text, lineno):
+        try:
+          return cast(text)
+        except ValueError:
+          raise ValueError(f"Línea {lineno}: valor inválido para {what}: '{text}'") from None
+
+      def parse_row(what, dtype, text, lineno):
+        try:
+          return parse_array(text, dtype, m, what)
+        except ValueError as e:
+          raise ValueError(f"Línea {lineno}: {e}") from None
+
+      n = parse('n', int, *next_line('n'))
+      m = parse('m', int, *next_line('m'))
+      if m <= 0:
+        raise ValueError(f"m debe ser positivo, se leyó {m}")
+      p = parse_row('p', np.int64, *next_line('p'))
+      ext = parse_row('ext', np.float64, *next_line('ext'))
+      ce = parse_row('ce', np.float64, *next_line('ce'))
+
+      c = np.empty((m, m), dtype=np.float64)
+      for i in range(m):
+        what = f"la fila {i + 1} de c"
+        c[i] = parse_row(what, np.float64, *next_line(what))
+
+      text, lineno = next_line('ct')
+      tokens = text.split()
+      if len(tokens) == 2:
+        # ct y maxM en la misma línea
+        ct = parse('ct', float, tokens[0], lineno)
+        maxM = parse('maxM', int, tokens[1], lineno)
+      elif len(tokens) == 1:
+        # ct y maxM en líneas separadas
+        ct = parse('ct', float, tokens[0], lineno)
+        maxM = parse('maxM', int, *next_line('maxM'))
+      else:
+        raise ValueError(f"Línea {lineno}: se esperaba ct (y opcionalmente maxM)")
+    return cls(n, m, p, ext, ce, c, ct, maxM)
+
+  @classmethod
+  def from_binary(cls, file_path, mmap=True):
+    """
+    Lee el formato binario .mxb
+    mmap: mapear c en memoria de solo lectura (sin copiarla); False la lee completa
+    """
+    file_path = Path(file_path)
+    with open(file_path, 'rb') as f:
+      raw = f.read(BINARY_HEADER.size)
+      if len(raw) < BINARY_HEADER.size or raw[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ValueError(f"{file_path} no es una instancia binaria de MinExt")
+      magic, version, _, offset, n, m, ct, maxM = BINARY_HEADER.unpack(raw)
+      if version != BINARY_VERSION:
+        raise ValueError(f"{file_path} tiene la versión {version} del formato binario, "
+                         f"se esperaba {BINARY_VERSION}")
+      if m <= 0:
+        raise ValueError(f"m debe ser positivo, se leyó {m}")
+      p = np.fromfile(f, dtype='<i8', count=m)
+      ext = np.fromfile(f, dtype='<f8', count=m)
+      ce = np.fromfile(f, dtype='<f8', count=m)
+    expected = offset + 8 * m * m
+    size = os.path.getsize(file_path)
+    if size != expected:
+      raise ValueError(f"{file_path} tiene {size} bytes, se esperaban {expected} (archivo incompleto)")
+    if mmap:
+      c = np.memmap(file_path, dtype='<f8', mode='r', offset=offset, shape=(m, m))
+    else:
+      c = np.fromfile(file_path, dtype='<f8', count=m * m, offset=offset).reshape(m, m)
+    return cls(n, m, p, ext, ce, c, ct, maxM)
+
+  @classmethod
+  def load(cls, file_path, mmap=True):
+    """
+    Lee una instancia según la extensión: .txt, .dzn o .mxb (ver load_instance,
+    que además aprovecha el .mxb que acompaña a un .dzn)
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix == BINARY_SUFFIX:
+      return cls.from_binary(file_path, mmap)
+    if suffix == '.txt':
+      return cls.from_txt(file_path)
+    return cls.from_dzn(file_path)
+
+  @classmethod
+  def from_dzn(cls, file_path):
+    """
+    Lee un .dzn generado por write_dzn (o por generate_dzn_file)
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+      content = f.read()
+
+    # Quitar comentarios y separar asignaciones "nombre = valor;"
+    content = re.sub(r'%[^\n]*', '', content)
+    values = {}
+    for statement in content.split(';'):
+      if '=' not in statement:
+        continue
+      name, value = statement.split('=', 1)
+      values[name.strip()] = value.strip()
+
+    missing = [key for key in KEYS if key not in values]
+    if missing:
+      raise ValueError(f"Parámetros faltantes en {file_path}: {', '.join(missing)}")
+
+    def body(text):
+      # Para array2d(1..m, 1..m, [...]) solo interesa el contenido entre corchetes
+      return text[text.index('[') + 1:text.rindex(']')]
+
+    m = int(values['m'])
+    return cls(
+      int(values['n']), m,
+      parse_array(body(values['p']), np.int64, m, 'p'),
+      parse_array(body(values['ext']), np.float64, m, 'ext'),
+      parse_array(body(values['ce']), np.float64, m, 'ce'),
+      parse_array(body(values['c']), np.float64, m * m, 'La matriz c').reshape(m, m),
+      float(values['ct']), int(values['maxM'])
+    )
+
+  def __getitem__(self, key):
+    if key not in KEYS:
+      raise KeyError(key)
+    return getattr(self, key)
+
+  def __contains__(self, key):
+    return key in KEYS
+
+  def keys(self):
+    return list(KEYS)
+
+  def to_dict(self):
+    """
+    Returns: dict con listas de Python (el formato de parse_data_file)
+    """
+    return {
+      'n': self.n, 'm': self.m,
+      'p': self.p.tolist(), 'ext': self.ext.tolist(), 'ce': self.ce.tolist(),
+      'c': self.c.tolist(), 'ct': self.ct, 'maxM': self.maxM
+    }
+
+  def write_dzn(self, output_path):
+    """
+    Escribe la instancia en formato .dzn (mismo texto que generate_dzn_file)
+    """
+    self._write(DznWriter, output_path)
+
+  def write_txt(self, output_path):
+    """
+    Escribe la instancia en el formato plano de DatosProyecto
+    """
+    self._write(TxtWriter, output_path)
+
+  def write_binary(self, output_path):
+    """
+    Escribe la instancia en el formato binario .mxb
+    """
+    self._write(BinaryWriter, output_path)
+
+  def save(self, output_path):
+    """
+    Escribe la instancia en el formato que indica la extensión (.txt, .dzn o .mxb)
+    """
+    suffix = Path(output_path).suffix.lower()
+    if suffix == BINARY_SUFFIX:
+      self.write_binary(output_path)
+    elif suffix == '.txt':
+      self.write_txt(output_path)
+    else:
+      self.write_dzn(output_path)
+
+  def _write(self, writer_class, output_path):
+    with open_for(writer_class, output_path) as f:
+      writer = writer_class(f)
+      writer.header(self.n, self.m, self.p, self.ext, self.ce)
+      rows = max(1, WRITE_CHUNK // max(self.m, 1))
+      for start in range(0, self.m, rows):
+        writer.rows(self.c[start:start + rows])
+      writer.footer(self.ct, self.maxM)
+
+  def distances(self):
+    """
+    Returns: matriz int64 (m, m) con |j - i|
+    """
+    index = np.arange(self.m)
+    return np.abs(index[None, :] - index[:, None])
+
+  def gains(self):
+    """
+    Returns: matriz (m, m) con la reducción de extremismo ext[i] - ext[j]
+             por cada persona movida de i a j
+    """
+    return self.ext[:, None] - self.ext[None, :]
+
+  def move_costs(self):
+    """
+    Costo unitario de mover una persona de i a j (término de la restricción 4)
+    Returns: matriz (m, m) c[i,j] * (1 + p[i]/n) + ce[j] si p[j] = 0
+    """
+    extra = np.where(self.p == 0, self.ce, 0.0)
+    return self.c * (1.0 + self.p / self.n)[:, None] + extra[None, :]
+
+  def final_distribution(self, x):
+    """
+    Returns: arreglo int64 f = p + entradas - salidas
+    """
+    x = np.asarray(x, dtype=np.int64)
+    return self.p + x.sum(axis=0) - x.sum(axis=1)
+
+  def objective(self, x):
+    """
+    Returns: extremismo total sum(f[i] * ext[i]) de la solución x
+    """
+    return float(self.final_distribution(x) @ self.ext)
+
+  def cost(self, x):
+    """
+    Returns: costo de la solución x según la restricción 4
+    """
+    return float((np.asarray(x, dtype=np.float64) * self.move_costs()).sum())
+
+  def moves(self, x):
+    """
+    Returns: movimientos sum(x[i,j] * |j - i|) de la solución x (restricción 5)
+    """
+    return int((np.asarray(x, dtype=np.int64) * self.distances()).sum())
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gestor asíncrono de trabajos de MiniZinc
+Ejecuta los subprocesos con asyncio.create_subprocess_exec en un bucle de
+eventos propio (en un hilo aparte), con un máximo de trabajos a la vez, límite
+de tiempo por trabajo y cancelación que termina todo el grupo de procesos de
+MiniZinc (el solver incluido). La interfaz gráfica y las herramientas de línea
+de comandos lo usan igual: encolan trabajos y reciben eventos de progreso.
+"""
+
+import asyncio
+import itertools
+import os
+import signal
+import subprocess
+import threading
+import time
+
+from utils import PROCESS_MARGIN, build_minizinc_command, release_minizinc_command
+from streaming import STREAM_ARGS, StreamDecoder
+
+# Segundos entre SIGTERM y SIGKILL al terminar un grupo de procesos
+KILL_GRACE = 2.0
+
+# Tamaño máximo de una línea de stdout (las soluciones JSON de instancias
+# grandes traen la matriz x completa en una sola línea)
+LINE_LIMIT = 1 << 28
+
+# Estados de un trabajo
+QUEUED = 'QUEUED'
+RUNNING = 'RUNNING'
+DONE = 'DONE'
+CANCELLED = 'CANCELLED'
+TIMEOUT = 'TIMEOUT'
+FAILED = 'ERROR'
+
+def _group_options():
+  """Opciones para lanzar el subproceso como líder de su propio grupo"""
+  if os.name == 'nt':
+    return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+  return {'start_new_session': True}
+
+async def kill_process_group(process, grace=KILL_GRACE):
+  """
+  Termina el proceso y sus hijos (minizinc lanza el solver como otro proceso):
+  SIGTERM al grupo, y SIGKILL si no termina en grace segundos
+  """
+  if process.returncode is not None:
+    return
+  try:
+    if os.name == 'nt':
+      # taskkill /T termina el árbol de procesos completo
+      killer = await asyncio.create_subprocess_exec(
+        'taskkill', '/F', '/T', '/PID', str(process.pid),
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+      await killer.wait()
+      return
+    os.killpg(process.pid, signal.SIGTERM)
+  except (ProcessLookupError, PermissionError, OSError):
+    return
+  try:
+    await asyncio.wait_for(process.wait(), grace)
+  except asyncio.TimeoutError:
+    try:
+      os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+      pass
+
+async def run_process(cmd, timeout=None, on_line=None, cancel=None, grace=KILL_GRACE):
+  """
+  Ejecuta un comando leyendo stdout línea a línea
+  timeout: segundos antes de terminar el grupo de procesos (None = sin límite)
+  on_line: callback(line) con cada línea de stdout, apenas llega
+  cancel: asyncio.Event; si se activa se termina el grupo de procesos
+  Returns: dict con stdout, stderr, returncode y reason (None si terminó solo,
+           'timeout' o 'cancelled'); la salida parcial se conserva
+  """
+  process = await asyncio.create_subprocess_exec(
+    *[str(arg) for arg in cmd],
+    stdout=asyncio.subprocess.PIPE,
+    stderr=asyncio.subprocess.PIPE,
+    limit=LINE_LIMIT,
+    **_group_options()
+  )
+  stdout_lines = []
+  stderr_chunks = []
+
+  async def read_stdout():
+    async for raw in process.stdout:
+      line = raw.decode('utf-8', errors='replace')
+      stdout_lines.append(line)
+      if on_line:
+        on_line(line)
+
+  async def read_stderr():
+    stderr_chunks.append(await process.stderr.read())
+
+  readers = asyncio.ensure_future(asyncio.gather(read_stdout(), read_stderr()))
+  waiters = {readers}
+  cancelled = asyncio.ensure_future(cancel.wait()) if cancel is not None else None
+  if cancelled is not None:
+    waiters.add(cancelled)
+
+  reason = None
+  try:
+    done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    if readers not in done:
+      reason = 'cancelled' if cancelled is not None and cancelled in done else 'timeout'
+      await kill_process_group(process, grace)
+    # Al cerrarse las tuberías los lectores terminan con la salida parcial
+    await readers
+    returncode = await process.wait()
+  except asyncio.CancelledError:
+    await kill_process_group(process, grace)
+    raise
+  finally:
+    if cancelled is not None:
+      cancelled.cancel()
+
+  return {
+    'stdout': ''.join(stdout_lines),
+    'stderr': b''.join(stderr_chunks).decode('utf-8', errors='replace'),
+    'returncode': returncode,
+    'reason': reason
+  }
+
+def run_command(cmd, timeout=None):
+  """
+  Versión síncrona de run_process para procesos de un pool (p. ej. batch.py)
+  Returns: dict de run_process
+  """
+  return asyncio.run(run_process(cmd, timeout))
+
+def minizinc_job_command(model_file, dzn_file, solver="Gecode", time_limit_ms=60000, cache=None,
+                         extra_args=None, extra_models=None, json_output=False, stream=True,
+                         statistics=False):
+  """
+  Comando de MiniZinc para un trabajo
+  stream: reportar cada solución intermedia como mensaje de --json-stream
+  statistics: pedir las estadísticas de MiniZinc (quedan en result['statistics'])
+  Returns: list con los argumentos del comando
+  """
+  cmd = build_minizinc_command(model_file, dzn_file, solver, time_limit_ms, cache, extra_args,
+                               extra_models, json_output=json_output, statistics=statistics)
+  if stream:
+    cmd[1:1] = STREAM_ARGS
+  return cmd
+
+class Job:
+  """
+  Un trabajo de MiniZinc encolado en el JobManager
+  state: QUEUED, RUNNING, DONE, CANCELLED, TIMEOUT o ERROR
+  best: mejor solución recibida hasta ahora (dict de StreamDecoder.feed)
+  result: dict de StreamDecoder.result al terminar (con la salida parcial si
+          se canceló o se agotó el tiempo), más error si no se pudo ejecutar
+  cache: FlatZincCache cuya entrada reservó el comando; se libera al terminar
+  """
+
+  def __init__(self, job_id, cmd, name=None, timeout=None, data=None, on_solution=None,
+               stop_when=None, cleanup=None, group=None, info=None, mapping=None, cache=None):
+    self.id = job_id
+    self.cmd = cmd
+    self.name = name or f"trabajo {job_id}"
+    self.group = group
+    self.info = info or {}
+    self.timeout = timeout
+    self.data = data
+    self.mapping = mapping
+    self.on_solution = on_solution
+    self.stop_when = stop_when
+    self.cleanup = list(cleanup or [])
+    self.cache = cache
+    self.state = QUEUED
+    self.best = None
+    self.result = None
+    self.error = None
+    self.submitted = time.time()
+    self.started = None
+    self.finished = None
+    self.future = None
+    self._cancel = None
+    self._cancel_requested = False
+
+  def elapsed(self):
+    """Segundos de ejecución (hasta ahora si sigue corriendo)"""
+    if self.started is None:
+      return 0.0
+    return (self.finished or time.time()) - self.started
+
+  def done(self):
+    """True si el trabajo ya terminó (por cualquier motivo)"""
+    return self.state in (DONE, CANCELLED, TIMEOUT, FAILED)
+
+  def wait(self, timeout=None):
+    """
+    Espera a que termine el trabajo (desde cualquier hilo salvo el del bucle)
+    Returns: dict result del trabajo
+    """
+    return self.future.result(timeout)
+
+class JobManager:
+  """
+  Cola de trabajos de MiniZinc sobre un bucle asyncio en un hilo propio
+  Los métodos públicos se pueden llamar desde cualquier hilo (p. ej. el de
+  Tk); on_event y los callbacks de cada trabajo se llaman desde el hilo del
+  bucle, así que la interfaz debe reenviarlos con root.after.
+  """
+
+  def __init__(self, max_concurrent=None, on_event=None, grace=KILL_GRACE):
+    """
+    max_concurrent: trabajos a la vez (por defecto, número de núcleos)
+    on_event: callback(event) con cada evento de progreso; event es un dict con
+              type ('queued', 'started', 'solution' o 'finished'), job y, en
+              los de tipo solution, solution
+    grace: segundos entre SIGTERM y SIGKILL al cancelar
+    """
+    self.max_concurrent = max_concurrent or os.cpu_count() or 1
+    self.on_event = on_event
+    self.grace = grace
+    self.jobs = {}
+    self._ids = itertools.count(1)
+    self._loop = asyncio.new_event_loop()
+    self._thread = threading.Thread(target=self._loop.run_forever, name="minext-jobs")
+    self._thread.daemon = True
+    self._thread.start()
+    self._semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(), self._loop).result()
+
+  async def _make_semaphore(self):
+    return asyncio.Semaphore(self.max_concurrent)
+
+  def _emit(self, kind, job, **fields):
+    if self.on_event:
+      try:
+        self.on_event(dict(fields, type=kind, job=job))
+      except Exception:
+        pass
+
+  def submit(self, cmd, name=None, timeout=None, data=None, on_solution=None, stop_when=None,
+             cleanup=None, group=None, info=None, mapping=None, cache=None):
+    """
+    Encola un comando de MiniZinc
+    timeout: segundos de ejecución antes de terminarlo (sin contar la espera en la cola)
+    data: instancia con que se decodifican las soluciones JSON (ver StreamDecoder)
+    on_solution: callback(solution) con cada solución que mejora el objetivo
+    stop_when: función opcional stop_when(solution) -> bool; si devuelve True se
+               termina el trabajo conservando esa solución
+    cleanup: archivos que se borran al terminar (p. ej. la cota de la heurística)
+    group: etiqueta libre para separar los eventos de cada cliente (p. ej. la cola de la interfaz)
+    info: dict libre que acompaña al trabajo (p. ej. el modelo y la instancia)
+    mapping: Presolve si el comando resuelve la instancia reducida (ver presolve.py)
+    cache: FlatZincCache con que se armó cmd (su entrada se libera al terminar)
+    Returns: Job
+    """
+    job = Job(next(self._ids), cmd, name, timeout, data, on_solution, stop_when, cleanup, group, info,
+              mapping, cache)
+    self.jobs[job.id] = job
+    self._emit('queued', job)
+    job.future = asyncio.run_coroutine_threadsafe(self._run(job), self._loop)
+    return job
+
+  def submit_minizinc(self, model_file, dzn_file, solver="Gecode", time_limit_ms=60000, cache=None,
+                      extra_args=None, extra_models=None, data=None, stream=True, statistics=False,
+                      **options):
+    """
+    Encola una ejecución de MiniZinc; con data la salida es JSON y cada solución
+    llega decodificada a Solution. El límite del trabajo es el de búsqueda más
+    PROCESS_MARGIN, salvo que se dé timeout en options (ver submit); info lleva
+    el modelo y la instancia
+    Returns: Job
+    """
+    cmd = minizinc_job_command(model_file, dzn_file, solver, time_limit_ms, cache, extra_args,
+                               extra_models, json_output=data is not None, stream=stream,
+                               statistics=statistics)
+    options.setdefault('timeout', time_limit_ms / 1000 + PROCESS_MARGIN)
+    options.setdefault('cleanup', extra_models)
+    options.setdefault('info', {'model': str(model_file), 'instance': str(dzn_file)})
+    return self.submit(cmd, data=data, cache=cache, **options)
+
+  async def _run(self, job):
+    job._cancel = asyncio.Event()
+    if job._cancel_requested:
+      job._cancel.set()
+    try:
+      async with self._semaphore:
+        if job._cancel.is_set():
+          job.state = CANCELLED
+          job.result = StreamDecoder(job.data, mapping=job.mapping).result('', None, True)
+          return job.result
+        job.state = RUNNING
+        job.started = time.time()
+        self._emit('started', job)
+        decoder = StreamDecoder(job.data, job.started, job.mapping)
+        target_reached = False
+
+        def on_line(line):
+          nonlocal target_reached
+          best = decoder.feed(line)
+          if best is None:
+            return
+          job.best = best
+          if job.on_solution:
+            job.on_solution(best)
+          self._emit('solution', job, solution=best)
+          if job.stop_when and not target_reached and job.stop_when(best):
+            target_reached = True
+            job._cancel.set()
+
+        try:
+          output = await run_process(job.cmd, job.timeout, on_line, job._cancel, self.grace)
+        except Exception as e:
+          job.state = FAILED
+          job.error = e
+          job.result = decoder.result(str(e), None, False)
+          job.result['error'] = e
+          return job.result
+
+        reason = output['reason']
+        job.result = decoder.result(output['stderr'], output['returncode'], reason is not None)
+        if reason == 'timeout':
+          job.state = TIMEOUT
+        elif reason == 'cancelled' and not target_reached:
+          job.state = CANCELLED
+        else:
+          job.state = DONE if job.result['returncode'] == 0 else FAILED
+        return job.result
+    finally:
+      job.finished = time.time()
+      release_minizinc_command(job.cmd, job.cache)
+      for path in job.cleanup:
+        try:
+          os.remove(path)
+        except OSError:
+          pass
+      self._emit('finished', job)
+
+  def cancel(self, job):
+    """Cancela un trabajo: si corre se termina su grupo de procesos; si espera, no arranca"""
+    job._cancel_requested = True
+    if job._cancel is not None:
+      self._loop.call_soon_threadsafe(job._cancel.set)
+
+  def cancel_all(self):
+    """Cancela todos los trabajos pendientes o en curso"""
+    for job in list(self.jobs.values()):
+      if not job.done():
+        self.cancel(job)
+
+  def pending(self):
+    """Returns: lista de trabajos que no han terminado"""
+    return [job for job in self.jobs.values() if not job.done()]
+
+  def shutdown(self, timeout=None):
+    """Cancela los trabajos, espera a que terminen y detiene el bucle"""
+    self.cancel_all()
+    for job in list(self.jobs.values()):
+      try:
+        job.wait(timeout)
+      except Exception:
+        pass
+    self._loop.call_soon_threadsafe(self._loop.stop)
+    self._thread.join(timeout)
@@ -11,17 +11,133 @@ import os
 import subprocess
 import threading
 import glob
-import re
 import time
 from pathlib import Path
 
+# Perfil por etapas de cada ejecución (solo biblioteca estándar)
+import profiler
+
 # Intentar importar utilidades locales
 try:
-  from utils import check_minizinc_installation, get_project_paths, format_solution_output, extract_solution_metrics
+  from utils import check_minizinc_installation, get_project_paths, format_solution_output
+  from utils import build_minizinc_command, release_minizinc_command, get_solution_status
+  from utils import natural_sort_key
   UTILS_AVAILABLE = True
 except ImportError:
   UTILS_AVAILABLE = False
 
+# Motor nativo (requiere numpy)
+try:
+  import native_solver
+  NATIVE_AVAILABLE = True
+except ImportError:
+  NATIVE_AVAILABLE = False
+
+# Solución tipada: salida JSON de MiniZinc decodificada a NumPy (requiere numpy)
+try:
+  from utils import parse_dzn_file
+  from solution import Solution, read_solution
+  SOLUTION_AVAILABLE = True
+except ImportError:
+  SOLUTION_AVAILABLE = False
+
+# Vistas virtualizadas: tablas paginadas de la solución y textos por bloques
+# (requiere numpy)
+try:
+  import views
+  VIEWS_AVAILABLE = SOLUTION_AVAILABLE
+except ImportError:
+  VIEWS_AVAILABLE = False
+
+# Gestor asíncrono de trabajos de MiniZinc (cola, límite por trabajo, cancelación)
+try:
+  from jobs import JobManager
+  import jobs
+  JOBS_AVAILABLE = True
+except ImportError:
+  JOBS_AVAILABLE = False
+
+# Ejecución anytime de MiniZinc (soluciones intermedias, como trabajo del gestor)
+STREAM_AVAILABLE = JOBS_AVAILABLE
+
+# Caché de modelos compilados (FlatZinc)
+try:
+  from fzn_cache import FlatZincCache
+  CACHE_AVAILABLE = True
+except ImportError:
+  CACHE_AVAILABLE = False
+
+# Portafolio de solvers en paralelo
+try:
+  from portfolio import run_portfolio
+  PORTFOLIO_AVAILABLE = True
+except ImportError:
+  PORTFOLIO_AVAILABLE = False
+
+# Cota inferior por relajación lineal y gap de optimalidad (requiere numpy)
+try:
+  from bounds import lower_bound, optimality_gap, gap_reached
+  BOUNDS_AVAILABLE = True
+except ImportError:
+  BOUNDS_AVAILABLE = False
+
+# Heurística voraz con búsqueda local (requiere numpy)
+try:
+  import heuristic
+  HEURISTIC_AVAILABLE = True
+except ImportError:
+  HEURISTIC_AVAILABLE = False
+
+# Caché persistente de resultados (re-ejecutar una instancia es instantáneo)
+try:
+  from result_cache import ResultCache
+  RESULT_CACHE_AVAILABLE = SOLUTION_AVAILABLE
+except ImportError:
+  RESULT_CACHE_AVAILABLE = False
+
+# Motor de flujo con relajación lagrangiana (solución y cota en milisegundos)
+try:
+  import flow_solver
+  FLOW_SOLVER_AVAILABLE = SOLUTION_AVAILABLE
+except ImportError:
+  FLOW_SOLVER_AVAILABLE = False
+
+# Motor exacto por programación dinámica (para maxM pequeño)
+try:
+  import dp_solver
+  DP_AVAILABLE = FLOW_SOLVER_AVAILABLE
+except ImportError:
+  DP_AVAILABLE = False
+
+# Preprocesamiento que reduce la instancia antes de MiniZinc
+try:
+  from presolve import presolve
+  PRESOLVE_AVAILABLE = JOBS_AVAILABLE
+except ImportError:
+  PRESOLVE_AVAILABLE = False
+
+# Motores disponibles para resolver una instancia
+BACKEND_MINIZINC = "MiniZinc (Gecode)"
+BACKEND_FLOW = "MiniZinc (Gecode, modelo de flujo)"
+BACKEND_NATIVE = "Python nativo"
+BACKEND_PORTFOLIO = "Portafolio (solvers en paralelo)"
+BACKEND_HEURISTIC = "Heurística (respuesta inmediata)"
+BACKEND_LAGRANGIAN = "Flujo lagrangiano (solución y cota)"
+BACKEND_DP = "Programación dinámica (maxM pequeño)"
+
+# Grupo de los trabajos de la pestaña "Cola de Trabajos" en el JobManager
+QUEUE_GROUP = "cola"
+
+# Nombre de cada estado de un trabajo en la cola
+JOB_STATES = {
+  'QUEUED': "En cola",
+  'RUNNING': "Ejecutando",
+  'DONE': "Terminado",
+  'CANCELLED': "Cancelado",
+  'TIMEOUT': "Tiempo agotado",
+  'ERROR': "Error"
+}
+
 class MinExtGUI:
   def __init__(self, root):
     self.root = root
@@ -34,16 +150,40 @@ class MinExtGUI:
       self.project_dir = paths['project']
       self.dzn_dir = paths['dzn_dir']
       self.model_file = paths['model']
+      self.flow_model_file = paths['flow_model']
+      self.reduced_model_file = paths['reduced_model']
+      self.fzn_cache = FlatZincCache(paths['cache_dir']) if CACHE_AVAILABLE else None
+      self.result_cache = ResultCache(paths['results_dir']) if RESULT_CACHE_AVAILABLE else None
     else:
       self.project_dir = Path(__file__).parent.parent
       self.dzn_dir = self.project_dir / "DatosDZN"
       self.model_file = self.project_dir / "Proyecto.mzn"
+      self.flow_model_file = self.project_dir / "ProyectoFlujo.mzn"
+      self.reduced_model_file = self.project_dir / "ProyectoReducido.mzn"
+      self.fzn_cache = None
+      self.result_cache = None
     
     # Variables
     self.current_instance = None
     self.current_solution = None
     self.is_running = False
     self.demo_mode = False
+    self.stop_event = threading.Event()
+    self.objective_history = []
+    self.lower_bound = None
+    self.gap_target = None
+    self.cache_key = None
+    self.instance = None
+    self.current_job = None
+    self.queue_items = {}
+    self.profile = None
+    self.input_reader = None
+    
+    # Los eventos de los trabajos llegan desde el hilo del gestor
+    self.jobs = None
+    if JOBS_AVAILABLE:
+      self.jobs = JobManager(on_event=lambda event: self.root.after(0, self._on_job_event, event))
+    self.root.protocol("WM_DELETE_WINDOW", self.on_close)
     
     # Verificar MiniZinc al iniciar
     self.check_minizinc_status()
@@ -122,6 +262,68 @@ class MinExtGUI:
                                     command=self.load_instances)
     self.refresh_button.pack(side=tk.LEFT)
     
+    # Selección del motor de resolución
+    ttk.Label(instance_frame, text="Motor:").grid(row=1, column=0, padx=(0, 10), pady=(10, 0), sticky=tk.W)
+    
+    backends = [BACKEND_MINIZINC, BACKEND_FLOW]
+    if NATIVE_AVAILABLE:
+      backends.append(BACKEND_NATIVE)
+    if PORTFOLIO_AVAILABLE:
+      backends.append(BACKEND_PORTFOLIO)
+    if HEURISTIC_AVAILABLE:
+      backends.append(BACKEND_HEURISTIC)
+    if FLOW_SOLVER_AVAILABLE:
+      backends.append(BACKEND_LAGRANGIAN)
+    if DP_AVAILABLE:
+      backends.append(BACKEND_DP)
+    self.backend_var = tk.StringVar(value=BACKEND_NATIVE if self.demo_mode and NATIVE_AVAILABLE else BACKEND_MINIZINC)
+    self.backend_combo = ttk.Combobox(instance_frame, textvariable=self.backend_var,
+                                     values=backends, state="readonly", width=30)
+    self.backend_combo.grid(row=1, column=1, sticky=tk.W, pady=(10, 0))
+    
+    options_frame = ttk.Frame(instance_frame)
+    options_frame.grid(row=1, column=2, sticky=tk.W, pady=(10, 0))
+    
+    self.anytime_var = tk.BooleanVar(value=STREAM_AVAILABLE)
+    self.anytime_check = ttk.Checkbutton(options_frame, text="Soluciones intermedias",
+                                        variable=self.anytime_var)
+    self.anytime_check.pack(side=tk.LEFT, padx=(0, 10))
+    if not STREAM_AVAILABLE:
+      self.anytime_check.config(state="disabled")
+    
+    # La heurística da una primera solución y acota la búsqueda del motor
+    self.warm_var = tk.BooleanVar(value=HEURISTIC_AVAILABLE)
+    self.warm_check = ttk.Checkbutton(options_frame, text="Arranque heurístico",
+                                     variable=self.warm_var)
+    self.warm_check.pack(side=tk.LEFT, padx=(0, 10))
+    if not HEURISTIC_AVAILABLE:
+      self.warm_check.config(state="disabled")
+    
+    # Reutilizar el resultado guardado si nada cambió (desmarcar para volver a resolver)
+    self.cache_var = tk.BooleanVar(value=self.result_cache is not None)
+    self.cache_check = ttk.Checkbutton(options_frame, text="Usar resultados guardados",
+                                      variable=self.cache_var)
+    self.cache_check.pack(side=tk.LEFT, padx=(0, 10))
+    if self.result_cache is None:
+      self.cache_check.config(state="disabled")
+    
+    # Quitar pares dominados u opiniones sin movimientos útiles antes de MiniZinc
+    # (solo con el modelo Proyecto.mzn; la solución se traduce a la instancia original)
+    self.presolve_var = tk.BooleanVar(value=False)
+    self.presolve_check = ttk.Checkbutton(options_frame, text="Preprocesar instancia",
+                                         variable=self.presolve_var)
+    self.presolve_check.pack(side=tk.LEFT, padx=(0, 10))
+    if not PRESOLVE_AVAILABLE:
+      self.presolve_check.config(state="disabled")
+    
+    # Gap relativo con el que se detiene la búsqueda (vacío = hasta el óptimo)
+    ttk.Label(options_frame, text="Gap objetivo (%):").pack(side=tk.LEFT, padx=(0, 5))
+    self.gap_var = tk.StringVar()
+    self.gap_entry = ttk.Entry(options_frame, textvariable=self.gap_var, width=6)
+    self.gap_entry.pack(side=tk.LEFT)
+    if not BOUNDS_AVAILABLE:
+      self.gap_entry.config(state="disabled")
+    
     # Notebook para las pestañas
     self.notebook = ttk.Notebook(main_frame)
     self.notebook.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -135,6 +337,12 @@ class MinExtGUI:
     # Pestaña de salida completa
     self.setup_output_tab()
     
+    # Pestaña de la cola de trabajos
+    self.setup_queue_tab()
+    
+    # Pestaña del perfil de la última ejecución
+    self.setup_profile_tab()
+    
     # Barra de estado
     self.status_var = tk.StringVar()
     self.status_var.set("Listo")
@@ -157,6 +365,16 @@ class MinExtGUI:
     self.input_text = scrolledtext.ScrolledText(input_frame, wrap=tk.WORD, 
                                                font=("Consolas", 10))
     self.input_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+    self.input_writer = views.BatchedText(self.input_text) if VIEWS_AVAILABLE else None
+    
+    # Los archivos grandes se muestran por bloques (la instancia se lee aparte)
+    load_frame = ttk.Frame(input_frame)
+    load_frame.grid(row=1, column=0, sticky=tk.W, padx=5, pady=(0, 5))
+    self.load_more_button = ttk.Button(load_frame, text="Cargar más", 
+                                      command=self.load_more_input, state="disabled")
+    self.load_more_button.pack(side=tk.LEFT, padx=(0, 10))
+    self.input_label = ttk.Label(load_frame, text="")
+    self.input_label.pack(side=tk.LEFT)
     
   def setup_results_tab(self):
     """Configura la pestaña de resultados"""
@@ -188,16 +406,47 @@ class MinExtGUI:
     self.tiempo_label = ttk.Label(summary_frame, text="-", font=("Arial", 10))
     self.tiempo_label.grid(row=3, column=1, sticky=tk.W, padx=(10, 0))
     
+    ttk.Label(summary_frame, text="Cota Inferior / Gap:", font=("Arial", 10, "bold")).grid(row=4, column=0, sticky=tk.W)
+    self.gap_label = ttk.Label(summary_frame, text="-", font=("Arial", 10))
+    self.gap_label.grid(row=4, column=1, sticky=tk.W, padx=(10, 0))
+    
+    ttk.Label(summary_frame, text="Verificación:", font=("Arial", 10, "bold")).grid(row=5, column=0, sticky=tk.W)
+    self.verification_label = ttk.Label(summary_frame, text="-", font=("Arial", 10), wraplength=480)
+    self.verification_label.grid(row=5, column=1, sticky=tk.W, padx=(10, 0))
+    
+    # Evolución del mejor objetivo en el tiempo (modo soluciones intermedias)
+    self.history_canvas = tk.Canvas(summary_frame, width=320, height=90, bg="white",
+                                    highlightthickness=1, highlightbackground="gray")
+    self.history_canvas.grid(row=0, column=2, rowspan=6, sticky=tk.E, padx=(10, 0))
+    
     # Detalles de la solución
     details_frame = ttk.LabelFrame(results_frame, text="Detalles de la Solución", padding="5")
     details_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
     details_frame.columnconfigure(0, weight=1)
     details_frame.rowconfigure(0, weight=1)
     
-    self.results_text = scrolledtext.ScrolledText(details_frame, wrap=tk.WORD, 
+    # Texto del modelo y, con numpy, tablas paginadas y ordenables (clic en
+    # el encabezado) con los movimientos, la distribución final y los costos
+    self.details_notebook = ttk.Notebook(details_frame)
+    self.details_notebook.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    
+    text_frame = ttk.Frame(self.details_notebook)
+    text_frame.columnconfigure(0, weight=1)
+    text_frame.rowconfigure(0, weight=1)
+    self.details_notebook.add(text_frame, text="Texto")
+    self.results_text = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, 
                                                  font=("Consolas", 10))
     self.results_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
     
+    self.tables = {}
+    if VIEWS_AVAILABLE:
+      for key, title, columns in (('movimientos', "Movimientos", views.MOVE_COLUMNS),
+                                  ('distribucion', "Distribución final", views.DISTRIBUTION_COLUMNS),
+                                  ('costos', "Matriz de costos", views.MATRIX_COLUMNS)):
+        table = views.LazyTable(self.details_notebook, columns)
+        self.details_notebook.add(table.frame, text=title)
+        self.tables[key] = table
+    
   def setup_output_tab(self):
     """Configura la pestaña de salida completa"""
     output_frame = ttk.Frame(self.notebook)
@@ -209,6 +458,119 @@ class MinExtGUI:
     self.output_text = scrolledtext.ScrolledText(output_frame, wrap=tk.WORD, 
                                                 font=("Consolas", 9))
     self.output_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+    self.output_writer = views.BatchedText(self.output_text) if VIEWS_AVAILABLE else None
+    
+  def setup_queue_tab(self):
+    """Configura la pestaña de la cola de trabajos (varias instancias a la vez)"""
+    queue_frame = ttk.Frame(self.notebook)
+    self.notebook.add(queue_frame, text="Cola de Trabajos")
+    
+    queue_frame.columnconfigure(0, weight=1)
+    queue_frame.rowconfigure(1, weight=1)
+    
+    button_frame = ttk.Frame(queue_frame)
+    button_frame.grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
+    self.queue_buttons = [
+      ttk.Button(button_frame, text="Encolar instancia", command=self.enqueue_selected),
+      ttk.Button(button_frame, text="Encolar todas", command=self.enqueue_all),
+      ttk.Button(button_frame, text="Cancelar seleccionados", command=self.cancel_selected_jobs),
+      ttk.Button(button_frame, text="Ver solución", command=self.show_selected_job)
+    ]
+    for button in self.queue_buttons:
+      button.pack(side=tk.LEFT, padx=(0, 5))
+      if self.jobs is None:
+        button.config(state="disabled")
+    
+    columns = ("instancia", "modelo", "estado", "extremismo", "tiempo")
+    self.queue_tree = ttk.Treeview(queue_frame, columns=columns, show="headings")
+    for column, title, width in zip(columns, ("Instancia", "Modelo", "Estado", "Extremismo", "Tiempo (s)"),
+                                    (200, 160, 120, 120, 100)):
+      self.queue_tree.heading(column, text=title)
+      self.queue_tree.column(column, width=width)
+    self.queue_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+    self.queue_tree.bind('<Double-1>', lambda event: self.show_selected_job())
+    
+    scrollbar = ttk.Scrollbar(queue_frame, orient=tk.VERTICAL, command=self.queue_tree.yview)
+    scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S), pady=5)
+    self.queue_tree.configure(yscrollcommand=scrollbar.set)
+    
+  def setup_profile_tab(self):
+    """Configura la pestaña con el perfil por etapas de la última ejecución"""
+    profile_frame = ttk.Frame(self.notebook)
+    self.notebook.add(profile_frame, text="Perfil")
+    
+    profile_frame.columnconfigure(0, weight=1)
+    profile_frame.rowconfigure(1, weight=3)
+    profile_frame.rowconfigure(2, weight=1)
+    
+    top_frame = ttk.Frame(profile_frame)
+    top_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
+    self.export_trace_button = ttk.Button(top_frame, text="Exportar traza (Chrome)",
+                                          command=self.export_trace, state="disabled")
+    self.export_trace_button.pack(side=tk.LEFT, padx=(0, 10))
+    self.profile_label = ttk.Label(top_frame, text="Sin ejecuciones")
+    self.profile_label.pack(side=tk.LEFT)
+    
+    # Etapas anidadas como en la traza (los hijos quedan bajo su etapa)
+    columns = ("hilo", "inicio", "duracion", "porcentaje")
+    self.profile_tree = ttk.Treeview(profile_frame, columns=columns, show="tree headings")
+    self.profile_tree.heading("#0", text="Etapa")
+    self.profile_tree.column("#0", width=300)
+    for column, title, width in zip(columns, ("Hilo", "Inicio (ms)", "Duración (ms)", "% del total"),
+                                    (160, 100, 110, 90)):
+      self.profile_tree.heading(column, text=title)
+      self.profile_tree.column(column, width=width, anchor=tk.E if column != "hilo" else tk.W)
+    self.profile_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+    scrollbar = ttk.Scrollbar(profile_frame, orient=tk.VERTICAL, command=self.profile_tree.yview)
+    scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S), pady=5)
+    self.profile_tree.configure(yscrollcommand=scrollbar.set)
+    
+    # Estadísticas de MiniZinc (--statistics): aplanamiento, nodos, fallos...
+    self.stats_tree = ttk.Treeview(profile_frame, columns=("valor",), show="tree headings", height=6)
+    self.stats_tree.heading("#0", text="Estadística de MiniZinc")
+    self.stats_tree.heading("valor", text="Valor")
+    self.stats_tree.column("#0", width=300)
+    self.stats_tree.column("valor", width=200)
+    self.stats_tree.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
+    
+  def _show_profile(self):
+    """Muestra el desglose por etapas del perfil actual en la pestaña Perfil"""
+    profile = self.profile
+    if profile is None:
+      return
+    self.profile_tree.delete(*self.profile_tree.get_children())
+    self.stats_tree.delete(*self.stats_tree.get_children())
+    # Padre de cada nivel de anidamiento, por hilo
+    parents = {}
+    for record in profile.breakdown():
+      levels = parents.setdefault(record['thread'], [])
+      del levels[record['depth']:]
+      parent = levels[-1] if levels else ''
+      item = self.profile_tree.insert(parent, tk.END, text=record['name'], open=True, values=(
+        record['thread'], f"{record['start'] * 1000:.1f}", f"{record['duration'] * 1000:.2f}",
+        f"{record['share'] * 100:.1f}"))
+      levels.append(item)
+    for key, value in profiler.ordered_statistics(profile.statistics):
+      self.stats_tree.insert('', tk.END, text=key, values=(value,))
+    self.profile_label.config(text=f"{profile.name}: {profile.total() * 1000:.1f} ms, "
+                                   f"{len(profile.spans)} etapas")
+    self.export_trace_button.config(state="normal")
+    
+  def export_trace(self):
+    """Guarda el perfil de la última ejecución como traza de Chrome (JSON)"""
+    if self.profile is None:
+      return
+    path = filedialog.asksaveasfilename(
+      title="Exportar traza", defaultextension=".json",
+      initialfile=f"perfil-{self.instance_var.get() or 'minext'}.json",
+      filetypes=[("Traza de Chrome (JSON)", "*.json"), ("Todos los archivos", "*.*")])
+    if not path:
+      return
+    try:
+      self.profile.write_trace(path)
+      self.status_var.set(f"Traza guardada en {path} (abrir con chrome://tracing o ui.perfetto.dev)")
+    except OSError as e:
+      messagebox.showerror("Error", f"No se pudo guardar la traza: {e}")
     
   def load_instances(self):
     """Carga las instancias disponibles"""
@@ -219,7 +581,7 @@ class MinExtGUI:
           
       # Buscar archivos .dzn
       dzn_files = list(self.dzn_dir.glob("*.dzn"))
-      dzn_files.sort(key=lambda x: self.natural_sort_key(x.name))
+      dzn_files.sort(key=natural_sort_key if UTILS_AVAILABLE else None)
       
       instance_names = [f.stem for f in dzn_files]
       
@@ -235,10 +597,6 @@ class MinExtGUI:
     except Exception as e:
       messagebox.showerror("Error", f"Error cargando instancias: {str(e)}")
 
-  def natural_sort_key(self, s):
-    """Clave para ordenamiento natural (Prueba1, Prueba2, ..., Prueba10, ...)"""
-    return [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', s)]
-
   def on_instance_selected(self, event=None):
     """Maneja la selección de una instancia"""
     if not self.instance_var.get():
@@ -249,11 +607,16 @@ class MinExtGUI:
     
     if dzn_file.exists():
       try:
-        with open(dzn_file, 'r', encoding='utf-8') as f:
-          content = f.read()
-        
-        self.input_text.delete(1.0, tk.END)
-        self.input_text.insert(1.0, content)
+        # Solo el primer bloque; "Cargar más" agrega los siguientes
+        if VIEWS_AVAILABLE:
+          self.input_reader = views.FileReader(dzn_file)
+          self.input_writer.clear()
+          self.load_more_input()
+        else:
+          with open(dzn_file, 'r', encoding='utf-8') as f:
+            content = f.read()
+          self.input_text.delete(1.0, tk.END)
+          self.input_text.insert(1.0, content)
         
         # Limpiar resultados anteriores
         self.clear_results()
@@ -265,14 +628,43 @@ class MinExtGUI:
     else:
       messagebox.showerror("Error", f"No se encuentra el archivo: {dzn_file}")
 
+  def load_more_input(self):
+    """Agrega el siguiente bloque del archivo de datos a la pestaña de entrada"""
+    reader = self.input_reader
+    if reader is None:
+      return
+    self.input_writer.append(reader.read())
+    if reader.done:
+      self.load_more_button.config(state="disabled")
+      self.input_label.config(text=f"Archivo completo ({reader.size / 1024:.0f} KB)")
+    else:
+      self.load_more_button.config(state="normal")
+      self.input_label.config(text=f"Mostrando {reader.offset / 1024:.0f} de "
+                                   f"{reader.size / 1024:.0f} KB")
+
   def clear_results(self):
     """Limpia los resultados anteriores"""
     self.extremismo_label.config(text="-")
     self.costo_label.config(text="-")
     self.movimientos_label.config(text="-")
     self.tiempo_label.config(text="-")
+    self.gap_label.config(text="-")
+    self.verification_label.config(text="-", foreground="")
+    self.lower_bound = None
+    self.objective_history = []
+    self.draw_objective_history()
     self.results_text.delete(1.0, tk.END)
-    self.output_text.delete(1.0, tk.END)
+    self._set_output("")
+    for table in self.tables.values():
+      table.clear()
+
+  def _set_output(self, full_output):
+    """Reemplaza la salida completa (por bloques con after() si es larga)"""
+    if self.output_writer is not None:
+      self.output_writer.set(full_output)
+    else:
+      self.output_text.delete(1.0, tk.END)
+      self.output_text.insert(1.0, full_output)
 
   def run_model(self):
     """Ejecuta el modelo MiniZinc"""
@@ -283,10 +675,34 @@ class MinExtGUI:
       messagebox.showwarning("Advertencia", "Por favor selecciona una instancia")
       return
     
-    if not self.model_file.exists():
-      messagebox.showerror("Error", f"No se encuentra el modelo: {self.model_file}")
+    if not self.selected_model().exists():
+      messagebox.showerror("Error", f"No se encuentra el modelo: {self.selected_model()}")
       return
     
+    try:
+      gap_text = self.gap_var.get().strip().replace(',', '.')
+      self.gap_target = float(gap_text) / 100 if gap_text else None
+      if self.gap_target is not None and self.gap_target < 0:
+        raise ValueError
+    except ValueError:
+      messagebox.showwarning("Advertencia", "El gap objetivo debe ser un porcentaje no negativo")
+      return
+    
+    # Cada ejecución tiene su propio perfil por etapas (pestaña Perfil)
+    self.profile = profiler.Profiler(f"{self.instance_var.get()} ({self.backend_var.get()})")
+    
+    # Un resultado guardado con el mismo modelo, datos, motor y opciones se
+    # muestra sin volver a resolver
+    self.cache_key = self._result_cache_key()
+    if self.cache_key is not None and self.cache_var.get():
+      with self.profile.span("caché de resultados"):
+        entry = self.result_cache.lookup(self.cache_key)
+      if entry is not None:
+        self.clear_results()
+        self._show_cached_result(entry)
+        self._show_profile()
+        return
+    
     # Iniciar ejecución en hilo separado
     self.is_running = True
     self.run_button.config(state="disabled")
@@ -297,10 +713,104 @@ class MinExtGUI:
     # Limpiar resultados anteriores
     self.clear_results()
     
-    self.execution_thread = threading.Thread(target=self._run_model_thread)
+    self.stop_event.clear()
+    if self.backend_var.get() == BACKEND_NATIVE:
+      target = self._run_native_thread
+    elif self.backend_var.get() == BACKEND_PORTFOLIO:
+      target = self._run_portfolio_thread
+    elif self.backend_var.get() == BACKEND_HEURISTIC:
+      target = self._run_heuristic_thread
+    elif self.backend_var.get() == BACKEND_LAGRANGIAN:
+      target = self._run_lagrangian_thread
+    elif self.backend_var.get() == BACKEND_DP:
+      target = self._run_dp_thread
+    elif self.anytime_var.get() and STREAM_AVAILABLE:
+      target = self._run_stream_thread
+    else:
+      target = self._run_model_thread
+    self.execution_thread = threading.Thread(target=target)
     self.execution_thread.daemon = True
     self.execution_thread.start()
 
+  def _result_cache_key(self):
+    """
+    Clave de la ejecución pedida en la caché de resultados
+    Returns: str, o None si no hay caché
+    """
+    if self.result_cache is None:
+      return None
+    dzn_file = self.dzn_dir / f"{self.instance_var.get()}.dzn"
+    options = {
+      'time_limit': 60,
+      'gap': self.gap_target,
+      'warm_start': bool(self.warm_var.get() and HEURISTIC_AVAILABLE)
+    }
+    if self._presolve_enabled():
+      options['presolve'] = True
+    try:
+      return self.result_cache.key(self.selected_model(), dzn_file, self.backend_var.get(), options)
+    except OSError:
+      return None
+
+  def _show_cached_result(self, entry):
+    """Muestra un resultado de la caché con el tiempo que tomó resolverlo"""
+    saved = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry['guardado']))
+    full_output = f"=== STDOUT ===\n{entry['stdout']}\n\n=== STDERR ===\n{entry['stderr']}\n\n"
+    full_output += f"=== INFO ===\nResultado en caché (guardado {saved})\n"
+    full_output += f"Tiempo de ejecución original: {entry['tiempo']:.2f} segundos"
+    self._set_output(full_output)
+    
+    self.lower_bound = entry.get('cota_inferior')
+    self._load_instance(self.dzn_dir / f"{self.instance_var.get()}.dzn")
+    solution = Solution.from_dict(entry['solucion'])
+    self._show_solution(solution, entry['tiempo'])
+    self.tiempo_label.config(text=f"{entry['tiempo']:.2f} segundos (en caché)")
+    if solution.objective is not None:
+      self.objective_history = [(entry['tiempo'], solution.objective)]
+      self.draw_objective_history()
+    self.status_var.set(f"Resultado en caché ({solution.status}, guardado {saved}); "
+                        "desmarque \"Usar resultados guardados\" para volver a resolver")
+
+  def _store_result(self, solution, stdout, stderr, execution_time):
+    """Guarda en la caché una ejecución terminada (no las detenidas a mano)"""
+    if self.cache_key is None or self.stop_event.is_set():
+      return
+    try:
+      self.result_cache.store(self.cache_key, solution, stdout, stderr,
+                              solution.metrics(self.instance), execution_time,
+                              extra={'cota_inferior': self.lower_bound})
+    except OSError:
+      pass
+
+  def selected_model(self):
+    """Modelo MiniZinc correspondiente al motor seleccionado"""
+    if self.backend_var.get() == BACKEND_FLOW:
+      return self.flow_model_file
+    return self.model_file
+
+  def _presolve_enabled(self):
+    """True si se pidió el preprocesamiento y el motor es MiniZinc con Proyecto.mzn"""
+    return bool(PRESOLVE_AVAILABLE and self.presolve_var.get() and
+                self.backend_var.get() == BACKEND_MINIZINC)
+
+  def _compute_lower_bound(self, dzn_file, data=None):
+    """
+    Calcula la cota inferior de la instancia (en el hilo de ejecución) para
+    mostrar el gap de cada solución y cortar la búsqueda al gap objetivo
+    """
+    if not BOUNDS_AVAILABLE:
+      return None
+    self.root.after(0, self.status_var.set, "Calculando cota inferior...")
+    try:
+      with profiler.span(self.profile, "cota inferior") as record:
+        bound = lower_bound(data or parse_dzn_file(dzn_file))
+        record['args']['metodo'] = bound.get('metodo')
+      self.lower_bound = bound['cota_inferior']
+    except Exception:
+      self.lower_bound = None
+    self.root.after(0, self.status_var.set, "Ejecutando modelo...")
+    return self.lower_bound
+
   def _run_model_thread(self):
     """Ejecuta el modelo en un hilo separado"""
     try:
@@ -308,15 +818,36 @@ class MinExtGUI:
       dzn_file = self.dzn_dir / f"{instance_name}.dzn"
       
       start_time = time.time()
+      data = self._load_instance(dzn_file)
+      self._compute_lower_bound(dzn_file, data)
+      warm = self._flow_oracle(data, self._warm_start(data, start_time), start_time)
+      extra_models = self._bound_models(warm)
       
-      # Ejecutar MiniZinc
-      cmd = [
-        "minizinc",
-        "--solver", "Gecode",
-        "--time-limit", "60000",  # 60 segundos
-        str(self.model_file),
-        str(dzn_file)
-      ]
+      # Con el gestor de trabajos, MiniZinc corre como un trabajo más (cancelable)
+      if self.jobs is not None:
+        result = self._run_job(dzn_file, data, extra_models, stream=False)
+        solution = result['solution']
+        if warm and result['returncode'] == 0:
+          solution = heuristic.merge_warm_start(result['status'], solution, warm)
+        self.root.after(0, self._update_results, result['stdout'], result['stderr'],
+                        time.time() - start_time, result['returncode'], solution)
+        return
+      
+      # Ejecutar MiniZinc (x, f y el objetivo en JSON si se pueden decodificar)
+      if UTILS_AVAILABLE:
+        with profiler.span(self.profile, "preparar MiniZinc"):
+          cmd = build_minizinc_command(self.selected_model(), dzn_file, time_limit_ms=60000,
+                                       cache=self.fzn_cache, extra_models=extra_models,
+                                       json_output=data is not None, statistics=True)
+      else:
+        cmd = [
+          "minizinc",
+          "--solver", "Gecode",
+          "--time-limit", "60000",  # 60 segundos
+          str(self.selected_model()),
+          *[str(path) for path in extra_models],
+          str(dzn_file)
+        ]
       
       # Ejecutar el comando
       process = subprocess.Popen(
@@ -328,20 +859,463 @@ class MinExtGUI:
       )
       
       self.current_process = process
-      stdout, stderr = process.communicate()
+      try:
+        with profiler.span(self.profile, "MiniZinc") as record:
+          stdout, stderr = process.communicate()
+      finally:
+        if UTILS_AVAILABLE:
+          release_minizinc_command(cmd, self.fzn_cache)
+        for path in extra_models:
+          os.remove(path)
+      if self.profile is not None:
+        self.profile.add_statistics(profiler.parse_statistics(stdout), record)
       return_code = process.returncode
+      solution = read_solution(stdout, data) if data is not None else None
+      if warm and return_code == 0:
+        # Si MiniZinc no mejora la cota, la respuesta es la heurística
+        solution = heuristic.merge_warm_start(get_solution_status(stdout), solution, warm)
       
       end_time = time.time()
       execution_time = end_time - start_time
       
       # Actualizar UI en el hilo principal
-      self.root.after(0, self._update_results, stdout, stderr, execution_time, return_code)
+      self.root.after(0, self._update_results, stdout, stderr, execution_time, return_code, solution)
+      
+    except FileNotFoundError:
+      self.root.after(0, self._show_minizinc_error)
+    except Exception as e:
+      self.root.after(0, self._show_execution_error, str(e))
+
+  def _run_stream_thread(self):
+    """Ejecuta MiniZinc en modo anytime, mostrando cada solución que mejora"""
+    try:
+      instance_name = self.instance_var.get()
+      dzn_file = self.dzn_dir / f"{instance_name}.dzn"
+      
+      start_time = time.time()
+      data = self._load_instance(dzn_file)
+      self._compute_lower_bound(dzn_file, data)
+      warm = self._flow_oracle(data, self._warm_start(data, start_time), start_time)
+      extra_models = self._bound_models(warm)
+      lower = self.lower_bound
+      stop_when = None
+      if self.gap_target is not None and lower is not None:
+        stop_when = lambda solution: gap_reached(solution['metrics']['extremismo_total'],
+                                                 lower, self.gap_target)
+      
+      result = self._run_job(
+        dzn_file, data, extra_models,
+        on_solution=lambda solution: self.root.after(0, self._show_intermediate_solution, solution),
+        stop_when=stop_when
+      )
+      solution = result['solution']
+      if warm and result['returncode'] == 0:
+        solution = heuristic.merge_warm_start(result['status'], solution, warm)
+      
+      execution_time = time.time() - start_time
+      
+      # Al detener se muestra el mejor incumbente encontrado
+      self.root.after(0, self._update_results, result['stdout'], result['stderr'],
+                      execution_time, result['returncode'], solution)
       
     except FileNotFoundError:
       self.root.after(0, self._show_minizinc_error)
     except Exception as e:
       self.root.after(0, self._show_execution_error, str(e))
 
+  def _run_job(self, dzn_file, data, extra_models, stream=True, **options):
+    """
+    Ejecuta MiniZinc como trabajo del gestor y espera a que termine (en el hilo
+    de ejecución); Detener lo cancela y se conserva el mejor incumbente
+    stream: soluciones intermedias (--json-stream)
+    options: on_solution y stop_when (ver JobManager.submit)
+    Con "Preprocesar instancia" se resuelve la instancia reducida con
+    ProyectoReducido.mzn y las soluciones llegan traducidas a la original
+    Returns: dict result del trabajo
+    """
+    model_file, name = self.selected_model(), dzn_file.stem
+    if data is not None and self._presolve_enabled():
+      with profiler.span(self.profile, "preprocesamiento"):
+        reduction = presolve(data)
+      self.root.after(0, self.status_var.set, reduction.summary())
+      if reduction.m == 0:
+        # Ningún movimiento mejora el extremismo: no hace falta MiniZinc
+        for path in extra_models:
+          os.remove(path)
+        solution = reduction.trivial_solution()
+        return {'best': None, 'status': solution.status, 'history': [], 'solution': solution,
+                'stdout': '', 'stderr': '', 'returncode': 0, 'stopped': False}
+      with profiler.span(self.profile, "escribir instancia reducida"):
+        model_file, dzn_file = self.reduced_model_file, reduction.write_dzn()
+      options.update(mapping=reduction, cleanup=list(extra_models) + [dzn_file])
+    profile = self.profile
+    on_solution = options.get('on_solution')
+    if profile is not None and on_solution is not None:
+      # Cada solución intermedia queda como evento en la traza
+      def on_solution_marked(solution):
+        profile.mark("solución", extremismo=solution['metrics']['extremismo_total'])
+        on_solution(solution)
+      options['on_solution'] = on_solution_marked
+    # Con la caché de FlatZinc, la compilación (aplanamiento) ocurre aquí
+    with profiler.span(profile, "preparar MiniZinc", cache=self.fzn_cache is not None):
+      job = self.jobs.submit_minizinc(
+        model_file, dzn_file, time_limit_ms=60000, cache=self.fzn_cache,
+        extra_models=extra_models, data=data, stream=stream, name=name, statistics=True, **options
+      )
+    self.current_job = job
+    if self.stop_event.is_set():
+      self.jobs.cancel(job)
+    with profiler.span(profile, "MiniZinc", stream=stream) as record:
+      result = job.wait()
+    if profile is not None:
+      profile.add_statistics(result.get('statistics'), record)
+    if job.error is not None:
+      raise job.error
+    return result
+
+  def enqueue_selected(self):
+    """Encola la instancia seleccionada con el modelo del motor actual"""
+    if self.instance_var.get():
+      self._enqueue([self.instance_var.get()])
+
+  def enqueue_all(self):
+    """Encola todas las instancias de la lista"""
+    self._enqueue(list(self.instance_combo['values']))
+
+  def _enqueue(self, names):
+    """
+    Agrega las instancias a la cola; se leen y se encolan en otro hilo para no
+    congelar la interfaz con instancias grandes. Se resuelven con MiniZinc y el
+    modelo del motor seleccionado, hasta tantas a la vez como núcleos
+    """
+    model_file = self.selected_model()
+    
+    def submit_all():
+      for name in names:
+        dzn_file = self.dzn_dir / f"{name}.dzn"
+        try:
+          data = parse_dzn_file(dzn_file) if SOLUTION_AVAILABLE else None
+        except Exception:
+          data = None
+        self.jobs.submit_minizinc(model_file, dzn_file, time_limit_ms=60000, cache=self.fzn_cache,
+                                  data=data, name=name, group=QUEUE_GROUP)
+    
+    thread = threading.Thread(target=submit_all)
+    thread.daemon = True
+    thread.start()
+    self.notebook.select(self.notebook.index("end") - 1)
+    self.status_var.set(f"Encolando {len(names)} instancias ({self.jobs.max_concurrent} a la vez)")
+
+  def _on_job_event(self, event):
+    """Actualiza la fila de un trabajo de la cola con su estado y mejor objetivo"""
+    job = event['job']
+    if job.group != QUEUE_GROUP:
+      return
+    objective = job.best['metrics']['extremismo_total'] if job.best else None
+    values = (job.name, Path(job.info.get('model', '-')).name,
+              JOB_STATES.get(job.state, job.state),
+              '-' if objective is None else f"{objective:.3f}",
+              f"{job.elapsed():.2f}")
+    item = self.queue_items.get(job.id)
+    if item is None:
+      self.queue_items[job.id] = self.queue_tree.insert('', tk.END, iid=str(job.id), values=values)
+    else:
+      self.queue_tree.item(item, values=values)
+    if event['type'] == 'finished':
+      pending = len([other for other in self.jobs.pending() if other.group == QUEUE_GROUP])
+      self.status_var.set(f"Trabajo terminado: {job.name} ({JOB_STATES.get(job.state, job.state)}); "
+                          f"{pending} pendientes en la cola")
+
+  def _selected_jobs(self):
+    """Trabajos de las filas seleccionadas en la cola"""
+    return [self.jobs.jobs[int(item)] for item in self.queue_tree.selection()]
+
+  def cancel_selected_jobs(self):
+    """Cancela los trabajos seleccionados (termina MiniZinc y su solver)"""
+    for job in self._selected_jobs():
+      self.jobs.cancel(job)
+
+  def show_selected_job(self):
+    """Muestra en la pestaña de resultados la solución de un trabajo de la cola"""
+    selected = [job for job in self._selected_jobs() if job.done()]
+    if not selected:
+      return
+    if self.is_running:
+      self.status_var.set("Espere a que termine la ejecución actual para ver el trabajo")
+      return
+    job = selected[0]
+    result = job.result
+    self.profile = None
+    self.clear_results()
+    self.instance = job.data
+    self.cache_key = None
+    if job.error is not None:
+      self._update_results("", str(job.error), job.elapsed(), 1)
+    else:
+      self._update_results(result['stdout'], result['stderr'], job.elapsed(),
+                           result['returncode'], result['solution'])
+    self.status_var.set(f"Trabajo {job.name}: {JOB_STATES.get(job.state, job.state)}")
+
+  def _show_intermediate_solution(self, solution):
+    """Muestra una solución intermedia en la pestaña de resultados"""
+    if solution['solution'] is not None:
+      self._show_solution(solution['solution'], solution['time'])
+    else:
+      self._show_raw_output(solution['output'], solution['time'])
+    objective = solution['metrics']['extremismo_total']
+    if objective is not None:
+      self.objective_history.append((solution['time'], objective))
+      self.draw_objective_history()
+      self.status_var.set(f"Solución #{solution['index'] + 1}: extremismo {objective:.3f} "
+                          f"({solution['time']:.2f}s)")
+
+  def draw_objective_history(self):
+    """Dibuja el mejor objetivo encontrado contra el tiempo"""
+    canvas = self.history_canvas
+    canvas.delete("all")
+    width, height, margin = int(canvas['width']), int(canvas['height']), 12
+    if not self.objective_history:
+      canvas.create_text(width // 2, height // 2, text="Mejor objetivo vs tiempo", fill="gray")
+      return
+    
+    times = [t for t, _ in self.objective_history]
+    values = [v for _, v in self.objective_history]
+    t_max = max(times[-1], 1e-9)
+    v_min, v_max = min(values), max(values)
+    v_span = (v_max - v_min) or 1.0
+    
+    def to_canvas(t, v):
+      x = margin + (width - 2 * margin) * t / t_max
+      y = margin + (height - 2 * margin) * (v_max - v) / v_span
+      return x, y
+    
+    # Escalones: el mejor valor se mantiene hasta la siguiente mejora
+    points = []
+    for index, (t, v) in enumerate(self.objective_history):
+      if index > 0:
+        points.extend(to_canvas(t, values[index - 1]))
+      points.extend(to_canvas(t, v))
+    if len(points) >= 4:
+      canvas.create_line(*points, fill="steelblue", width=2)
+    for t, v in self.objective_history:
+      x, y = to_canvas(t, v)
+      canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill="steelblue", outline="")
+    canvas.create_text(margin, 2, anchor=tk.NW, text=f"{v_max:.3f}", font=("Arial", 7))
+    canvas.create_text(width - margin, height - 2, anchor=tk.SE,
+                       text=f"{v_min:.3f} @ {t_max:.1f}s", font=("Arial", 7))
+
+  def _run_native_thread(self):
+    """Resuelve la instancia con el motor nativo en un hilo separado"""
+    try:
+      instance_name = self.instance_var.get()
+      dzn_file = self.dzn_dir / f"{instance_name}.dzn"
+      
+      start_time = time.time()
+      
+      data = self._load_instance(dzn_file)
+      self._compute_lower_bound(dzn_file, data)
+      warm = self._warm_start(data, start_time)
+      with profiler.span(self.profile, "motor nativo"):
+        result = native_solver.solve(data, time_limit=60, stop_event=self.stop_event,
+                                     gap=self.gap_target, initial=warm['x'] if warm else None)
+      # La búsqueda también demuestra una cota; se conserva la mejor
+      if self.lower_bound is not None:
+        self.lower_bound = max(self.lower_bound, result['bound'])
+      stderr = f"Motor nativo: estado {result['status']}, {result['nodes']} nodos explorados"
+      
+      execution_time = time.time() - start_time
+      
+      # Actualizar UI en el hilo principal (el texto se genera al mostrarlo)
+      self.root.after(0, self._update_results, "", stderr, execution_time, 0,
+                      Solution.from_result(result))
+      
+    except Exception as e:
+      self.root.after(0, self._show_execution_error, str(e))
+
+  def _run_portfolio_thread(self):
+    """Resuelve la instancia con todos los solvers del portafolio a la vez"""
+    try:
+      instance_name = self.instance_var.get()
+      dzn_file = self.dzn_dir / f"{instance_name}.dzn"
+      
+      data = self._load_instance(dzn_file)
+      lower = self._compute_lower_bound(dzn_file, data)
+      with profiler.span(self.profile, "portafolio"):
+        result = run_portfolio(
+          dzn_file, time_limit=60,
+          on_solution=lambda solution: self.root.after(0, self._show_portfolio_solution, solution),
+          stop_event=self.stop_event, cache=self.fzn_cache,
+          gap=self.gap_target if lower is not None else None, lower=lower,
+          warm_start=self.warm_var.get() and HEURISTIC_AVAILABLE
+        )
+      
+      # Resumen de cada competidor en la pestaña de salida completa
+      lines = [f"Portafolio: estado {result['status']}, ganador {result['winner'] or '-'}"]
+      for name, racer in result['racers'].items():
+        objective = racer['extremismo_total']
+        lines.append(f"  {name:<15} {racer['estado']:<14} "
+                     f"{'-' if objective is None else f'{objective:.3f}'}")
+        if racer['error']:
+          lines.append(f"    {racer['error']}")
+      return_code = 0 if result['best'] is not None else 1
+      
+      self.root.after(0, self._update_results, "", "\n".join(lines),
+                      result['time'], return_code, result['solution'])
+      
+    except Exception as e:
+      self.root.after(0, self._show_execution_error, str(e))
+
+  def _run_heuristic_thread(self):
+    """Resuelve la instancia solo con la heurística voraz y la búsqueda local"""
+    try:
+      instance_name = self.instance_var.get()
+      dzn_file = self.dzn_dir / f"{instance_name}.dzn"
+      
+      start_time = time.time()
+      
+      data = self._load_instance(dzn_file)
+      self._compute_lower_bound(dzn_file, data)
+      with profiler.span(self.profile, "heurística"):
+        result = heuristic.solve(data)
+      stderr = (f"Heurística: voraz {result['voraz']:.3f}, {result['mejoras']} mejoras "
+                f"de búsqueda local, final {result['extremismo_total']:.3f}")
+      
+      execution_time = time.time() - start_time
+      
+      self.root.after(0, self._update_results, "", stderr, execution_time, 0,
+                      Solution.from_result(result))
+      
+    except Exception as e:
+      self.root.after(0, self._show_execution_error, str(e))
+
+  def _run_lagrangian_thread(self):
+    """Resuelve la instancia con el flujo y la relajación lagrangiana del costo"""
+    try:
+      instance_name = self.instance_var.get()
+      dzn_file = self.dzn_dir / f"{instance_name}.dzn"
+      
+      start_time = time.time()
+      
+      data = self._load_instance(dzn_file)
+      self._compute_lower_bound(dzn_file, data)
+      with profiler.span(self.profile, "flujo lagrangiano"):
+        result = flow_solver.solve(data)
+      self.lower_bound = max(self.lower_bound or result['bound'], result['bound'])
+      stderr = (f"Flujo lagrangiano: precio del costo {result['lam']:.6g}, "
+                f"de los movimientos {result['mu']:.6g}, cota {result['bound']:.3f}")
+      
+      execution_time = time.time() - start_time
+      
+      self.root.after(0, self._update_results, "", stderr, execution_time, 0,
+                      Solution.from_result(result))
+      
+    except Exception as e:
+      self.root.after(0, self._show_execution_error, str(e))
+
+  def _run_dp_thread(self):
+    """Resuelve la instancia con la programación dinámica sobre los orígenes"""
+    try:
+      instance_name = self.instance_var.get()
+      dzn_file = self.dzn_dir / f"{instance_name}.dzn"
+      
+      start_time = time.time()
+      
+      data = self._load_instance(dzn_file)
+      self._compute_lower_bound(dzn_file, data)
+      with profiler.span(self.profile, "programación dinámica") as record:
+        result = dp_solver.solve(data, time_limit=60, stop_event=self.stop_event)
+        record['args']['estados'] = result['states']
+      self.lower_bound = max(self.lower_bound or result['bound'], result['bound'])
+      stderr = (f"Programación dinámica: {result['states']} estados, "
+                f"{result['status']}, cota {result['bound']:.3f}")
+      if result['fallback']:
+        stderr += "\nLa instancia excede los límites de la programación dinámica: solución del flujo lagrangiano"
+      
+      execution_time = time.time() - start_time
+      
+      self.root.after(0, self._update_results, "", stderr, execution_time, 0,
+                      Solution.from_result(result))
+      
+    except Exception as e:
+      self.root.after(0, self._show_execution_error, str(e))
+
+  def _flow_oracle(self, data, warm, start_time):
+    """
+    Usa el flujo lagrangiano como oráculo de cotas para MiniZinc (en el hilo
+    de ejecución): su cota reemplaza la inferior si es mejor (sin arranque
+    basta la de _compute_lower_bound, que en instancias grandes ya es la del
+    flujo) y su solución reemplaza a la heurística si la mejora
+    warm: dict de heuristic.solve, o None
+    Returns: el arranque a usar (dict con x y extremismo_total), o None
+    """
+    if not FLOW_SOLVER_AVAILABLE or data is None or (warm is None and self.lower_bound is not None):
+      return warm
+    # El oráculo nunca detiene a MiniZinc: si falla, se sigue sin su cota
+    try:
+      with profiler.span(self.profile, "flujo lagrangiano (oráculo)"):
+        result = flow_solver.solve(data)
+    except Exception:
+      return warm
+    if self.lower_bound is None or result['bound'] > self.lower_bound:
+      self.lower_bound = result['bound']
+    if warm is None or result['extremismo_total'] >= warm['extremismo_total']:
+      return warm
+    self.root.after(0, self._show_portfolio_solution, {
+      'solution': Solution.from_result(result),
+      'objective': result['extremismo_total'],
+      'racer': 'flujo lagrangiano',
+      'time': time.time() - start_time
+    })
+    return result
+
+  def _bound_models(self, warm):
+    """
+    Fragmentos .mzn que acotan el objetivo: por arriba con el arranque y por
+    abajo con la cota inferior; si la solución de MiniZinc alcanza la cota,
+    no queda nada por demostrar
+    Returns: lista de Path (temporales que se borran al terminar)
+    """
+    extra_models = [heuristic.write_bound_model(warm['extremismo_total'])] if warm else []
+    if FLOW_SOLVER_AVAILABLE and self.lower_bound is not None:
+      extra_models.append(flow_solver.write_bound_model(self.lower_bound))
+    return extra_models
+
+  def _load_instance(self, dzn_file):
+    """
+    Lee la instancia con la que se decodifican y muestran las soluciones
+    Returns: Instance, o None si no hay numpy (se muestra el texto de MiniZinc)
+    """
+    with profiler.span(self.profile, "leer instancia", archivo=Path(dzn_file).name):
+      self.instance = parse_dzn_file(dzn_file) if SOLUTION_AVAILABLE else None
+    return self.instance
+
+  def _warm_start(self, data, start_time):
+    """
+    Corre la heurística (si está activado el arranque) y la muestra de inmediato
+    Returns: dict de heuristic.solve, o None
+    """
+    if not (self.warm_var.get() and HEURISTIC_AVAILABLE) or data is None:
+      return None
+    self.root.after(0, self.status_var.set, "Calculando solución heurística...")
+    with profiler.span(self.profile, "heurística (arranque)"):
+      result = heuristic.solve(data, time_limit=heuristic.SEARCH_TIME)
+    solution = {
+      'solution': Solution.from_result(result),
+      'objective': result['extremismo_total'],
+      'racer': 'heurística',
+      'time': time.time() - start_time
+    }
+    self.root.after(0, self._show_portfolio_solution, solution)
+    return result
+
+  def _show_portfolio_solution(self, solution):
+    """Muestra una mejora del portafolio indicando qué competidor la encontró"""
+    self._show_solution(solution['solution'], solution['time'])
+    self.objective_history.append((solution['time'], solution['objective']))
+    self.draw_objective_history()
+    self.status_var.set(f"Mejor solución: extremismo {solution['objective']:.3f} "
+                        f"({solution['racer']}, {solution['time']:.2f}s)")
+
   def _show_minizinc_error(self):
     """Muestra error cuando MiniZinc no está instalado"""
     self._execution_finished()
@@ -359,21 +1333,34 @@ class MinExtGUI:
     self._execution_finished()
     messagebox.showerror("Error de Ejecución", f"Error ejecutando el modelo:\n{error_msg}")
 
-  def _update_results(self, stdout, stderr, execution_time, return_code):
-    """Actualiza los resultados en la UI"""
+  def _update_results(self, stdout, stderr, execution_time, return_code, solution=None):
+    """
+    Actualiza los resultados en la UI
+    solution: Solution decodificada (None si solo hay el texto de MiniZinc)
+    """
     self._execution_finished()
     
+    # El texto de la solución solo se genera si el motor no entregó salida propia
+    text = None
+    if solution is not None and not stdout.strip():
+      with profiler.span(self.profile, "generar texto de la solución"):
+        text = stdout = solution.render(self.instance)
+    
     # Mostrar salida completa
     full_output = f"=== STDOUT ===\n{stdout}\n\n=== STDERR ===\n{stderr}\n\n"
     full_output += f"=== INFO ===\nCódigo de salida: {return_code}\n"
     full_output += f"Tiempo de ejecución: {execution_time:.2f} segundos"
     
-    self.output_text.delete(1.0, tk.END)
-    self.output_text.insert(1.0, full_output)
+    with profiler.span(self.profile, "mostrar salida completa", caracteres=len(full_output)):
+      self._set_output(full_output)
     
-    if return_code == 0 and stdout.strip():
+    if return_code == 0 and solution is not None:
       # Procesar la solución
-      self._parse_solution(stdout, execution_time)
+      self._show_solution(solution, execution_time, text)
+      self._store_result(solution, stdout, stderr, execution_time)
+      self.status_var.set(f"Modelo ejecutado exitosamente en {execution_time:.2f}s")
+    elif return_code == 0 and stdout.strip():
+      self._show_raw_output(stdout, execution_time)
       self.status_var.set(f"Modelo ejecutado exitosamente en {execution_time:.2f}s")
     else:
       # Error en la ejecución
@@ -381,73 +1368,91 @@ class MinExtGUI:
       self.results_text.delete(1.0, tk.END)
       self.results_text.insert(1.0, f"Error en la ejecución:\n{error_msg}")
       self.status_var.set("Error en la ejecución del modelo")
+    
+    self._show_profile()
 
-  def _parse_solution(self, output, execution_time):
-    """Parsea la solución del output de MiniZinc"""
+  def _show_solution(self, solution, execution_time, text=None):
+    """
+    Muestra una solución: métricas calculadas sobre los arreglos, el texto
+    con el formato del modelo y las tablas
+    text: texto ya generado con solution.render (se genera si falta)
+    """
     try:
       # Actualizar tiempo
       self.tiempo_label.config(text=f"{execution_time:.2f} segundos")
       
-      # Formatear y mostrar resultado
-      if UTILS_AVAILABLE:
-        formatted_output = format_solution_output(output)
+      # Formatear y mostrar resultado; con las tablas el texto se recorta a
+      # las primeras líneas de movimientos y de distribución
+      if VIEWS_AVAILABLE:
+        with profiler.span(self.profile, "generar texto de la solución"):
+          text = solution.render(self.instance, limit=views.TEXT_LINES)
+      elif text is None:
+        with profiler.span(self.profile, "generar texto de la solución"):
+          text = solution.render(self.instance)
+      with profiler.span(self.profile, "mostrar solución", caracteres=len(text)):
         self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(1.0, formatted_output)
-        
-        # Extraer métricas
-        metrics = extract_solution_metrics(output)
-        
-        # Actualizar labels con métricas
-        if metrics['extremismo_total'] is not None:
-          self.extremismo_label.config(text=f"{metrics['extremismo_total']:.3f}")
-        
-        if metrics['costo_usado'] is not None and metrics['costo_limite'] is not None:
-          porcentaje = (metrics['costo_usado'] / metrics['costo_limite']) * 100
-          self.costo_label.config(text=f"{metrics['costo_usado']:.2f} / {metrics['costo_limite']:.2f} ({porcentaje:.1f}%)")
-        
-        if metrics['movimientos_usados'] is not None and metrics['movimientos_limite'] is not None:
-          porcentaje = (metrics['movimientos_usados'] / metrics['movimientos_limite']) * 100
-          self.movimientos_label.config(text=f"{metrics['movimientos_usados']} / {metrics['movimientos_limite']} ({porcentaje:.1f}%)")
-          
+        self.results_text.insert(1.0, format_solution_output(text))
+      with profiler.span(self.profile, "mostrar tablas"):
+        self._show_tables(solution)
+      
+      # Actualizar labels con métricas
+      with profiler.span(self.profile, "verificar y calcular métricas"):
+        metrics = solution.metrics(self.instance)
+      if metrics['extremismo_total'] is not None:
+        self.extremismo_label.config(text=f"{metrics['extremismo_total']:.3f}")
+      
+      porcentaje = (metrics['costo_usado'] / metrics['costo_limite']) * 100 if metrics['costo_limite'] else 0.0
+      self.costo_label.config(text=f"{metrics['costo_usado']:.2f} / {metrics['costo_limite']:.2f} ({porcentaje:.1f}%)")
+      
+      porcentaje = (metrics['movimientos_usados'] / metrics['movimientos_limite']) * 100 if metrics['movimientos_limite'] else 0.0
+      self.movimientos_label.config(text=f"{metrics['movimientos_usados']} / {metrics['movimientos_limite']} ({porcentaje:.1f}%)")
+      
+      self._show_gap(metrics['extremismo_total'], solution.status)
+      
+      # Verificación independiente de las restricciones 1-5 y del objetivo
+      verification = metrics['verificacion']
+      if verification == 'ok':
+        self.verification_label.config(text="Cumple las restricciones 1-5", foreground="dark green")
       else:
-        # Parseo básico sin utilidades
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(1.0, output)
-        
-        # Extraer métricas básicas
-        lines = output.split('\n')
-        
-        # Buscar extremismo total
-        for line in lines:
-          if "Extremismo Total:" in line:
-            extremismo = line.split(":")[-1].strip()
-            self.extremismo_label.config(text=extremismo)
-            break
-        
-        # Buscar costo total
-        for line in lines:
-          if "Costo total:" in line:
-            costo_part = line.split("Costo total:")[-1].strip()
-            if "/" in costo_part:
-              costo = costo_part.split("/")[0].strip()
-              self.costo_label.config(text=costo)
-            break
-        
-        # Buscar movimientos
-        for line in lines:
-          if "Movimientos:" in line:
-            mov_part = line.split("Movimientos:")[-1].strip()
-            if "/" in mov_part:
-              movimientos = mov_part.split("/")[0].strip()
-              self.movimientos_label.config(text=movimientos)
-            break
+        self.verification_label.config(text=verification, foreground="red")
+        self.status_var.set("La solución no pasó la verificación independiente")
       
       # Cambiar a la pestaña de resultados
       self.notebook.select(1)
       
     except Exception as e:
       self.results_text.delete(1.0, tk.END)
-      self.results_text.insert(1.0, f"Error parseando la solución: {str(e)}\n\nSalida original:\n{output}")
+      self.results_text.insert(1.0, f"Error mostrando la solución: {str(e)}")
+
+  def _show_tables(self, solution):
+    """Carga la solución en las tablas (cada una inserta solo su página visible)"""
+    if not self.tables:
+      return
+    self.tables['movimientos'].set_source(views.moves_source(solution, self.instance))
+    self.tables['distribucion'].set_source(views.distribution_source(solution, self.instance))
+    # La matriz de costos solo cambia con la instancia
+    costs = self.tables['costos']
+    if costs.source is None or costs.source.data is not self.instance:
+      costs.set_source(views.MatrixSource(self.instance))
+
+  def _show_raw_output(self, output, execution_time):
+    """Muestra el texto de MiniZinc tal cual (sin numpy no se decodifica)"""
+    self.tiempo_label.config(text=f"{execution_time:.2f} segundos")
+    self.results_text.delete(1.0, tk.END)
+    self.results_text.insert(1.0, output)
+    self.notebook.select(1)
+
+  def _show_gap(self, objective, status=None):
+    """Muestra la cota inferior y el gap relativo de la solución actual"""
+    if not BOUNDS_AVAILABLE or self.lower_bound is None:
+      return
+    gap = optimality_gap(objective, self.lower_bound, status)
+    text = f"{self.lower_bound:.3f}"
+    if gap is not None:
+      text += f" / {gap * 100:.2f}%"
+      if self.gap_target is not None and gap <= self.gap_target and status != 'OPTIMAL':
+        text += " (gap objetivo alcanzado)"
+    self.gap_label.config(text=text)
 
   def _execution_finished(self):
     """Limpia el estado después de la ejecución"""
@@ -457,9 +1462,14 @@ class MinExtGUI:
     self.progress.stop()
     if hasattr(self, 'current_process'):
       delattr(self, 'current_process')
+    self.current_job = None
 
   def stop_execution(self):
     """Detiene la ejecución del modelo"""
+    self.stop_event.set()
+    if self.current_job is not None and not self.current_job.done():
+      self.jobs.cancel(self.current_job)
+      self.status_var.set("Ejecución detenida por el usuario")
     if hasattr(self, 'current_process'):
       try:
         self.current_process.terminate()
@@ -468,6 +1478,13 @@ class MinExtGUI:
         pass
     self._execution_finished()
 
+  def on_close(self):
+    """Cierra la ventana terminando los trabajos de MiniZinc que sigan corriendo"""
+    self.stop_event.set()
+    if self.jobs is not None:
+      self.jobs.shutdown(timeout=jobs.KILL_GRACE + 1)
+    self.root.destroy()
+
 def main():
   """Función principal"""
   root = tk.Tk()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Motor nativo de MinExt
+Resuelve el mismo problema que Proyecto.mzn (restricciones 1-5 y objetivo
+extremismo_total) dentro del proceso de Python, sin lanzar MiniZinc.
+"""
+
+import heapq
+import time
+
+import numpy as np
+
+from instance import Instance
+
+# Tolerancia para comparar el costo (float) contra ct
+EPS = 1e-9
+
+# Mejora mínima del objetivo para no descartar un nodo
+GAP_TOL = 1e-6
+
+def move_arrays(data):
+  """
+  Movimientos (i, j) que pueden reducir el extremismo, como arreglos paralelos
+  Returns: (i, j, ganancia, costo, distancia, cota_superior), ordenados por i
+  """
+  inst = Instance.from_data(data)
+  gain = inst.gains()
+  # Mismo costo unitario que la restricción 4 del modelo
+  cost = inst.move_costs()
+  dist = inst.distances()
+
+  # Mover hacia una opinión igual o más extrema nunca mejora el objetivo
+  useful = (gain > 0) & (inst.p > 0)[:, None]
+  bound = np.minimum(inst.p[:, None], inst.maxM // np.maximum(dist, 1))
+  with np.errstate(divide='ignore'):
+    by_cost = np.where(cost > 0, np.floor((inst.ct + EPS) / cost), np.inf)
+  bound = np.where(useful, np.minimum(bound, by_cost), 0).astype(np.int64)
+
+  rows, cols = np.nonzero(bound > 0)
+  return rows, cols, gain[rows, cols], cost[rows, cols], dist[rows, cols], bound[rows, cols]
+
+def build_moves(data):
+  """
+  Construye la lista de movimientos (i, j) que pueden reducir el extremismo
+  Returns: lista de tuplas (i, j, ganancia, costo, distancia, cota_superior)
+  """
+  return list(zip(*(array.tolist() for array in move_arrays(data))))
+
+def lp_relaxation(gains, costs, dists, groups, caps, cost_limit, dist_limit,
+                  upper=None, max_pivots=None):
+  """
+  Resuelve la relajación lineal (x continua) con un simplex denso en NumPy:
+    max sum(gains*x)  s.a.  sum por grupo <= caps, sum(costs*x) <= cost_limit,
+                            sum(dists*x) <= dist_limit, x[k] <= upper[k], x >= 0
+  groups: índice de fila (0..len(caps)-1) de cada variable
+  upper: dict opcional {k: cota} para las variables acotadas por ramificación
+  Returns: (valor, x, lam, mu) con los duales de costo y movimientos,
+           o None si se supera max_pivots
+  """
+  k = len(gains)
+  r = len(caps)
+  upper = upper or {}
+  if k == 0:
+    return 0.0, np.zeros(0), 0.0, 0.0
+
+  rows = r + 2 + len(upper)
+  tableau = np.zeros((rows + 1, k + rows + 1))
+  tableau[groups, np.arange(k)] = 1.0
+  tableau[r, :k] = costs
+  tableau[r + 1, :k] = dists
+  for row, (var, bound) in enumerate(upper.items(), start=r + 2):
+    tableau[row, var] = 1.0
+    tableau[row, -1] = bound
+  tableau[np.arange(rows), k + np.arange(rows)] = 1.0
+  tableau[:r, -1] = caps
+  tableau[r, -1] = cost_limit
+  tableau[r + 1, -1] = dist_limit
+  tableau[-1, :k] = -np.asarray(gains)
+  basis = k + np.arange(rows)
+
+  if max_pivots is None:
+    max_pivots = 10 * (k + rows)
+  for _ in range(max_pivots):
+    reduced = tableau[-1, :-1]
+    col = int(np.argmin(reduced))
+    if reduced[col] >= -EPS:
+      x = np.zeros(k + rows)
+      x[basis] = tableau[:-1, -1]
+      return tableau[-1, -1], x[:k], tableau[-1, k + r], tableau[-1, k + r + 1]
+    column = tableau[:-1, col]
+    positive = column > EPS
+    ratios = np.full(rows, np.inf)
+    ratios[positive] = tableau[:-1, -1][positive] / column[positive]
+    row = int(np.argmin(ratios))
+    tableau[row] /= tableau[row, col]
+    factors = tableau[:, col].copy()
+    factors[row] = 0.0
+    tableau -= np.outer(factors, tableau[row])
+    basis[row] = col
+  return None
+
+class _Search:
+  """
+  Ramificación y acotamiento "mejor primero" sobre la relajación lineal
+  Cada nodo fija cotas inferiores/superiores de algunas x[i,j]; se ramifica
+  sobre la variable más fraccionaria y cada relajación se redondea hacia abajo
+  y se completa con un voraz para obtener soluciones factibles.
+  """
+
+  def __init__(self, data, moves, deadline, stop_event, on_improve=None, cutoff_gain=None,
+               gap=None):
+    self.data = data
+    self.deadline = deadline
+    self.stop_event = stop_event
+    self.on_improve = on_improve
+    self.cutoff_gain = cutoff_gain
+    self.gap = gap
+    self.base = float(np.dot(data['p'], data['ext']))
+    self.nodes = 0
+    self.interrupted = False
+    self.gap_reached = False
+    # Nodos que quedaron sin relajación (simplex sin converger): se descartan
+    # con la cota de su padre, y la búsqueda ya no demuestra optimalidad
+    self.unresolved = False
+    self.unresolved_gain = 0.0
+
+    self.moves = moves
+    sources = np.array([mv[0] for mv in moves], dtype=int)
+    unique, self.groups = np.unique(sources, return_inverse=True)
+    self.caps = np.array([data['p'][i] for i in unique], dtype=float)
+    self.gains = np.array([mv[2] for mv in moves])
+    self.costs = np.array([mv[3] for mv in moves])
+    self.dists = np.array([mv[4] for mv in moves], dtype=float)
+    self.bounds = np.array([mv[5] for mv in moves], dtype=int)
+    # Órdenes del voraz: ganancia por unidad de distancia y por unidad de costo
+    # (redondeadas para que los empates se decidan por el otro recurso)
+    by_dist = np.round(self.gains / self.dists, 9)
+    by_cost = np.round(self.gains / np.maximum(self.costs, EPS), 9)
+    self.greedy_orders = [np.lexsort((-by_cost, -by_dist)), np.lexsort((-by_dist, -by_cost))]
+
+    self.best_gain = 0.0
+    self.best_values = np.zeros(len(moves), dtype=int)
+    # Cota superior de la ganancia (la de los nodos que quedan abiertos)
+    self.upper_gain = 0.0
+
+  def target(self):
+    """Ganancia que un nodo debe superar: la propia o la de una fuente externa"""
+    best = self.best_gain
+    if self.cutoff_gain is not None:
+      external = self.cutoff_gain()
+      if external is not None and external > best:
+        best = external
+    return best + GAP_TOL
+
+  def stopped(self):
+    if (self.deadline is not None and time.monotonic() > self.deadline) or \
+       (self.stop_event is not None and self.stop_event.is_set()):
+      self.interrupted = True
+    return self.interrupted
+
+  def capacity_gain(self):
+    """Cota de la ganancia sin ct ni maxM: cada origen envía todo por su mejor arco"""
+    best = np.zeros(len(self.caps))
+    np.maximum.at(best, self.groups, self.gains)
+    return float(self.caps @ best)
+
+  def relax(self, lower, upper, fallback):
+    """
+    Relajación lineal con lower <= x <= upper (x = lower + y)
+    fallback: cota válida del nodo si el simplex no converge (la del padre)
+    Returns: (cota, x relajada), (fallback, None) sin relajación, o None si
+             el nodo es infactible
+    """
+    caps = self.caps - np.bincount(self.groups, weights=lower, minlength=len(self.caps))
+    cost_left = self.data['ct'] - float(self.costs @ lower)
+    dist_left = self.data['maxM'] - float(self.dists @ lower)
+    if caps.min() < -EPS or cost_left < -EPS or dist_left < -EPS:
+      return None
+    # Las cotas superiores solo se agregan como filas cuando hacen falta: las
+    # ramificadas desde el inicio y las que la relajación viole
+    span = upper - lower
+    branched = {k: float(span[k]) for k in np.flatnonzero(upper < self.bounds)}
+    while True:
+      result = lp_relaxation(self.gains, self.costs, self.dists, self.groups,
+                             caps, max(cost_left, 0.0), max(dist_left, 0.0), branched)
+      if result is None:
+        return fallback, None
+      value, y, lam, mu = result
+      violated = np.flatnonzero(y > span + 1e-7)
+      if len(violated) == 0:
+        break
+      branched.update((k, float(span[k])) for k in violated)
+    if not lower.any() and not branched:
+      self.add_dual_order(lam, mu)
+    return float(self.gains @ lower) + value, lower + y
+
+  def add_dual_order(self, lam, mu):
+    """Agrega un orden voraz por ganancia sobre el precio dual de los recursos"""
+    price = np.maximum(lam * self.costs + mu * self.dists, EPS)
+    self.greedy_orders.append(np.argsort(-self.gains / price, kind='stable'))
+
+  def round_and_fill(self, x, upper):
+    """Redondea hacia abajo y completa con cada orden voraz"""
+    base = np.floor(x + 1e-7).astype(int)
+    for order in self.greedy_orders:
+      self._fill(base.copy(), upper, order)
+
+  def _fill(self, values, upper, order):
+    """Agrega unidades en el orden dado mientras sea factible"""
+    caps = self.caps - np.bincount(self.groups, weights=values, minlength=len(self.caps))
+    cost_left = self.data['ct'] - float(self.costs @ values)
+    dist_left = self.data['maxM'] - float(self.dists @ values)
+    if caps.min() < -EPS or cost_left < -EPS or dist_left < -EPS:
+      return
+    for k in order:
+      room = min(upper[k] - values[k], caps[self.groups[k]], dist_left // self.dists[k])
+      if self.costs[k] > 0:
+        room = min(room, (cost_left + EPS) // self.costs[k])
+      if room > 0:
+        room = int(room)
+        values[k] += room
+        caps[self.groups[k]] -= room
+        cost_left -= room * self.costs[k]
+        dist_left -= room * self.dists[k]
+    gain = float(self.gains @ values)
+    if gain > self.best_gain + EPS:
+      self.best_gain = gain
+      self.best_values = values
+      if self.on_improve:
+        self.on_improve(values)
+
+  def run(self):
+    total = len(self.moves)
+    if total == 0:
+      return 0.0, self.best_values
+
+    lower = np.zeros(total, dtype=int)
+    upper = self.bounds.copy()
+    root = self.relax(lower, upper, self.capacity_gain())
+    if root is None:
+      return 0.0, self.best_values
+    heap = [(-root[0], 0, lower, upper, root[1])]
+    counter = 1
+    while heap:
+      neg_bound, _, lower, upper, x = heapq.heappop(heap)
+      # Búsqueda primero-el-mejor: ningún nodo abierto supera esta cota
+      self.upper_gain = max(-neg_bound, self.best_gain, self.unresolved_gain)
+      if -neg_bound <= self.target():
+        break
+      if self.gap is not None and \
+         self.upper_gain - self.best_gain <= self.gap * max(self.base - self.best_gain, EPS):
+        self.gap_reached = True
+        break
+      if self.stopped():
+        break
+      self.nodes += 1
+      if x is None:
+        self.unresolved = True
+        self.unresolved_gain = max(self.unresolved_gain, -neg_bound)
+        continue
+      self.round_and_fill(x, upper)
+
+      fractional = x - np.floor(x + 1e-7)
+      fractional[fractional < 1e-7] = 0.0
+      if not fractional.any():
+        continue
+      k = int(np.argmax(np.minimum(fractional, 1.0 - fractional)))
+      if fractional[k] == 0.0:
+        k = int(np.argmax(fractional))
+
+      down_upper = upper.copy()
+      down_upper[k] = int(np.floor(x[k]))
+      up_lower = lower.copy()
+      up_lower[k] = int(np.floor(x[k])) + 1
+      for child_lower, child_upper in ((lower, down_upper), (up_lower, upper)):
+        if child_lower[k] > child_upper[k]:
+          continue
+        child = self.relax(child_lower, child_upper, -neg_bound)
+        if child is None or child[0] <= self.target():
+          continue
+        heapq.heappush(heap, (-child[0], counter, child_lower, child_upper, child[1]))
+        counter += 1
+    else:
+      self.upper_gain = max(self.best_gain, self.unresolved_gain)
+    return self.best_gain, self.best_values
+
+def _solution_from_values(data, moves, values):
+  """Arma x, f y extremismo_total a partir de las cantidades de cada movimiento"""
+  inst = Instance.from_data(data)
+  x = np.zeros((inst.m, inst.m), dtype=np.int64)
+  if moves:
+    rows, cols = np.array([mv[:2] for mv in moves]).T
+    x[rows, cols] = np.asarray(values, dtype=np.int64)
+  return {
+    'x': x.tolist(),
+    'f': inst.final_distribution(x).tolist(),
+    'extremismo_total': inst.objective(x)
+  }
+
+def solve(data, time_limit=None, stop_event=None, on_solution=None, cutoff=None, gap=None,
+          initial=None):
+  """
+  Resuelve una instancia MinExt de forma exacta con ramificación y acotamiento
+  data: dict con n, m, p, ext, ce, c, ct, maxM (como parse_data_file)
+  time_limit: segundos máximos de búsqueda (None = sin límite)
+  stop_event: threading.Event opcional para detener la búsqueda
+  on_solution: callback(solution) con cada solución que mejora (x, f, extremismo_total)
+  cutoff: función opcional que devuelve el mejor extremismo_total conocido por
+          otra fuente (o None); se poda todo lo que no lo mejore, de modo que
+          OPTIMAL con un objetivo peor significa que ese valor externo es óptimo
+  gap: gap relativo (p. ej. 0.01) con el que se detiene la búsqueda antes de
+       demostrar optimalidad
+  initial: matriz x factible opcional (p. ej. de la heurística) que se usa como
+           incumbente inicial para podar desde el primer nodo
+  Returns: dict con x, f, extremismo_total, status, bound (cota inferior del
+           objetivo demostrada por la búsqueda), nodes y time
+  """
+  start = time.monotonic()
+  deadline = start + time_limit if time_limit else None
+  data = Instance.from_data(data)
+  base = float(data.p @ data.ext)
+  moves = build_moves(data)
+
+  on_improve = None
+  if on_solution:
+    on_improve = lambda values: on_solution(_solution_from_values(data, moves, values))
+  cutoff_gain = None
+  if cutoff:
+    def external_gain():
+      value = cutoff()
+      return None if value is None else base - value
+    cutoff_gain = external_gain
+
+  search = _Search(data, moves, deadline, stop_event, on_improve, cutoff_gain, gap)
+  if initial is not None and moves:
+    x = np.asarray(initial, dtype=np.int64)
+    rows, cols = np.array([mv[:2] for mv in moves]).T
+    values = x[rows, cols]
+    # Solo si todos sus movimientos son útiles (si no, la ganancia no coincide)
+    if values.sum() == x.sum():
+      search.best_values = values
+      search.best_gain = float(search.gains @ values)
+  _, values = search.run()
+
+  result = _solution_from_values(data, search.moves, values)
+  result.update({
+    'status': 'SATISFIED' if search.interrupted or search.gap_reached or search.unresolved else 'OPTIMAL',
+    'bound': base - max(search.upper_gain, search.best_gain),
+    'nodes': search.nodes,
+    'time': time.monotonic() - start
+  })
+  return result
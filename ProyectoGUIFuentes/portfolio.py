@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resolución por portafolio
+Lanza en paralelo varias configuraciones (solvers de MiniZinc, modelo original o
+de flujo, y el motor nativo) sobre la misma instancia, comparte el mejor
+objetivo encontrado y detiene a las demás apenas una demuestra optimalidad.
+Los competidores de MiniZinc corren como trabajos de un JobManager propio, así
+que detenerlos termina todo su grupo de procesos (el solver incluido). Cada uno
+arranca acotado por el mejor objetivo de la carrera en ese momento; MiniZinc no
+recibe cotas nuevas durante la búsqueda, así que las mejoras posteriores solo
+las aprovecha el motor nativo.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+
+from utils import get_project_paths, parse_dzn_file
+from jobs import JobManager
+from solution import Solution
+
+# Configuraciones de MiniZinc del portafolio: solver, modelo (clave de
+# get_project_paths) y opciones adicionales del solver
+PORTFOLIO = [
+  {'nombre': 'gecode', 'solver': 'Gecode', 'modelo': 'model', 'args': []},
+  {'nombre': 'gecode-flujo', 'solver': 'Gecode', 'modelo': 'flow_model', 'args': []},
+  {'nombre': 'chuffed-flujo', 'solver': 'Chuffed', 'modelo': 'flow_model', 'args': ['-f']},
+  {'nombre': 'cbc', 'solver': 'COIN-BC', 'modelo': 'model', 'args': []},
+  {'nombre': 'highs', 'solver': 'HiGHS', 'modelo': 'model', 'args': []},
+]
+
+NATIVE_RACER = 'nativo'
+HEURISTIC_RACER = 'heuristica'
+
+# El modelo imprime el objetivo con 3 decimales; un valor leído del texto puede
+# estar hasta media unidad del último decimal por debajo del real (con salida
+# JSON el objetivo es exacto y no hace falta)
+PRINT_TOLERANCE = 5e-4
+
+def available_solvers():
+  """
+  Solvers que reporta "minizinc --solvers-json"
+  Returns: set con nombres e identificadores en minúsculas (vacío si no hay MiniZinc)
+  """
+  try:
+    result = subprocess.run(['minizinc', '--solvers-json'], capture_output=True,
+                            text=True, encoding='utf-8', timeout=30)
+    solvers = json.loads(result.stdout)
+  except (OSError, subprocess.SubprocessError, ValueError):
+    return set()
+
+  names = set()
+  for solver in solvers:
+    for field in ('name', 'id'):
+      value = str(solver.get(field, '')).lower()
+      if value:
+        names.add(value)
+        names.add(value.rsplit('.', 1)[-1])
+  return names
+
+def select_configs(configs=None, solvers=None):
+  """
+  Filtra las configuraciones cuyo solver está instalado
+  Returns: lista de configuraciones
+  """
+  configs = PORTFOLIO if configs is None else configs
+  solvers = available_solvers() if solvers is None else solvers
+  return [config for config in configs if config['solver'].lower() in solvers]
+
+class _Race:
+  """Estado compartido entre los competidores: mejor solución y ganador"""
+
+  def __init__(self, start_time, on_solution=None, stop_when=None):
+    self.lock = threading.Lock()
+    self.start_time = start_time
+    self.on_solution = on_solution
+    self.best = None
+    self.bound = None
+    self.winner = None
+    self.final_status = None
+    self.history = []
+    # stop_when(objetivo) -> bool: la carrera termina sin demostrar optimalidad
+    self.stop_when = stop_when
+    self.done = threading.Event()
+
+  def offer(self, racer, solution, tolerance=0.0):
+    """Registra una solución (Solution) si mejora el mejor objetivo compartido"""
+    objective = solution.objective if solution is not None else None
+    with self.lock:
+      if objective is None or (self.best is not None and
+                               objective >= self.best['objective'] - 1e-9):
+        return
+      elapsed = time.time() - self.start_time
+      self.best = {'racer': racer, 'solution': solution, 'objective': objective, 'time': elapsed}
+      self.bound = objective + tolerance
+      self.history.append((elapsed, objective, racer))
+      solution = dict(self.best, index=len(self.history) - 1)
+    if self.on_solution:
+      self.on_solution(solution)
+    if self.stop_when and self.stop_when(objective):
+      self.finish(racer, 'SATISFIED')
+
+  def cutoff(self):
+    """Mejor objetivo conocido (con la tolerancia de impresión) para podar"""
+    return self.bound
+
+  def finish(self, racer, status):
+    """Un competidor demostró optimalidad (o infactibilidad): termina la carrera"""
+    with self.lock:
+      if self.winner is None:
+        self.winner = racer
+        self.final_status = status
+    self.done.set()
+
+def _race_minizinc(race, jobs, config, model_file, dzn_file, data, time_limit, cache,
+                   report, stop_event):
+  """
+  Competidor MiniZinc: un trabajo de jobs que transmite sus soluciones a la
+  carrera; al activarse stop_event se cancela (termina el grupo de procesos).
+  Se acota con race.cutoff() al lanzarse (la heurística, con arranque en
+  caliente): una mejora posterior de otro competidor no le llega, porque
+  MiniZinc no acepta cotas nuevas durante la búsqueda y reiniciarlo
+  descartaría lo explorado
+  """
+  name = config['nombre']
+  # Sin datos el objetivo se lee del texto, redondeado a 3 decimales
+  tolerance = 0.0 if data is not None else PRINT_TOLERANCE
+  try:
+    cutoff = race.cutoff()
+    # La cota es de este competidor: el trabajo la borra al terminar
+    extra_models = []
+    if cutoff is not None:
+      import heuristic
+
+      extra_models = [heuristic.write_bound_model(cutoff)]
+    try:
+      job = jobs.submit_minizinc(
+        model_file, dzn_file, config['solver'], time_limit * 1000, cache=cache,
+        extra_args=config['args'], extra_models=extra_models, data=data, name=f"portafolio/{name}",
+        on_solution=lambda s: race.offer(name, s['solution'], tolerance)
+      )
+    except Exception:
+      for path in extra_models:
+        os.remove(path)
+      raise
+    while not job.future.done():
+      if stop_event.wait(0.1):
+        jobs.cancel(job)
+        break
+    result = job.wait()
+    if 'error' in result:
+      raise result['error']
+    status = result['status']
+    if result['returncode'] != 0 and not result['stopped']:
+      status = 'ERROR'
+    best = result['best']
+    report[name] = {
+      'estado': 'DETENIDO' if result['stopped'] and status not in ('OPTIMAL', 'UNSATISFIABLE') else status,
+      'extremismo_total': best['metrics']['extremismo_total'] if best else None,
+      'error': result['stderr'].strip() if status == 'ERROR' else None
+    }
+    if status in ('OPTIMAL', 'UNSATISFIABLE') and not result['stopped']:
+      race.finish(name, status)
+  except Exception as e:
+    report[name] = {'estado': 'ERROR', 'extremismo_total': None, 'error': str(e)}
+
+def _race_native(race, data, time_limit, initial, report, stop_event):
+  """Competidor nativo: poda con el mejor objetivo de todo el portafolio"""
+  import native_solver
+
+  def on_solution(solution):
+    race.offer(NATIVE_RACER, Solution.from_result(solution, 'SATISFIED'))
+
+  try:
+    result = native_solver.solve(data, time_limit=time_limit, stop_event=stop_event,
+                                 on_solution=on_solution, cutoff=race.cutoff, initial=initial)
+    # Con la poda compartida, OPTIMAL demuestra que el mejor objetivo del
+    # portafolio es óptimo aunque lo haya encontrado otro competidor
+    race.offer(NATIVE_RACER, Solution.from_result(result))
+    stopped = stop_event.is_set()
+    report[NATIVE_RACER] = {
+      'estado': 'DETENIDO' if stopped else result['status'],
+      'extremismo_total': result['extremismo_total'],
+      'error': None
+    }
+    if result['status'] == 'OPTIMAL' and not stopped:
+      race.finish(NATIVE_RACER, 'OPTIMAL')
+  except Exception as e:
+    report[NATIVE_RACER] = {'estado': 'ERROR', 'extremismo_total': None, 'error': str(e)}
+
+def run_portfolio(dzn_file, time_limit=60.0, configs=None, native=True,
+                  on_solution=None, stop_event=None, cache=None, paths=None, gap=None,
+                  lower=None, warm_start=False):
+  """
+  Resuelve una instancia con todas las configuraciones a la vez
+  configs: configuraciones de MiniZinc (por defecto, las de PORTFOLIO instaladas)
+  native: incluir el motor nativo (requiere numpy)
+  on_solution: callback(solution) con cada mejora global; solution es un dict con
+               racer, solution (Solution), objective, time e index
+  stop_event: threading.Event para detener todo el portafolio
+  gap: gap relativo respecto a la cota inferior con el que se detiene la carrera
+  lower: cota inferior ya calculada (si no, se calcula cuando hay gap)
+  warm_start: arrancar con la heurística voraz: su solución entra primero a la
+              carrera, acota el objetivo de MiniZinc y es el incumbente del nativo
+  Returns: dict con best, status, winner, racers {nombre: resumen}, history
+           [(t, objetivo, competidor)], cota_inferior, solution (Solution con el
+           estado final, o None), stopped y time
+  """
+  paths = paths or get_project_paths()
+  configs = select_configs(configs)
+  start_time = time.time()
+  data = parse_dzn_file(dzn_file)
+  stop_when = None
+  if gap is not None:
+    from bounds import lower_bound, gap_reached
+
+    if lower is None:
+      lower = lower_bound(data)['cota_inferior']
+    stop_when = lambda objective: gap_reached(objective, lower, gap)
+  race = _Race(start_time, on_solution, stop_when)
+  jobs = JobManager(max_concurrent=max(len(configs), 1))
+  report = {}
+  racer_events = []
+  threads = []
+
+  def launch(target, *args):
+    event = threading.Event()
+    thread = threading.Thread(target=target, args=(race, *args, event))
+    thread.daemon = True
+    racer_events.append(event)
+    threads.append(thread)
+
+  # La heurística corre antes de la carrera: su solución es el primer incumbente
+  # y la cota con que arrancan los competidores de MiniZinc
+  initial = None
+  if warm_start:
+    import heuristic
+
+    result = heuristic.solve(data, time_limit=min(heuristic.SEARCH_TIME, time_limit))
+    initial = result['x']
+    report[HEURISTIC_RACER] = {'estado': result['status'], 'extremismo_total': result['extremismo_total'],
+                               'error': None}
+    race.offer(HEURISTIC_RACER, Solution.from_result(result))
+
+  try:
+    for config in configs:
+      launch(_race_minizinc, jobs, config, paths[config['modelo']], dzn_file, data, time_limit, cache,
+             report)
+    if native:
+      launch(_race_native, data, time_limit, initial, report)
+
+    if not threads:
+      raise RuntimeError("No hay solvers disponibles para el portafolio")
+
+    for thread in threads:
+      thread.start()
+
+    # Al terminar la carrera (o al detenerla) se detienen los demás competidores
+    while any(thread.is_alive() for thread in threads):
+      if race.done.wait(0.1) or (stop_event is not None and stop_event.is_set()):
+        for event in racer_events:
+          event.set()
+        for thread in threads:
+          thread.join()
+        break
+  finally:
+    jobs.shutdown()
+
+  best = race.best
+  status = race.final_status
+  # Sin cota el modelo siempre es factible: "insatisfacible" significa que nadie
+  # mejora la cota con que arrancó el competidor (el mejor objetivo o uno peor)
+  if status == 'UNSATISFIABLE' and best is not None:
+    status = 'OPTIMAL'
+  if status is None:
+    status = 'SATISFIED' if best is not None else 'UNKNOWN'
+
+  return {
+    'best': best,
+    'status': status,
+    'winner': race.winner or (best['racer'] if best else None),
+    'racers': report,
+    'history': race.history,
+    'cota_inferior': lower,
+    'solution': best['solution'].with_status(status) if best else None,
+    'stopped': stop_event is not None and stop_event.is_set(),
+    'time': time.time() - start_time
+  }
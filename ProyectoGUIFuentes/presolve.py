@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Preprocesamiento (presolve) de instancias MinExt
+Antes de generar el .dzn elimina los pares (i, j) que nunca pueden estar en una
+solución óptima y las opiniones que quedan sin pares, y entrega la instancia
+reducida con la correspondencia a los índices originales:
+  - pares prohibidos: i = j, sin ganancia (ext[j] >= ext[i]), origen vacío, o
+    que por sí solos exceden maxM o ct (mismo filtro que el motor nativo)
+  - pares dominados: para el mismo origen, otro destino con ganancia mayor o
+    igual, costo menor o igual y distancia menor o igual. Como los destinos no
+    tienen capacidad, mover esas personas al dominante nunca empeora la
+    solución; entre pares equivalentes (iguales en todo) queda el de menor índice
+  - opiniones eliminadas: las que no son origen ni destino de ningún par; su
+    f queda fija en p y su extremismo pasa a la constante ext_fijo
+La instancia reducida se resuelve con ProyectoReducido.mzn (las distancias
+originales y la cota de cada par van como parámetros) y x y f se traducen de
+vuelta con Presolve.expand.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from instance import Instance
+from native_solver import move_arrays
+from solution import Solution
+
+# Máximo de comparaciones (candidatos al cuadrado) de la dominancia exacta por
+# origen; los orígenes con más candidatos conservan todos sus pares
+DOMINANCE_LIMIT = 1 << 24
+
+def dominated_pairs(rows, gains, costs, dists, limit=DOMINANCE_LIMIT):
+  """
+  Marca los pares dominados por otro del mismo origen
+  rows: origen de cada par, ordenado (como lo entrega move_arrays)
+  Returns: arreglo bool, True en los pares dominados
+  """
+  dominated = np.zeros(len(rows), dtype=bool)
+  if len(rows) == 0:
+    return dominated
+  starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+  ends = np.r_[starts[1:], len(rows)]
+  for start, end in zip(starts.tolist(), ends.tolist()):
+    k = end - start
+    if k < 2 or k * k > limit:
+      continue
+    g, c, d = gains[start:end], costs[start:end], dists[start:end]
+    # [a, b]: b es igual o mejor que a en todo y estrictamente mejor en algo,
+    # o igual en todo y de índice menor (así entre equivalentes queda uno)
+    no_worse = (g[None, :] >= g[:, None]) & (c[None, :] <= c[:, None]) & (d[None, :] <= d[:, None])
+    better = (g[None, :] > g[:, None]) | (c[None, :] < c[:, None]) | (d[None, :] < d[:, None])
+    earlier = np.tri(k, k, -1, dtype=bool)
+    dominated[start:end] = (no_worse & (better | earlier)).any(axis=1)
+  return dominated
+
+class Presolve:
+  """
+  Instancia reducida y su correspondencia con la original
+  index: índices originales (desde 0) de las opiniones que quedan, en orden
+  reduced: Instance con esas opiniones (p, ext, ce y c originales; n, ct y
+           maxM sin cambios), o None si no queda ninguna
+  distances: distancias originales |j - i| entre las opiniones que quedan
+  bounds: cota de x por par de la instancia reducida (0 = par eliminado)
+  fixed: extremismo de las opiniones eliminadas
+  stats: dict con opiniones y pares antes y después
+  """
+
+  def __init__(self, original, index, bounds, stats):
+    self.original = original
+    self.index = np.asarray(index, dtype=np.int64)
+    self.bounds = np.asarray(bounds, dtype=np.int64)
+    self.stats = stats
+    removed = np.ones(original.m, dtype=bool)
+    removed[self.index] = False
+    self.fixed = float(original.p[removed] @ original.ext[removed])
+    self.distances = np.abs(self.index[None, :] - self.index[:, None])
+    self.reduced = None
+    if len(self.index):
+      sub = np.ix_(self.index, self.index)
+      self.reduced = Instance(original.n, len(self.index), original.p[self.index],
+                              original.ext[self.index], original.ce[self.index],
+                              original.c[sub], original.ct, original.maxM)
+
+  @property
+  def m(self):
+    """Opiniones de la instancia reducida"""
+    return len(self.index)
+
+  def write_dzn(self, output_path=None):
+    """
+    Escribe la instancia reducida para ProyectoReducido.mzn: los datos de
+    siempre más d, cota y ext_fijo
+    output_path: destino (por defecto un temporal que el llamador debe borrar)
+    Returns: Path del archivo
+    """
+    if output_path is None:
+      fd, output_path = tempfile.mkstemp(prefix="minext-reducida-", suffix=".dzn")
+      os.close(fd)
+    output_path = Path(output_path)
+    self.reduced.write_dzn(output_path)
+    with open(output_path, 'a', encoding='utf-8') as f:
+      f.write("\n% Preprocesamiento: distancias originales, cota de cada par y extremismo fijo\n")
+      f.write(f"d = array2d(1..m, 1..m, {self.distances.ravel().tolist()});\n")
+      f.write(f"cota = array2d(1..m, 1..m, {self.bounds.ravel().tolist()});\n")
+      f.write(f"ext_fijo = {self.fixed!r};\n")
+    return output_path
+
+  def expand_x(self, x):
+    """
+    Returns: matriz x (m×m) de la instancia original a partir de la reducida
+    """
+    full = np.zeros((self.original.m, self.original.m), dtype=np.int64)
+    if self.m:
+      full[np.ix_(self.index, self.index)] = np.asarray(x, dtype=np.int64)
+    return full
+
+  def expand(self, solution):
+    """
+    Traduce una solución de la instancia reducida a la original (f y el
+    extremismo se recalculan sobre la original)
+    Returns: Solution, o None si solution es None
+    """
+    if solution is None:
+      return None
+    x = self.expand_x(solution.x)
+    return Solution(x, self.original.final_distribution(x), self.original.objective(x),
+                    solution.status)
+
+  def trivial_solution(self):
+    """
+    Solución cuando no queda ningún par: nadie se mueve y es óptima
+    Returns: Solution
+    """
+    return self.expand(Solution(np.zeros((self.m, self.m), dtype=np.int64),
+                                np.zeros(self.m, dtype=np.int64), None, 'OPTIMAL'))
+
+  def summary(self):
+    """Texto corto con la reducción lograda"""
+    stats = self.stats
+    return (f"Preprocesamiento: {stats['opiniones']} -> {stats['opiniones_reducidas']} opiniones, "
+            f"{stats['pares']} -> {stats['pares_reducidos']} pares "
+            f"({stats['pares_dominados']} dominados o equivalentes)")
+
+def presolve(data, dominance_limit=DOMINANCE_LIMIT):
+  """
+  Reduce la instancia (ver el docstring del módulo)
+  Returns: Presolve
+  """
+  inst = Instance.from_data(data)
+  rows, cols, gains, costs, dists, bounds = move_arrays(inst)
+  dominated = dominated_pairs(rows, gains, costs, dists, dominance_limit)
+  keep = ~dominated
+  rows, cols, bounds = rows[keep], cols[keep], bounds[keep]
+
+  index = np.union1d(rows, cols)
+  position = np.full(inst.m, -1, dtype=np.int64)
+  position[index] = np.arange(len(index))
+  reduced_bounds = np.zeros((len(index), len(index)), dtype=np.int64)
+  reduced_bounds[position[rows], position[cols]] = bounds
+
+  stats = {
+    'opiniones': inst.m,
+    'opiniones_reducidas': int(len(index)),
+    'pares': inst.m * inst.m,
+    'pares_utiles': int(len(keep)),
+    'pares_dominados': int(dominated.sum()),
+    'pares_reducidos': int(keep.sum())
+  }
+  return Presolve(inst, index, reduced_bounds, stats)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil de una ejecución de MinExt por etapas
+Registra intervalos con nombre (lectura de la instancia, cotas, preprocesamiento,
+compilación y ejecución de MiniZinc, texto y pintado de la solución) desde
+cualquier hilo, junto con las estadísticas que MiniZinc reporta con
+--statistics (tiempo de aplanamiento y de búsqueda, nodos, fallos, profundidad
+máxima). El perfil se exporta como traza de Chrome (chrome://tracing o
+https://ui.perfetto.dev) y la pestaña "Perfil" de la interfaz muestra el
+desglose de la última ejecución.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Prefijo de las líneas de estadísticas en la salida de texto de MiniZinc
+STAT_PREFIX = "%%%mzn-stat"
+
+# Estadísticas que se muestran primero (el resto va en orden alfabético)
+STAT_ORDER = ['flatTime', 'solveTime', 'time', 'initTime', 'nodes', 'failures',
+              'peakDepth', 'propagations', 'propagators', 'variables', 'restarts',
+              'nSolutions', 'objective', 'objectiveBound']
+
+# Fases de MiniZinc que se agregan como intervalos dentro de su ejecución
+SOLVER_PHASES = [('flatTime', "aplanamiento (MiniZinc)"), ('solveTime', "búsqueda (MiniZinc)")]
+
+def parse_statistics_line(line):
+  """
+  Decodifica una línea '%%%mzn-stat: clave=valor' de la salida de texto
+  Returns: (clave, valor) con el valor numérico si se puede, o None
+  """
+  line = line.strip()
+  if not line.startswith(STAT_PREFIX + ":"):
+    return None
+  key, sep, value = line[len(STAT_PREFIX) + 1:].strip().partition('=')
+  if not sep:
+    return None
+  return key.strip(), _number(value.strip())
+
+def parse_statistics(text):
+  """
+  Returns: dict con todas las estadísticas de una salida de texto de MiniZinc
+  """
+  statistics = {}
+  for line in text.splitlines():
+    item = parse_statistics_line(line)
+    if item is not None:
+      statistics[item[0]] = item[1]
+  return statistics
+
+def _number(value):
+  """Convierte el valor de una estadística a int o float si es número"""
+  value = value.strip('"')
+  for kind in (int, float):
+    try:
+      return kind(value)
+    except ValueError:
+      pass
+  return value
+
+def ordered_statistics(statistics):
+  """
+  Returns: lista de (clave, valor) con las estadísticas principales primero
+  """
+  first = [key for key in STAT_ORDER if key in statistics]
+  rest = sorted(key for key in statistics if key not in STAT_ORDER)
+  return [(key, statistics[key]) for key in first + rest]
+
+class Profiler:
+  """
+  Intervalos de una ejecución (seguro entre hilos)
+  spans: lista de dicts con name, start y duration (s desde el inicio del
+         perfil), depth (anidamiento en su hilo), thread y args
+  marks: eventos puntuales (p. ej. cada solución intermedia)
+  statistics: estadísticas de MiniZinc (--statistics)
+  """
+
+  def __init__(self, name="MinExt"):
+    self.name = name
+    self.origin = time.perf_counter()
+    self.spans = []
+    self.marks = []
+    self.statistics = {}
+    self._lock = threading.Lock()
+    self._local = threading.local()
+
+  def now(self):
+    """Segundos desde el inicio del perfil"""
+    return time.perf_counter() - self.origin
+
+  @contextmanager
+  def span(self, name, **args):
+    """
+    Registra la duración del bloque (se anida con los del mismo hilo)
+    args: datos libres que acompañan al intervalo en la traza
+    Returns: (en el with) el dict del intervalo, que se completa al salir
+    """
+    depth = getattr(self._local, 'depth', 0)
+    record = {'name': name, 'start': self.now(), 'duration': None, 'depth': depth,
+              'thread': threading.current_thread().name, 'args': dict(args)}
+    self._local.depth = depth + 1
+    try:
+      yield record
+    finally:
+      self._local.depth = depth
+      record['duration'] = self.now() - record['start']
+      with self._lock:
+        self.spans.append(record)
+
+  def mark(self, name, **args):
+    """Registra un evento puntual en el instante actual"""
+    with self._lock:
+      self.marks.append({'name': name, 'time': self.now(),
+                         'thread': threading.current_thread().name, 'args': dict(args)})
+
+  def add_statistics(self, statistics, parent=None):
+    """
+    Agrega las estadísticas de MiniZinc; con parent (el intervalo de su
+    ejecución) el aplanamiento y la búsqueda se agregan como intervalos hijos
+    """
+    if not statistics:
+      return
+    with self._lock:
+      self.statistics.update(statistics)
+    if parent is None or parent['duration'] is None:
+      return
+    start = parent['start']
+    for key, name in SOLVER_PHASES:
+      value = statistics.get(key)
+      if isinstance(value, (int, float)) and value > 0:
+        duration = min(float(value), parent['start'] + parent['duration'] - start)
+        with self._lock:
+          self.spans.append({'name': name, 'start': start, 'duration': max(duration, 0.0),
+                             'depth': parent['depth'] + 1, 'thread': parent['thread'],
+                             'args': {key: value}})
+        start += duration
+
+  def total(self):
+    """Segundos entre el primer inicio y el último fin de los intervalos"""
+    with self._lock:
+      spans = list(self.spans)
+    if not spans:
+      return 0.0
+    return max(s['start'] + s['duration'] for s in spans) - min(s['start'] for s in spans)
+
+  def breakdown(self):
+    """
+    Desglose por etapa en orden de inicio
+    Returns: lista de dicts con name, thread, depth, start, duration y share
+             (fracción del total de la ejecución)
+    """
+    with self._lock:
+      spans = sorted(self.spans, key=lambda s: (s['start'], s['depth']))
+    total = self.total()
+    return [dict(s, share=s['duration'] / total if total > 0 else 0.0) for s in spans]
+
+  def to_chrome_trace(self):
+    """
+    Perfil en el formato de eventos de traza de Chrome (tiempos en µs)
+    Returns: dict serializable con traceEvents y otherData
+    """
+    pid = os.getpid()
+    with self._lock:
+      spans, marks = list(self.spans), list(self.marks)
+    threads = {}
+    for item in spans + marks:
+      threads.setdefault(item['thread'], len(threads) + 1)
+
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': self.name}}]
+    events += [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread}}
+               for thread, tid in threads.items()]
+    # Los padres van antes que sus hijos con el mismo inicio
+    for s in sorted(spans, key=lambda s: (s['start'], s['depth'])):
+      events.append({'name': s['name'], 'cat': 'minext', 'ph': 'X', 'pid': pid,
+                     'tid': threads[s['thread']], 'ts': round(s['start'] * 1e6, 3),
+                     'dur': round(s['duration'] * 1e6, 3), 'args': s['args']})
+    for m in marks:
+      events.append({'name': m['name'], 'cat': 'minext', 'ph': 'i', 's': 't', 'pid': pid,
+                     'tid': threads[m['thread']], 'ts': round(m['time'] * 1e6, 3), 'args': m['args']})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms',
+            'otherData': {'nombre': self.name, 'minizinc': dict(self.statistics)}}
+
+  def write_trace(self, path):
+    """Escribe la traza de Chrome en path (JSON)"""
+    with open(path, 'w', encoding='utf-8') as f:
+      json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+    return path
+
+  def report(self):
+    """
+    Returns: texto con el desglose por etapa y las estadísticas de MiniZinc
+    """
+    lines = [f"Perfil: {self.name} ({self.total() * 1000:.1f} ms)"]
+    for s in self.breakdown():
+      lines.append(f"  {'  ' * s['depth']}{s['name']:<{36 - 2 * s['depth']}} "
+                   f"{s['duration'] * 1000:10.2f} ms {s['share'] * 100:6.1f}%")
+    for key, value in ordered_statistics(self.statistics):
+      lines.append(f"  {key:<36} {value}")
+    return '\n'.join(lines)
+
+def span(profiler, name, **args):
+  """
+  Intervalo de profiler, o un contexto que no registra nada si no hay perfil
+  activo (entrega un dict de intervalo descartable para el mismo uso)
+  """
+  if profiler is None:
+    return nullcontext({'name': name, 'args': dict(args)})
+  return profiler.span(name, **args)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché persistente de resultados de resolución
+Guarda en disco la salida de cada ejecución terminada (texto del modelo,
+métricas, matriz de movimientos y tiempo original) bajo un hash del modelo,
+los datos, el motor y sus opciones. Como el texto del modelo forma parte de la
+clave, editar Proyecto.mzn invalida las entradas sin hacer nada más.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Se incrementa si cambia la forma de guardar las entradas
+CACHE_VERSION = 2
+
+ENTRY_SUFFIX = ".json"
+
+class ResultCache:
+  """
+  Caché LRU en disco de resultados, acotada por número de entradas y bytes
+  Cada entrada es un archivo <hash>.json; su fecha de modificación se
+  actualiza en cada acierto y marca el uso reciente.
+  """
+
+  def __init__(self, cache_dir, max_entries=256, max_bytes=64 * 1024 * 1024):
+    self.cache_dir = Path(cache_dir)
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+
+  def key(self, model_file, dzn_file, solver, options=None):
+    """
+    Hash de contenido de (modelo, datos, motor, opciones)
+    model_file: modelo MiniZinc que resuelve el motor (None si no usa ninguno)
+    options: dict serializable con las opciones que cambian el resultado
+             (límite de tiempo, gap objetivo, arranque heurístico...)
+    Returns: str hexadecimal
+    """
+    digest = hashlib.sha256()
+    header = {'version': CACHE_VERSION, 'solver': solver, 'options': options or {}}
+    digest.update(json.dumps(header, sort_keys=True).encode('utf-8'))
+    for path in (model_file, dzn_file):
+      digest.update(b'\0')
+      if path is None:
+        continue
+      with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+          digest.update(chunk)
+    return digest.hexdigest()
+
+  def lookup(self, key):
+    """
+    Busca un resultado y lo marca como usado
+    Returns: dict guardado por store, o None si no está
+    """
+    path = self.cache_dir / f"{key}{ENTRY_SUFFIX}"
+    try:
+      with open(path, 'r', encoding='utf-8') as f:
+        entry = json.load(f)
+      os.utime(path)
+    except (OSError, ValueError):
+      self.misses += 1
+      return None
+    self.hits += 1
+    return entry
+
+  def store(self, key, solution, stdout, stderr, metrics, solve_time, extra=None):
+    """
+    Guarda el resultado de una ejecución terminada
+    solution: Solution (se guarda con x dispersa, ver Solution.to_dict)
+    metrics: dict de Solution.metrics
+    solve_time: segundos que tomó resolver (se muestran en cada acierto)
+    extra: campos adicionales (p. ej. la cota inferior)
+    Returns: dict guardado
+    """
+    entry = {
+      'solucion': solution.to_dict(),
+      'stdout': stdout,
+      'stderr': stderr,
+      'estado': solution.status,
+      'metricas': metrics,
+      'tiempo': solve_time,
+      'guardado': time.time()
+    }
+    entry.update(extra or {})
+    self.cache_dir.mkdir(parents=True, exist_ok=True)
+    # Escritura atómica: otro proceso nunca lee una entrada a medias
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{key[:12]}-", suffix=ENTRY_SUFFIX, dir=self.cache_dir)
+    try:
+      with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, ensure_ascii=False)
+      os.replace(tmp_path, self.cache_dir / f"{key}{ENTRY_SUFFIX}")
+    finally:
+      if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    self.evict()
+    return entry
+
+  def entries(self):
+    """
+    Returns: lista de (último_uso, bytes, archivo) de las entradas publicadas
+    """
+    if not self.cache_dir.exists():
+      return []
+    result = []
+    for path in self.cache_dir.glob(f"*{ENTRY_SUFFIX}"):
+      if path.name.startswith('.'):
+        continue
+      try:
+        stat = path.stat()
+        result.append((stat.st_mtime, stat.st_size, path))
+      except OSError:
+        continue
+    return result
+
+  def evict(self):
+    """
+    Elimina las entradas usadas hace más tiempo hasta respetar los límites
+    Returns: int - entradas eliminadas
+    """
+    entries = sorted(self.entries())
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+      _, size, path = entries.pop(0)
+      try:
+        os.remove(path)
+      except OSError:
+        pass
+      total -= size
+      removed += 1
+    return removed
+
+  def clear(self):
+    """Elimina todas las entradas"""
+    for _, _, path in self.entries():
+      try:
+        os.remove(path)
+      except OSError:
+        pass
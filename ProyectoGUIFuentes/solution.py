@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Solución tipada de MinExt
+MiniZinc se ejecuta con utils.JSON_OUTPUT_ARGS y entrega x, f
+y el objetivo como JSON, que se decodifica directo a arreglos NumPy. La interfaz,
+los lotes y el portafolio trabajan con Solution; el texto con el formato del
+bloque output de Proyecto.mzn se genera solo cuando alguien lo muestra.
+"""
+
+import json
+import re
+
+import numpy as np
+
+from instance import Instance
+from verifier import verify
+
+# Separador de soluciones de MiniZinc
+SOLUTION_SEPARATOR = "----------"
+
+# Líneas del texto del modelo (solo para salidas en texto plano)
+OBJECTIVE_PATTERN = re.compile(r"Extremismo Total:\s*([-+0-9.eE]+)")
+MOVE_PATTERN = re.compile(r"Mover\s+(\d+)\s+personas:\s+Opinión\s+(\d+)\s+→\s+Opinión\s+(\d+)")
+
+def empty_metrics():
+  """
+  Métricas de una ejecución sin solución (mismas claves que Solution.metrics)
+  """
+  return {
+    'extremismo_total': None,
+    'costo_usado': None,
+    'costo_limite': None,
+    'movimientos_usados': None,
+    'movimientos_limite': None,
+    'num_movimientos_activos': 0,
+    'verificacion': None
+  }
+
+class Solution:
+  """
+  Plan de movimientos x (int64 m×m), distribución final f (int64 m), extremismo
+  total y estado de la búsqueda (OPTIMAL, SATISFIED...)
+  """
+
+  def __init__(self, x, f, objective, status='SATISFIED'):
+    self.x = np.asarray(x, dtype=np.int64)
+    self.f = np.asarray(f, dtype=np.int64)
+    self.objective = None if objective is None else float(objective)
+    self.status = status
+    self._verification = None
+
+  @classmethod
+  def from_result(cls, result, status=None):
+    """
+    Crea la solución desde un dict con x, f, extremismo_total y status (como
+    los que devuelven native_solver.solve y heuristic.solve)
+    """
+    return cls(result['x'], result['f'], result['extremismo_total'],
+               status or result.get('status', 'SATISFIED'))
+
+  @classmethod
+  def from_json(cls, values, data=None, status='SATISFIED'):
+    """
+    Crea la solución desde el objeto JSON de MiniZinc (--output-mode json)
+    data: instancia para calcular el objetivo si no vino _objective
+    """
+    x = np.asarray(values['x'], dtype=np.int64)
+    if 'f' in values:
+      f = np.asarray(values['f'], dtype=np.int64)
+    else:
+      f = np.asarray(data['p'], dtype=np.int64) + x.sum(axis=0) - x.sum(axis=1)
+    objective = values.get('_objective', values.get('extremismo_total'))
+    if objective is None and data is not None:
+      objective = float(f @ np.asarray(data['ext'], dtype=np.float64))
+    return cls(x, f, objective, status)
+
+  @classmethod
+  def from_text(cls, output, data, status='SATISFIED'):
+    """
+    Crea la solución desde el texto del bloque output del modelo (salidas en
+    texto plano, p. ej. de un MiniZinc ejecutado sin --output-mode json)
+    Returns: Solution, o None si el texto no tiene el objetivo
+    """
+    match = OBJECTIVE_PATTERN.search(output)
+    if match is None:
+      return None
+    inst = Instance.from_data(data)
+    x = np.zeros((inst.m, inst.m), dtype=np.int64)
+    moves = np.array(MOVE_PATTERN.findall(output), dtype=np.int64).reshape(-1, 3)
+    x[moves[:, 1] - 1, moves[:, 2] - 1] = moves[:, 0]
+    return cls(x, inst.final_distribution(x), float(match.group(1)), status)
+
+  @classmethod
+  def from_dict(cls, values):
+    """
+    Crea la solución desde to_dict (movimientos dispersos)
+    """
+    m = len(values['f'])
+    x = np.zeros((m, m), dtype=np.int64)
+    moves = np.asarray(values['movimientos'], dtype=np.int64).reshape(-1, 3)
+    x[moves[:, 0], moves[:, 1]] = moves[:, 2]
+    return cls(x, values['f'], values['extremismo_total'], values['estado'])
+
+  def to_dict(self):
+    """
+    Returns: dict serializable con x disperso ([i, j, personas], desde 0), f,
+             extremismo_total y estado
+    """
+    return {
+      'movimientos': self.moves().tolist(),
+      'f': self.f.tolist(),
+      'extremismo_total': self.objective,
+      'estado': self.status
+    }
+
+  def moves(self):
+    """
+    Returns: arreglo (k, 3) con [i, j, personas] de los movimientos activos,
+             por filas como los imprime el modelo
+    """
+    rows, cols = np.nonzero(self.x)
+    return np.column_stack((rows, cols, self.x[rows, cols]))
+
+  def with_status(self, status):
+    """Misma solución con otro estado"""
+    return Solution(self.x, self.f, self.objective, status)
+
+  def verify(self, data):
+    """
+    Verifica la solución contra la instancia con verifier.verify (se guarda
+    el resultado de la última instancia)
+    Returns: Verification
+    """
+    if self._verification is None or self._verification[0] is not data:
+      self._verification = (data, verify(data, self.x, self.f, self.objective))
+    return self._verification[1]
+
+  def metrics(self, data):
+    """
+    Métricas de la solución con las mismas claves que extract_solution_metrics,
+    recalculadas por el verificador: el extremismo desde x, el costo de la
+    restricción 4 (con (1 + p[i]/n) y ce) y la distancia sum(x[i,j] * |j - i|)
+    de la restricción 5; 'verificacion' es 'ok' o las violaciones
+    Returns: dict
+    """
+    check = self.verify(data)
+    return {
+      'extremismo_total': self.objective if check.objective is None else check.objective,
+      'costo_usado': check.cost,
+      'costo_limite': float(data['ct']),
+      'movimientos_usados': check.distance,
+      'movimientos_limite': int(data['maxM']),
+      'num_movimientos_activos': check.active,
+      'verificacion': check.summary()
+    }
+
+  def render(self, data, limit=None):
+    """
+    Genera el mismo texto que el bloque output de Proyecto.mzn, para que
+    format_solution_output y extract_solution_metrics funcionen sin cambios
+    limit: máximo de líneas de movimientos y de distribución (las demás se
+           resumen en una línea; None = todas)
+    Returns: str
+    """
+    metrics = self.metrics(data)
+    moves = self.moves()
+    lines = ["=== SOLUCIÓN MINEXT ===",
+             f"Extremismo Total: {self.objective:6.3f}",
+             "",
+             "=== MOVIMIENTOS ==="]
+    lines += [f"Mover {amount} personas: Opinión {i + 1} → Opinión {j + 1}"
+              for i, j, amount in moves[:limit].tolist()]
+    if limit is not None and len(moves) > limit:
+      lines.append(f"... y {len(moves) - limit} movimientos más")
+    lines.append("")
+    lines.append("=== DISTRIBUCIÓN FINAL ===")
+    lines += [f"Opinión {i + 1}: {count} personas" for i, count in enumerate(self.f[:limit].tolist())]
+    if limit is not None and len(self.f) > limit:
+      lines.append(f"... y {len(self.f) - limit} opiniones más")
+    lines.append("")
+    lines.append("=== RECURSOS UTILIZADOS ===")
+    if metrics['costo_usado'] is not None:
+      lines.append(f"Costo total: {metrics['costo_usado']:6.2f} / {metrics['costo_limite']:6.2f}")
+      lines.append(f"Movimientos: {metrics['movimientos_usados']} / {metrics['movimientos_limite']}")
+    lines.append(SOLUTION_SEPARATOR)
+    if self.status == 'OPTIMAL':
+      lines.append("==========")
+    return '\n'.join(lines) + '\n'
+
+def decode_json(text):
+  """
+  Decodifica el objeto JSON de una solución (--output-mode json)
+  Returns: dict, o None si el texto no es JSON
+  """
+  start, end = text.find('{'), text.rfind('}')
+  if start < 0 or end < start:
+    return None
+  try:
+    values = json.loads(text[start:end + 1])
+  except json.JSONDecodeError:
+    return None
+  return values if isinstance(values, dict) and 'x' in values else None
+
+def read_solution(output, data, status=None):
+  """
+  Última solución de la salida de MiniZinc: JSON si se pidió json_output,
+  o el texto del bloque output del modelo si no
+  status: estado de la búsqueda (por defecto, el que indican los separadores)
+  Returns: Solution, o None si la salida no tiene solución
+  """
+  from utils import get_solution_status
+
+  status = status or get_solution_status(output)
+  # Cada solución termina en el separador; sin separador, el texto completo
+  parts = output.split(SOLUTION_SEPARATOR)
+  last = parts[-2] if len(parts) > 1 else parts[0]
+  values = decode_json(last)
+  if values is not None:
+    return Solution.from_json(values, data, status)
+  return Solution.from_text(last, data, status)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ejecución "anytime" de MiniZinc
+Decodifica la salida de MiniZinc con soluciones intermedias y --json-stream
+línea a línea, para entregar cada solución mejorada apenas aparece en stdout.
+Con los datos de la instancia, cada solución llega como JSON y se decodifica a
+Solution. Los procesos los lanza el gestor de trabajos (jobs.py), que termina
+todo el grupo de procesos al cancelar o al agotar el tiempo.
+"""
+
+import json
+import time
+
+from utils import get_solution_status, extract_solution_metrics
+from solution import Solution, decode_json, read_solution
+from profiler import STAT_PREFIX, parse_statistics_line
+
+# Argumentos para que MiniZinc reporte cada solución como un mensaje JSON por línea
+STREAM_ARGS = ["--intermediate-solutions", "--json-stream"]
+
+# Estados de --json-stream con el mismo nombre que usa get_solution_status
+STATUS_NAMES = {
+  'OPTIMAL_SOLUTION': 'OPTIMAL',
+  'ALL_SOLUTIONS': 'OPTIMAL',
+  'SATISFIED': 'SATISFIED',
+  'UNSATISFIABLE': 'UNSATISFIABLE',
+  'UNBOUNDED': 'UNBOUNDED',
+  'UNSAT_OR_UNBOUNDED': 'UNSATISFIABLE',
+  'UNKNOWN': 'UNKNOWN',
+  'ERROR': 'ERROR'
+}
+
+def parse_stream_message(line):
+  """
+  Decodifica una línea de --json-stream
+  Returns: dict con el mensaje, o None si la línea no es JSON
+  """
+  line = line.strip()
+  if not line.startswith('{'):
+    return None
+  try:
+    return json.loads(line)
+  except json.JSONDecodeError:
+    return None
+
+def solution_values(message):
+  """
+  Extrae x, f y _objective de un mensaje de tipo solution (--output-mode json)
+  Returns: dict, o None si la solución no vino en JSON
+  """
+  output = message.get('output', {})
+  # Según la versión, el JSON llega como sección propia o como texto
+  if isinstance(output, dict) and isinstance(output.get('json'), dict):
+    return output['json']
+  return decode_json(solution_text(message))
+
+def solution_text(message):
+  """
+  Extrae el texto del bloque output de un mensaje de tipo solution
+  """
+  output = message.get('output', {})
+  if isinstance(output, str):
+    return output
+  return output.get('default') or output.get('raw') or ''
+
+class StreamDecoder:
+  """
+  Estado de una ejecución anytime de MiniZinc
+  Decodifica las líneas de stdout (mensajes de --json-stream o texto plano) y
+  conserva el mejor incumbente, el estado final y la historia del objetivo.
+  Lo usa el gestor de trabajos (jobs.py).
+  Las estadísticas de --statistics (mensajes JSON o líneas %%%mzn-stat) se
+  guardan aparte en statistics y no llegan al texto de la solución.
+  Con mapping (Presolve de presolve.py) las soluciones llegan en índices de la
+  instancia reducida y se traducen a la original antes de calcular métricas.
+  """
+
+  def __init__(self, data=None, start_time=None, mapping=None):
+    self.data = data
+    self.mapping = mapping
+    self.start_time = start_time or time.time()
+    self.best = None
+    self.status = None
+    self.history = []
+    self.raw_lines = []
+    self.errors = []
+    self.statistics = {}
+
+  def _decode(self, values, text):
+    """
+    Solution de la instancia original a partir del JSON (o del texto)
+    """
+    data = self.mapping.reduced if self.mapping else self.data
+    solution = Solution.from_json(values, data) if values is not None else \
+               Solution.from_text(text, data)
+    return self.mapping.expand(solution) if self.mapping else solution
+
+  def feed(self, line):
+    """
+    Procesa una línea de stdout
+    Returns: dict de la solución (output, metrics, solution, time, index) si
+             mejora el incumbente, o None
+    """
+    message = parse_stream_message(line)
+    if message is None or 'type' not in message:
+      if line.startswith(STAT_PREFIX):
+        item = parse_statistics_line(line)
+        if item is not None:
+          self.statistics[item[0]] = item[1]
+        return None
+      # Salida sin --json-stream (o sin soporte): se conserva el texto plano
+      self.raw_lines.append(line)
+      return None
+
+    kind = message.get('type')
+    if kind == 'statistics':
+      self.statistics.update(message.get('statistics', {}))
+    elif kind == 'status':
+      self.status = STATUS_NAMES.get(message.get('status'), message.get('status'))
+    elif kind == 'error':
+      self.errors.append(message.get('message', json.dumps(message)) + '\n')
+    if kind != 'solution':
+      return None
+
+    data = self.data
+    text = solution_text(message)
+    solution = None
+    if data is not None:
+      solution = self._decode(solution_values(message), text)
+    metrics = solution.metrics(data) if solution else extract_solution_metrics(text)
+    objective = metrics['extremismo_total']
+    best = self.best
+    if best is not None and objective is not None and \
+       best['metrics']['extremismo_total'] is not None and \
+       objective >= best['metrics']['extremismo_total']:
+      return None
+    self.best = {
+      'output': text,
+      'metrics': metrics,
+      'solution': solution,
+      'time': time.time() - self.start_time,
+      'index': len(self.history)
+    }
+    self.history.append((self.best['time'], objective))
+    return self.best
+
+  def result(self, stderr, returncode, stopped):
+    """
+    Cierra la ejecución: sin mensajes JSON se decodifica el texto plano completo
+    stderr: texto de stderr del proceso
+    returncode: código de salida del proceso
+    stopped: True si se detuvo antes de terminar (a mano, por gap o por tiempo)
+    Returns: dict con best, status, history, solution, stdout, stderr,
+             returncode, stopped y statistics
+    """
+    data = self.data
+    raw_output = ''.join(self.raw_lines)
+    if self.best is None and raw_output.strip():
+      self.status = get_solution_status(raw_output)
+      solution = None
+      if data is not None:
+        decode_data = self.mapping.reduced if self.mapping else data
+        solution = read_solution(raw_output, decode_data, self.status)
+        if self.mapping:
+          solution = self.mapping.expand(solution)
+      metrics = solution.metrics(data) if solution else extract_solution_metrics(raw_output)
+      self.best = {'output': raw_output, 'metrics': metrics, 'solution': solution,
+                   'time': time.time() - self.start_time, 'index': 0}
+      self.history.append((self.best['time'], metrics['extremismo_total']))
+
+    best = self.best
+    status = self.status
+    if status is None:
+      status = 'SATISFIED' if best is not None else 'UNKNOWN'
+    solution = best['solution'] if best else None
+
+    return {
+      'best': best,
+      'status': status,
+      'history': self.history,
+      'solution': solution.with_status(status) if solution else None,
+      'stdout': best['output'] if best else raw_output,
+      'stderr': stderr + ''.join(self.errors),
+      'returncode': 0 if stopped and best is not None else returncode,
+      'stopped': stopped,
+      'statistics': self.statistics
+    }
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Barrido de ct y maxM sobre una instancia de MinExt
+Resuelve en paralelo una grilla de valores de ct y maxM con el motor nativo
+(la instancia se carga una sola vez por proceso) y arranca cada punto desde la
+solución de sus vecinos con menos presupuesto, que siempre es factible. Reporta
+la frontera de Pareto de extremismo contra costo contra movimientos.
+
+Uso:
+  python ProyectoGUIFuentes/sweep.py DatosDZN/Prueba10.dzn --ct 100:1000:10 --maxm 10:100:10
+  python ProyectoGUIFuentes/sweep.py DatosDZN/enunciado.dzn --ct 5,10,22 --maxm 18 --output barrido.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+import numpy as np
+
+from instance import Instance
+from utils import parse_dzn_file, write_results
+
+# Motores con que se resuelve cada punto
+BACKENDS = ['native', 'heuristic']
+
+# Columnas del reporte, en orden
+FIELDS = ['ct', 'maxM', 'estado', 'extremismo_total', 'costo', 'movimientos',
+          'personas_movidas', 'arranque', 'pareto', 'tiempo', 'error']
+
+# Instancia base de cada proceso del pool (se carga en _init_worker)
+_INSTANCE = None
+
+def parse_values(text, cast=float):
+  """
+  Lee una lista de valores ("5,10,22") o un rango inicio:fin:pasos ("100:1000:10")
+  Returns: lista ordenada de valores distintos
+  """
+  if ':' in text:
+    start, stop, steps = text.split(':')
+    values = np.linspace(float(start), float(stop), int(steps))
+  else:
+    values = [float(value) for value in text.split(',') if value.strip()]
+  return sorted({cast(round(value)) if cast is int else cast(value) for value in values})
+
+def _init_worker(dzn_file):
+  """Carga la instancia una vez por proceso; cada punto solo cambia ct y maxM"""
+  global _INSTANCE
+  _INSTANCE = parse_dzn_file(dzn_file)
+
+def _to_matrix(m, moves):
+  """Matriz x m×m a partir de los movimientos dispersos [i, j, personas]"""
+  x = np.zeros((m, m), dtype=np.int64)
+  moves = np.asarray(moves, dtype=np.int64).reshape(-1, 3)
+  x[moves[:, 0], moves[:, 1]] = moves[:, 2]
+  return x
+
+def solve_point(ct, maxM, initial, backend, time_limit):
+  """
+  Resuelve un punto de la grilla (se ejecuta dentro de un proceso del pool)
+  initial: movimientos [i, j, personas] de la mejor solución de los vecinos
+           con menos presupuesto (factible también aquí), o None
+  Returns: dict con una fila del reporte y los movimientos de la solución
+  """
+  base = _INSTANCE
+  inst = Instance(base.n, base.m, base.p, base.ext, base.ce, base.c, ct, maxM)
+  row = dict.fromkeys(FIELDS)
+  row.update({'ct': ct, 'maxM': maxM, 'arranque': initial is not None, 'pareto': False})
+  start_time = time.time()
+  try:
+    x0 = _to_matrix(inst.m, initial) if initial is not None else None
+    if backend == 'heuristic':
+      import heuristic
+
+      result = heuristic.solve(inst, time_limit=time_limit)
+    else:
+      import native_solver
+
+      result = native_solver.solve(inst, time_limit=time_limit, initial=x0)
+    x = np.asarray(result['x'], dtype=np.int64)
+    status = result['status']
+    # Con límite de tiempo el vecino puede seguir siendo mejor
+    if x0 is not None and inst.objective(x0) < inst.objective(x) - 1e-9:
+      x, status = x0, 'SATISFIED'
+    rows, cols = np.nonzero(x)
+    row.update({
+      'estado': status,
+      'extremismo_total': round(inst.objective(x), 6),
+      'costo': round(inst.cost(x), 6),
+      'movimientos': inst.moves(x),
+      'personas_movidas': int(x.sum())
+    })
+    row['_moves'] = np.column_stack((rows, cols, x[rows, cols])).tolist()
+  except Exception as e:
+    row.update({'estado': 'ERROR', 'error': str(e)})
+    row['_moves'] = None
+  row['tiempo'] = round(time.time() - start_time, 3)
+  return row
+
+def pareto_mask(points):
+  """
+  Puntos no dominados al minimizar todas las columnas; de los puntos repetidos
+  solo se marca el primero (el de menor presupuesto si vienen ordenados)
+  points: arreglo (k, d)
+  Returns: arreglo bool (k,) con True en la frontera de Pareto
+  """
+  points = np.asarray(points, dtype=np.float64)
+  mask = np.zeros(len(points), dtype=bool)
+  if len(points) == 0:
+    return mask
+  unique, first = np.unique(points, axis=0, return_index=True)
+  # dominated[a, b]: b es igual o mejor que a en todo y estrictamente mejor en algo
+  no_worse = (unique[None, :, :] <= unique[:, None, :]).all(axis=2)
+  better = (unique[None, :, :] < unique[:, None, :]).any(axis=2)
+  mask[first[~(no_worse & better).any(axis=1)]] = True
+  return mask
+
+def run_sweep(dzn_file, ct_values, maxm_values, backend='native', workers=None,
+              time_limit=10.0, on_result=None, warm_start=True):
+  """
+  Resuelve la grilla ct × maxM en paralelo, por frentes: un punto se lanza
+  cuando terminaron sus vecinos (ct anterior, maxM anterior), cuya mejor
+  solución es su incumbente inicial
+  workers: tamaño del pool (por defecto, número de núcleos)
+  time_limit: segundos por punto
+  warm_start: False lanza todos los puntos a la vez, sin incumbente inicial
+  on_result: callback opcional llamado con cada fila al terminar
+  Returns: lista de filas ordenada por (ct, maxM), con la columna pareto marcada
+  """
+  ct_values, maxm_values = sorted(ct_values), sorted(maxm_values)
+  workers = workers or os.cpu_count() or 1
+  done = {}
+  futures = {}
+
+  def neighbours(a, b):
+    if not warm_start:
+      return []
+    return [key for key in ((a - 1, b), (a, b - 1)) if key[0] >= 0 and key[1] >= 0]
+
+  def submit(a, b):
+    solved = [done[key] for key in neighbours(a, b) if done[key]['_moves'] is not None]
+    initial = min(solved, key=lambda row: row['extremismo_total'])['_moves'] if solved else None
+    future = executor.submit(solve_point, ct_values[a], maxm_values[b], initial, backend, time_limit)
+    futures[future] = (a, b)
+
+  executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(str(dzn_file),))
+  try:
+    for key in np.ndindex(len(ct_values), len(maxm_values)):
+      if not neighbours(*key):
+        submit(*key)
+    while futures:
+      finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+      for future in finished:
+        a, b = futures.pop(future)
+        done[(a, b)] = future.result()
+        if on_result:
+          on_result(done[(a, b)])
+        # Un sucesor está listo cuando terminaron todos sus vecinos
+        for key in ((a + 1, b), (a, b + 1)):
+          if key[0] < len(ct_values) and key[1] < len(maxm_values) and key not in done and \
+             all(neighbour in done for neighbour in neighbours(*key)) and \
+             key not in futures.values():
+            submit(*key)
+  finally:
+    executor.shutdown(wait=False, cancel_futures=True)
+
+  rows = [done[key] for key in sorted(done)]
+  solved = [row for row in rows if row['extremismo_total'] is not None]
+  mask = pareto_mask([[row['extremismo_total'], row['costo'], row['movimientos']] for row in solved])
+  for row, on_front in zip(solved, mask):
+    row['pareto'] = bool(on_front)
+  for row in rows:
+    row.pop('_moves', None)
+  return rows
+
+def main(argv=None):
+  """Función principal"""
+  parser = argparse.ArgumentParser(description="Barrido de ct y maxM de una instancia MinExt")
+  parser.add_argument('instance', type=Path, help="Archivo .dzn de la instancia")
+  parser.add_argument('--ct', default=None,
+                      help="Valores de ct: lista (5,10,22) o rango inicio:fin:pasos (por defecto, el de la instancia)")
+  parser.add_argument('--maxm', default=None,
+                      help="Valores de maxM: lista o rango inicio:fin:pasos (por defecto, el de la instancia)")
+  parser.add_argument('--backend', choices=BACKENDS, default='native')
+  parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                      help="Procesos en paralelo (por defecto, número de núcleos)")
+  parser.add_argument('--time-limit', type=float, default=10.0, help="Segundos por punto")
+  parser.add_argument('--no-warm-start', action='store_true',
+                      help="Resolver cada punto desde cero (sin la solución de los vecinos)")
+  parser.add_argument('--output', type=Path, default=Path("barrido.csv"),
+                      help="Archivo de salida (.csv o .json)")
+  args = parser.parse_args(argv)
+
+  data = parse_dzn_file(args.instance)
+  ct_values = parse_values(args.ct) if args.ct else [data.ct]
+  maxm_values = parse_values(args.maxm, int) if args.maxm else [data.maxM]
+  total = len(ct_values) * len(maxm_values)
+  print(f"Barrido de {total} puntos ({len(ct_values)} ct × {len(maxm_values)} maxM) "
+        f"con {args.workers} procesos ({args.backend})")
+
+  start_time = time.time()
+  rows = run_sweep(args.instance, ct_values, maxm_values, args.backend, args.workers,
+                   args.time_limit, warm_start=not args.no_warm_start)
+  write_results(rows, args.output, FIELDS)
+
+  front = sorted((row for row in rows if row['pareto']), key=lambda row: row['extremismo_total'])
+  print(f"Frontera de Pareto ({len(front)} de {total} puntos):")
+  print(f"  {'extremismo':>12} {'costo':>12} {'movimientos':>12}   {'ct':>10} {'maxM':>6}")
+  for row in front:
+    print(f"  {row['extremismo_total']:>12.3f} {row['costo']:>12.2f} {row['movimientos']:>12}   "
+          f"{row['ct']:>10g} {row['maxM']:>6}")
+  print(f"Barrido completado en {time.time() - start_time:.2f}s. Resultados en: {args.output}")
+  return 0 if all(row['estado'] != 'ERROR' for row in rows) else 1
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -4,10 +4,45 @@
 Utilidades para MinExt GUI
 """
 
+import csv
+import json
 import os
+import re
 import sys
 from pathlib import Path
 
+# Opciones de MiniZinc para la salida en JSON (x, f y _objective)
+JSON_OUTPUT_ARGS = ["--output-mode", "json", "--output-objective"]
+
+# Opciones de MiniZinc para que reporte sus estadísticas (ver profiler.py)
+STATISTICS_ARGS = ["--statistics"]
+
+# Margen (s) sobre el límite de búsqueda de MiniZinc para compilar y escribir
+# la salida antes de terminar el proceso
+PROCESS_MARGIN = 10.0
+
+def natural_sort_key(name):
+    """
+    Clave para ordenamiento natural (Prueba1, Prueba2, ..., Prueba10, ...)
+    name: nombre de archivo (str) o Path (se usa su nombre)
+    """
+    return [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', Path(name).name)]
+
+def write_results(rows, output_path, fields):
+    """
+    Escribe las filas como CSV o JSON según la extensión de output_path
+    fields: columnas del CSV, en orden
+    """
+    output_path = Path(output_path)
+    if output_path.suffix.lower() == '.json':
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+    else:
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
 def check_minizinc_installation():
     """
     Verifica si MiniZinc está instalado y disponible en el PATH
@@ -50,11 +85,66 @@ def get_project_paths():
     return {
         'project': project_dir,
         'model': project_dir / "Proyecto.mzn",
+        'flow_model': project_dir / "ProyectoFlujo.mzn",
+        'reduced_model': project_dir / "ProyectoReducido.mzn",
         'dzn_dir': project_dir / "DatosDZN",
         'datos_dir': project_dir / "DatosProyecto",
+        'cache_dir': project_dir / ".minext_cache",
+        'results_dir': project_dir / ".minext_results",
         'gui_dir': current_file.parent
     }
 
+def build_minizinc_command(model_file, dzn_file, solver="Gecode", time_limit_ms=60000, cache=None,
+                           extra_args=None, extra_models=None, json_output=False, statistics=False):
+    """
+    Construye la línea de comandos para resolver una instancia con MiniZinc
+    cache: FlatZincCache opcional; si se da, el modelo se compila una sola vez
+           y el comando entrega el .fzn cacheado directamente al solver (la
+           entrada queda reservada hasta release_minizinc_command)
+    extra_args: opciones adicionales del solver (p. ej. ["-f"] para búsqueda libre)
+    extra_models: fragmentos .mzn adicionales (p. ej. la cota de la heurística)
+    json_output: pedir x, f y el objetivo en JSON (se leen con solution.read_solution)
+    statistics: pedir las estadísticas de aplanamiento y de búsqueda (--statistics)
+    Returns: list con los argumentos para subprocess
+    """
+    # El modo de salida queda en el .ozn, así que con caché es opción de compilación
+    output_args = JSON_OUTPUT_ARGS if json_output else []
+    cmd = ["minizinc", "--solver", solver]
+    if time_limit_ms:
+        cmd += ["--time-limit", str(int(time_limit_ms))]
+    if statistics:
+        cmd += STATISTICS_ARGS
+    cmd += list(extra_args or [])
+    if cache is not None:
+        fzn_file, ozn_file = cache.compile(model_file, dzn_file, solver, compile_args=output_args,
+                                           extra_models=extra_models)
+        cmd += ["--ozn-file", str(ozn_file), str(fzn_file)]
+    else:
+        cmd += output_args
+        cmd += [str(model_file)] + [str(path) for path in extra_models or []] + [str(dzn_file)]
+    return cmd
+
+def release_minizinc_command(cmd, cache):
+    """
+    Libera la entrada de la caché que reservó build_minizinc_command para cmd
+    (el .fzn es el último argumento); sin caché no hace nada
+    """
+    if cache is not None:
+        cache.release(cmd[-1])
+
+def get_solution_status(output):
+    """
+    Determina el estado de la búsqueda a partir de los separadores de MiniZinc
+    Returns: str - OPTIMAL, SATISFIED, UNSATISFIABLE o UNKNOWN
+    """
+    if "=====UNSATISFIABLE=====" in output:
+        return "UNSATISFIABLE"
+    if "==========" in output:
+        return "OPTIMAL"
+    if "----------" in output:
+        return "SATISFIED"
+    return "UNKNOWN"
+
 def validate_dzn_file(file_path):
     """
     Valida que un archivo .dzn tenga la estructura esperada
@@ -81,6 +171,18 @@ def validate_dzn_file(file_path):
     except Exception as e:
         return False, [f"Error leyendo archivo: {str(e)}"]
 
+def parse_dzn_file(file_path):
+    """
+    Parsea un archivo .dzn generado por generate_dzn_file
+    Si junto al .dzn hay un .mxb (formato binario) igual o más reciente, se lee
+    ese y la matriz c queda mapeada en memoria; también acepta un .mxb directo
+    Returns: Instance con los mismos parámetros que parse_data_file
+             (n, m, p, ext, ce, c, ct, maxM) como arreglos NumPy
+    """
+    from instance import load_instance
+
+    return load_instance(file_path)
+
 def format_solution_output(raw_output):
     """
     Formatea la salida del solver para una mejor presentación
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Verificación independiente de soluciones MinExt
+Revisa una matriz x contra la instancia con las cinco restricciones de
+Proyecto.mzn y recalcula f, el extremismo total, el costo de la restricción 4
+(con el factor (1 + p[i]/n) y ce) y la distancia de la restricción 5, sin
+confiar en lo que reporte el motor. Las sumas son O(m²) sobre la matriz y el
+costo y la distancia se calculan solo sobre los movimientos activos, así que
+c no se recorre completa (ni se lee del disco si la instancia es un .mxb).
+"""
+
+import numpy as np
+
+from instance import Instance
+
+# Tolerancia relativa del costo frente a ct (el modelo suma floats)
+COST_TOL = 1e-9
+
+# Diferencia admitida entre el objetivo reportado y el recalculado (el texto
+# del modelo lo imprime con 3 decimales)
+OBJECTIVE_TOL = 5e-4
+
+# Nombre de cada restricción del modelo
+CONSTRAINTS = {
+  1: "conservación de población",
+  2: "sin movimientos a la misma opinión",
+  3: "distribución final",
+  4: "costo total",
+  5: "movimientos máximos"
+}
+
+class Verification:
+  """
+  Resultado de verificar una solución
+  f: distribución final recalculada (int64 m)
+  objective: extremismo total recalculado
+  cost: costo de la restricción 4
+  distance: sum(x[i,j] * |j - i|) de la restricción 5
+  moved: personas movidas; active: movimientos (i, j) activos
+  violations: lista de (restricción, mensaje); 0 = forma o dominio de x, y
+              el objetivo reportado que no coincide
+  """
+
+  def __init__(self, f, objective, cost, distance, moved, active, violations):
+    self.f = f
+    self.objective = objective
+    self.cost = cost
+    self.distance = distance
+    self.moved = moved
+    self.active = active
+    self.violations = violations
+
+  @property
+  def ok(self):
+    """True si la solución cumple todo"""
+    return not self.violations
+
+  def summary(self):
+    """
+    Returns: 'ok', o las violaciones separadas por '; '
+    """
+    if self.ok:
+      return 'ok'
+    return '; '.join(f"R{number} ({CONSTRAINTS[number]}): {message}" if number else message
+                     for number, message in self.violations)
+
+def verify(data, x, f=None, objective=None):
+  """
+  Verifica la solución x contra la instancia
+  data: Instance o dict como parse_data_file
+  f: distribución final reportada por el motor (opcional, se compara)
+  objective: extremismo total reportado (opcional, se compara)
+  Returns: Verification
+  """
+  inst = Instance.from_data(data)
+  m = inst.m
+  x = np.asarray(x)
+  if x.shape != (m, m):
+    return Verification(None, None, None, None, 0, 0,
+                        [(0, f"x tiene forma {x.shape} y la instancia {(m, m)}")])
+  violations = []
+  if x.dtype.kind == 'f' and not np.array_equal(x, np.round(x)):
+    violations.append((0, "x tiene valores no enteros"))
+  x = x.astype(np.int64, copy=False)
+  if x.min(initial=0) < 0:
+    violations.append((0, f"{int(np.count_nonzero(x < 0))} valores negativos en x"))
+
+  out = x.sum(axis=1)
+  into = x.sum(axis=0)
+  over = np.flatnonzero(out > inst.p)
+  if len(over):
+    i = int(over[0])
+    violations.append((1, f"{len(over)} opiniones mueven más personas de las que tienen "
+                          f"(opinión {i + 1}: {int(out[i])} > {int(inst.p[i])})"))
+  diagonal = np.flatnonzero(np.diagonal(x))
+  if len(diagonal):
+    violations.append((2, f"x[i,i] > 0 en {len(diagonal)} opiniones (opinión {int(diagonal[0]) + 1})"))
+
+  final = inst.p + into - out
+  if f is not None:
+    f = np.asarray(f)
+    if f.shape != final.shape or not np.array_equal(f, final):
+      differ = len(final) if f.shape != final.shape else int(np.count_nonzero(f != final))
+      violations.append((3, f"f reportada no coincide con p + entradas - salidas en {differ} opiniones"))
+  if final.min(initial=0) < 0 or final.max(initial=0) > inst.n:
+    violations.append((3, "f fuera de 0..n"))
+
+  # Costo y distancia solo sobre los movimientos activos
+  rows, cols = np.nonzero(x)
+  amounts = x[rows, cols].astype(np.float64)
+  extra = np.where(inst.p == 0, inst.ce, 0.0)
+  unit = inst.c[rows, cols] * (1.0 + inst.p[rows] / inst.n) + extra[cols]
+  cost = float(amounts @ unit)
+  distance = int(x[rows, cols] @ np.abs(cols - rows))
+  if cost > inst.ct + COST_TOL * max(1.0, abs(inst.ct)):
+    violations.append((4, f"costo {cost:.6g} > ct {inst.ct:.6g}"))
+  if distance > inst.maxM:
+    violations.append((5, f"distancia {distance} > maxM {inst.maxM}"))
+
+  value = float(final @ inst.ext)
+  if objective is not None and abs(objective - value) > OBJECTIVE_TOL * max(1.0, abs(value)):
+    violations.append((0, f"objetivo reportado {objective:.6g} y recalculado {value:.6g}"))
+
+  return Verification(final, value, cost, distance, int(out.sum()), len(rows), violations)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vistas virtualizadas para soluciones e instancias grandes
+Con m en los cientos una solución tiene decenas de miles de movimientos y la
+matriz de costos m² celdas; insertarlas de una vez en un Text o un Treeview
+congela el bucle de Tk. Las tablas de este módulo guardan las columnas como
+arreglos NumPy, ordenan sobre los arreglos y solo formatean e insertan la
+página visible, por lotes programados con after() para que la ventana siga
+respondiendo. Los textos largos (salida completa, archivo de datos) se insertan
+por bloques de la misma forma.
+"""
+
+import codecs
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+from instance import Instance
+
+# Filas por página de una tabla
+PAGE_SIZE = 1000
+
+# Filas que se insertan en cada llamada programada con after()
+BATCH_ROWS = 200
+
+# Caracteres que se insertan en cada llamada en un Text
+TEXT_CHUNK = 1 << 16
+
+# Bytes del archivo de datos que se cargan de una vez en la pestaña de entrada
+FILE_CHUNK = 1 << 18
+
+# Líneas de movimientos y de distribución del texto de "Mejor Solución" (el
+# resto se ve en las tablas)
+TEXT_LINES = 200
+
+class ArraySource:
+  """
+  Filas de una tabla como columnas NumPy del mismo largo
+  columns: dict clave -> arreglo
+  """
+
+  def __init__(self, columns):
+    self.columns = {key: np.asarray(values) for key, values in columns.items()}
+    self.size = len(next(iter(self.columns.values()))) if self.columns else 0
+
+  def __len__(self):
+    return self.size
+
+  def values(self, key, rows=None):
+    """
+    Returns: la columna key completa, o solo las filas rows
+    """
+    column = self.columns[key]
+    return column if rows is None else column[rows]
+
+class MatrixSource:
+  """
+  Matriz de costos de una instancia como tabla (una fila por par i != j, por
+  filas de c): origen, destino, distancia, c y costo unitario de la
+  restricción 4. Las filas se calculan al mostrarlas; una columna completa
+  solo se arma al ordenar por ella
+  """
+
+  def __init__(self, data):
+    self.data = data
+    self.inst = Instance.from_data(data)
+    self.m = self.inst.m
+    self._unit = None
+
+  def __len__(self):
+    return self.m * (self.m - 1)
+
+  def _pairs(self, rows):
+    """Origen y destino de cada fila (la diagonal se salta)"""
+    i, k = np.divmod(np.asarray(rows, dtype=np.int64), max(self.m - 1, 1))
+    return i, k + (k >= i)
+
+  def values(self, key, rows=None):
+    """
+    Returns: la columna key completa, o solo las filas rows
+    """
+    if rows is None:
+      rows = np.arange(len(self))
+    i, j = self._pairs(rows)
+    if key == 'origen':
+      return i + 1
+    if key == 'destino':
+      return j + 1
+    if key == 'distancia':
+      return np.abs(j - i)
+    if key == 'c':
+      return self.inst.c[i, j]
+    if len(rows) == len(self) and self._unit is None:
+      self._unit = self.inst.move_costs()
+    if self._unit is not None:
+      return self._unit[i, j]
+    extra = np.where(self.inst.p[j] == 0, self.inst.ce[j], 0.0)
+    return self.inst.c[i, j] * (1.0 + self.inst.p[i] / self.inst.n) + extra
+
+def moves_source(solution, data):
+  """
+  Movimientos activos de una solución: origen, destino, personas, distancia,
+  costo unitario y costo total (restricción 4)
+  Returns: ArraySource
+  """
+  inst = Instance.from_data(data)
+  moves = solution.moves()
+  i, j, amount = moves[:, 0], moves[:, 1], moves[:, 2]
+  extra = np.where(inst.p == 0, inst.ce, 0.0)
+  unit = inst.c[i, j] * (1.0 + inst.p[i] / inst.n) + extra[j]
+  return ArraySource({'origen': i + 1, 'destino': j + 1, 'personas': amount,
+                      'distancia': np.abs(j - i), 'unitario': unit, 'costo': amount * unit})
+
+def distribution_source(solution, data):
+  """
+  Distribución final por opinión: personas iniciales y finales, cambio,
+  extremismo de la opinión y su aporte al total
+  Returns: ArraySource
+  """
+  inst = Instance.from_data(data)
+  return ArraySource({'opinion': np.arange(1, inst.m + 1), 'inicial': inst.p, 'final': solution.f,
+                      'cambio': solution.f - inst.p, 'ext': inst.ext, 'aporte': solution.f * inst.ext})
+
+# Columnas de cada tabla: (clave, título, ancho, formato)
+MOVE_COLUMNS = [('origen', "Origen", 80, 'd'), ('destino', "Destino", 80, 'd'),
+                ('personas', "Personas", 90, 'd'), ('distancia', "Distancia", 90, 'd'),
+                ('unitario', "Costo unitario", 120, '.3f'), ('costo', "Costo", 110, '.3f')]
+DISTRIBUTION_COLUMNS = [('opinion', "Opinión", 80, 'd'), ('inicial', "Inicial", 90, 'd'),
+                        ('final', "Final", 90, 'd'), ('cambio', "Cambio", 90, '+d'),
+                        ('ext', "Extremismo", 110, '.3f'), ('aporte', "Aporte", 110, '.3f')]
+MATRIX_COLUMNS = [('origen', "Origen", 80, 'd'), ('destino', "Destino", 80, 'd'),
+                  ('distancia', "Distancia", 90, 'd'), ('c', "c[i,j]", 110, '.3f'),
+                  ('unitario', "Costo unitario (R4)", 150, '.3f')]
+
+class LazyTable:
+  """
+  Tabla paginada sobre un ttk.Treeview: clic en un encabezado ordena todas las
+  filas por esa columna (otro clic invierte el orden) y solo la página actual
+  se formatea e inserta, por lotes con after()
+  columns: lista de (clave, título, ancho, formato) como MOVE_COLUMNS
+  """
+
+  def __init__(self, parent, columns, page_size=PAGE_SIZE, batch_rows=BATCH_ROWS):
+    self.columns = columns
+    self.page_size = page_size
+    self.batch_rows = batch_rows
+    self.source = None
+    self.order = None
+    self.sort_key = None
+    self.descending = False
+    self.page = 0
+    # Cada recarga invalida los lotes pendientes de la anterior
+    self._generation = 0
+
+    self.frame = ttk.Frame(parent)
+    self.frame.columnconfigure(0, weight=1)
+    self.frame.rowconfigure(0, weight=1)
+    keys = [key for key, _, _, _ in columns]
+    self.tree = ttk.Treeview(self.frame, columns=keys, show="headings")
+    for key, title, width, _ in columns:
+      self.tree.heading(key, text=title, command=lambda key=key: self.sort(key))
+      self.tree.column(key, width=width, anchor=tk.E)
+    self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
+    scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+    self.tree.configure(yscrollcommand=scrollbar.set)
+
+    pager = ttk.Frame(self.frame)
+    pager.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+    self.previous_button = ttk.Button(pager, text="◀ Anterior", command=lambda: self.show_page(self.page - 1))
+    self.previous_button.pack(side=tk.LEFT, padx=(0, 5))
+    self.next_button = ttk.Button(pager, text="Siguiente ▶", command=lambda: self.show_page(self.page + 1))
+    self.next_button.pack(side=tk.LEFT, padx=(0, 10))
+    self.page_label = ttk.Label(pager, text="Sin datos")
+    self.page_label.pack(side=tk.LEFT)
+
+  def grid(self, **options):
+    """Ubica la tabla (con su barra de desplazamiento y su paginación)"""
+    self.frame.grid(**options)
+
+  def pages(self):
+    """Número de páginas del contenido actual"""
+    if self.source is None:
+      return 0
+    return max(1, -(-len(self.source) // self.page_size))
+
+  def set_source(self, source):
+    """
+    Reemplaza el contenido por source (ArraySource, MatrixSource o None) y
+    muestra la primera página conservando la columna de orden
+    """
+    self.source = source
+    self.order = None
+    if source is not None and self.sort_key is not None:
+      self._sort_rows()
+    self.show_page(0)
+
+  def clear(self):
+    """Vacía la tabla"""
+    self.set_source(None)
+
+  def sort(self, key):
+    """Ordena por key (de nuevo sobre la misma columna invierte el orden)"""
+    self.descending = not self.descending if key == self.sort_key else False
+    self.sort_key = key
+    for column, title, _, _ in self.columns:
+      arrow = (" ▼" if self.descending else " ▲") if column == key else ""
+      self.tree.heading(column, text=title + arrow)
+    if self.source is not None:
+      self._sort_rows()
+      self.show_page(0)
+
+  def _sort_rows(self):
+    """Permutación de todas las filas según la columna de orden (estable)"""
+    values = self.source.values(self.sort_key)
+    self.order = np.argsort(-values if self.descending else values, kind='stable')
+
+  def show_page(self, page):
+    """Muestra la página page (desde 0); las filas llegan por lotes"""
+    self._generation += 1
+    self.tree.delete(*self.tree.get_children())
+    total = len(self.source) if self.source is not None else 0
+    self.page = min(max(page, 0), max(self.pages() - 1, 0))
+    start = self.page * self.page_size
+    end = min(start + self.page_size, total)
+    self.previous_button.config(state="normal" if self.page > 0 else "disabled")
+    self.next_button.config(state="normal" if end < total else "disabled")
+    if total == 0:
+      self.page_label.config(text="Sin datos" if self.source is None else "Sin filas")
+      return
+    self.page_label.config(text=f"Filas {start + 1}-{end} de {total} "
+                                f"(página {self.page + 1} de {self.pages()})")
+    rows = np.arange(start, end) if self.order is None else self.order[start:end]
+    self.tree.after(0, self._insert_batch, self._generation, rows, 0)
+
+  def _insert_batch(self, generation, rows, first):
+    """Formatea e inserta un lote de filas y programa el siguiente"""
+    if generation != self._generation:
+      return
+    batch = rows[first:first + self.batch_rows]
+    columns = [[format(value, spec) for value in self.source.values(key, batch).tolist()]
+               for key, _, _, spec in self.columns]
+    for values in zip(*columns):
+      self.tree.insert('', tk.END, values=values)
+    if first + self.batch_rows < len(rows):
+      self.tree.after(1, self._insert_batch, generation, rows, first + self.batch_rows)
+
+class BatchedText:
+  """
+  Inserta texto largo en un Text por bloques de TEXT_CHUNK caracteres con
+  after(), para no congelar la ventana con salidas de varios MB
+  """
+
+  def __init__(self, widget, chunk=TEXT_CHUNK):
+    self.widget = widget
+    self.chunk = chunk
+    self._generation = 0
+
+  def set(self, text):
+    """Reemplaza el contenido por text"""
+    self.clear()
+    self.append(text)
+
+  def append(self, text):
+    """Agrega text al final, en bloques"""
+    if len(text) <= self.chunk:
+      self.widget.insert(tk.END, text)
+      return
+    self.widget.after(0, self._insert_chunk, self._generation, text, 0)
+
+  def clear(self):
+    """Vacía el texto y descarta los bloques pendientes"""
+    self._generation += 1
+    self.widget.delete(1.0, tk.END)
+
+  def _insert_chunk(self, generation, text, start):
+    """Inserta un bloque y programa el siguiente"""
+    if generation != self._generation:
+      return
+    self.widget.insert(tk.END, text[start:start + self.chunk])
+    if start + self.chunk < len(text):
+      self.widget.after(1, self._insert_chunk, generation, text, start + self.chunk)
+
+class FileReader:
+  """
+  Lectura incremental de un archivo de texto (UTF-8) por bloques de
+  FILE_CHUNK bytes, para mostrar un .dzn grande sin cargarlo completo
+  """
+
+  def __init__(self, path, chunk=FILE_CHUNK):
+    self.path = path
+    self.chunk = chunk
+    self.offset = 0
+    self.size = path.stat().st_size
+    self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+  @property
+  def done(self):
+    """True si ya se leyó todo el archivo"""
+    return self.offset >= self.size
+
+  def read(self):
+    """
+    Returns: el texto del siguiente bloque ('' al final)
+    """
+    with open(self.path, 'rb') as f:
+      f.seek(self.offset)
+      block = f.read(self.chunk)
+    self.offset += len(block)
+    return self._decoder.decode(block, final=self.done)
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Configuración de pytest: los módulos de ProyectoGUIFuentes se importan como en
+la interfaz (por nombre, desde su carpeta)
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "ProyectoGUIFuentes"))
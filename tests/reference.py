@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Referencias para las pruebas: el óptimo de una instancia por programación
+entera mixta (scipy.optimize.milp, HiGHS) sobre la misma formulación de
+Proyecto.mzn, e instancias aleatorias chicas reproducibles
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from instance import Instance
+
+# Carpeta con las instancias del proyecto
+DZN_DIR = Path(__file__).resolve().parent.parent / "DatosDZN"
+
+# Diferencia admitida entre objetivos (los motores suman floats)
+OBJECTIVE_TOL = 1e-6
+
+def milp_optimum(data, distances=None, upper=None, fixed=0.0):
+  """
+  Extremismo total óptimo de la instancia con x[i,j] entera, i != j
+  distances, upper, fixed: distancias, cota de cada par (0 = prohibido) y
+                           extremismo fijo de una instancia reducida (como
+                           ProyectoReducido.mzn); por defecto |j - i|, p[i] y 0
+  Returns: float
+  """
+  optimize = pytest.importorskip("scipy.optimize")
+  inst = Instance.from_data(data)
+  m = inst.m
+  base = fixed + float(inst.p @ inst.ext)
+  if distances is None:
+    distances = inst.distances()
+  if upper is None:
+    upper = np.where(np.eye(m, dtype=bool), 0, inst.p[:, None] + np.zeros((m, m), dtype=np.int64))
+  rows, cols = np.nonzero(upper > 0)
+  if len(rows) == 0:
+    return base
+  gains = inst.gains()[rows, cols]
+  units = inst.move_costs()[rows, cols]
+  supply = np.zeros((m, len(rows)))
+  supply[rows, np.arange(len(rows))] = 1.0
+  constraints = [optimize.LinearConstraint(supply, -np.inf, inst.p),
+                 optimize.LinearConstraint(units[None, :], -np.inf, inst.ct),
+                 optimize.LinearConstraint(distances[rows, cols][None, :], -np.inf, inst.maxM)]
+  result = optimize.milp(-gains, constraints=constraints, integrality=np.ones(len(rows)),
+                         bounds=optimize.Bounds(0, upper[rows, cols]),
+                         options={'mip_rel_gap': 0.0})
+  assert result.success, result.message
+  return base + float(result.fun)
+
+def random_instance(seed, m_max=8, p_max=4):
+  """
+  Instancia aleatoria chica (m entre 2 y m_max, presupuestos ajustados)
+  Returns: dict como parse_data_file
+  """
+  rng = np.random.default_rng(seed)
+  m = int(rng.integers(2, m_max + 1))
+  p = rng.integers(0, p_max + 1, m)
+  c = np.round(rng.random((m, m)) * 2, 2)
+  np.fill_diagonal(c, 0.0)
+  return {
+    'n': max(int(p.sum()), 1),
+    'm': m,
+    'p': p.tolist(),
+    'ext': np.round(rng.random(m), 3).tolist(),
+    'ce': np.round(rng.random(m) * 2, 2).tolist(),
+    'c': c.tolist(),
+    'ct': float(np.round(rng.random() * 3, 2)),
+    'maxM': int(rng.integers(0, 12))
+  }
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del motor exacto por programación dinámica (dp_solver.py)"""
+
+import threading
+
+import pytest
+
+import dp_solver
+import flow_solver
+from generator import generate_instance
+from reference import DZN_DIR, milp_optimum, random_instance, OBJECTIVE_TOL
+from utils import parse_dzn_file
+from verifier import verify
+
+# Instancias del proyecto con maxM pequeño (la programación dinámica termina
+# en menos de un segundo)
+SMALL_MAXM = 120
+
+# Holgura sobre time_limit (el tiempo se revisa entre bloques de estados)
+TIME_MARGIN = 0.5
+
+def small_maxm_files():
+  return [path for path in sorted(DZN_DIR.glob("*.dzn")) if parse_dzn_file(path).maxM <= SMALL_MAXM]
+
+def check_optimal(data):
+  result = dp_solver.solve(data)
+  check = verify(data, result['x'], result['f'], result['extremismo_total'])
+  assert check.ok, check.summary()
+  assert result['status'] == 'OPTIMAL'
+  assert result['extremismo_total'] == pytest.approx(milp_optimum(data), abs=OBJECTIVE_TOL)
+  assert result['bound'] <= result['extremismo_total'] + OBJECTIVE_TOL
+
+@pytest.mark.parametrize("path", small_maxm_files(), ids=lambda path: path.stem)
+def test_project_instances(path):
+  check_optimal(parse_dzn_file(path))
+
+@pytest.mark.parametrize("seed", range(0, 600, 5))
+def test_random_instances(seed):
+  check_optimal(random_instance(seed))
+
+def test_without_flow_oracle(monkeypatch):
+  def broken(data):
+    raise ValueError("flujo no disponible")
+  monkeypatch.setattr(flow_solver, 'solve', broken)
+  for seed in range(0, 100, 10):
+    check_optimal(random_instance(seed))
+
+def check_feasible(data, result):
+  check = verify(data, result['x'], result['f'], result['extremismo_total'])
+  assert check.ok, check.summary()
+  assert result['bound'] <= result['extremismo_total'] + OBJECTIVE_TOL
+
+def test_time_limit_inside_stages():
+  # Prueba30 (maxM=339) necesita decenas de millones de estados
+  data = parse_dzn_file(DZN_DIR / "Prueba30.dzn")
+  result = dp_solver.solve(data, time_limit=1)
+  assert result['time'] <= 1 + TIME_MARGIN
+  assert result['status'] == 'SATISFIED' and not result['fallback']
+  check_feasible(data, result)
+
+def test_large_maxm_falls_back_to_flow(tmp_path):
+  info = generate_instance(tmp_path, "grande", 200, seed=3, resources='tight', formats=('dzn',))
+  data = parse_dzn_file(info['archivos']['dzn'])
+  assert data.maxM > 2000
+  result = dp_solver.solve(data, time_limit=2)
+  assert result['time'] <= 2 + TIME_MARGIN
+  assert result['fallback']
+  check_feasible(data, result)
+
+def test_option_tables_respect_state_limit():
+  # Prueba20: unos 8 mil estados estimados y 17 mil celdas de opciones
+  data = parse_dzn_file(DZN_DIR / "Prueba20.dzn")
+  assert dp_solver.estimated_states(dp_solver.Instance.from_data(data)) <= 10000
+  result = dp_solver.solve(data, state_limit=10000)
+  assert result['fallback']
+  check_feasible(data, result)
+
+def test_stop_event():
+  data = parse_dzn_file(DZN_DIR / "Prueba30.dzn")
+  stop = threading.Event()
+  stop.set()
+  result = dp_solver.solve(data, stop_event=stop)
+  assert result['time'] <= TIME_MARGIN
+  check_feasible(data, result)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del motor de flujo lagrangiano (flow_solver.py)"""
+
+import pytest
+
+import flow_solver
+from reference import milp_optimum, random_instance, OBJECTIVE_TOL
+from verifier import verify
+
+# Instancias en las que el flujo redondeado hacia abajo excedía ct o maxM y
+# fill devolvía un arreglo en vez de un flujo (ValueError en record)
+ROUNDING_CASES = [
+  {'n': 8, 'm': 4, 'p': [3, 1, 0, 4], 'ext': [0.092, 0.296, 0.072, 0.941],
+   'ce': [1.65, 0.99, 0.31, 0.37],
+   'c': [[0.0, 0.33, 0.13, 1.61], [0.36, 0.0, 0.23, 1.32], [1.77, 1.45, 0.0, 0.17],
+         [0.49, 1.29, 1.35, 0.0]],
+   'ct': 2.29, 'maxM': 3},
+  {'n': 9, 'm': 6, 'p': [0, 0, 2, 2, 2, 3], 'ext': [0.959, 0.064, 0.37, 0.781, 0.924, 0.154],
+   'ce': [0.73, 1.4, 1.32, 1.53, 1.19, 0.98],
+   'c': [[0.0, 1.04, 0.16, 0.23, 1.28, 0.95], [1.7, 0.0, 0.84, 0.17, 1.95, 1.73],
+         [1.45, 1.1, 0.0, 0.92, 1.62, 0.02], [1.37, 0.94, 0.49, 0.0, 1.36, 1.0],
+         [1.75, 1.15, 0.8, 0.47, 0.0, 1.8], [0.77, 1.08, 0.77, 0.87, 0.07, 0.0]],
+   'ct': 0.56, 'maxM': 3}
+]
+
+@pytest.mark.parametrize("data", ROUNDING_CASES)
+def test_rounding_over_budget(data):
+  result = flow_solver.solve(data)
+  check = verify(data, result['x'], result['f'], result['extremismo_total'])
+  assert check.ok, check.summary()
+  optimum = milp_optimum(data)
+  assert result['bound'] <= optimum + OBJECTIVE_TOL <= result['extremismo_total'] + 2 * OBJECTIVE_TOL
+
+@pytest.mark.parametrize("seed", range(0, 1200, 7))
+def test_random_feasible_and_bounded(seed):
+  data = random_instance(seed)
+  result = flow_solver.solve(data)
+  check = verify(data, result['x'], result['f'], result['extremismo_total'])
+  assert check.ok, check.summary()
+  optimum = milp_optimum(data)
+  assert result['bound'] <= optimum + OBJECTIVE_TOL
+  assert result['extremismo_total'] >= optimum - OBJECTIVE_TOL
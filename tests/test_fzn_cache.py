@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la caché de FlatZinc (fzn_cache.py), con un "minizinc -c" simulado"""
+
+import subprocess
+
+import pytest
+
+import fzn_cache
+import heuristic
+import flow_solver
+from fzn_cache import FlatZincCache, FZN_NAME
+from reference import DZN_DIR
+
+MODEL = DZN_DIR.parent / "Proyecto.mzn"
+
+FLATZINC = "var float: X_INTRODUCED_7;\nsolve  minimize X_INTRODUCED_7;\n"
+
+@pytest.fixture
+def compiles(monkeypatch):
+  """Reemplaza la compilación por una que escribe un FlatZinc fijo y la cuenta"""
+  calls = []
+  def run(cmd, **kwargs):
+    calls.append(cmd)
+    with open(cmd[cmd.index('--fzn') + 1], 'w', encoding='utf-8') as f:
+      f.write(FLATZINC + "% " + "x" * 4096 + "\n")
+    with open(cmd[cmd.index('--ozn') + 1], 'w', encoding='utf-8') as f:
+      f.write("{}")
+    return subprocess.CompletedProcess(cmd, 0, "", "")
+  monkeypatch.setattr(fzn_cache.subprocess, 'run', run)
+  return calls
+
+def make_cache(tmp_path, **limits):
+  cache = FlatZincCache(tmp_path / "cache", **limits)
+  cache._minizinc_version = "prueba"
+  return cache
+
+def test_oversized_entry_is_returned(tmp_path, compiles):
+  cache = make_cache(tmp_path, max_bytes=1)
+  fzn, ozn = cache.compile(MODEL, DZN_DIR / "enunciado.dzn")
+  assert fzn.exists() and ozn.exists()
+  cache.release(fzn)
+
+def test_reserved_entries_survive_eviction(tmp_path, compiles):
+  cache = make_cache(tmp_path, max_entries=1)
+  first, _ = cache.compile(MODEL, DZN_DIR / "enunciado.dzn")
+  second, _ = cache.compile(MODEL, DZN_DIR / "Prueba1.dzn")
+  assert first.exists() and second.exists()
+  cache.release(first)
+  assert cache.evict() == 1
+  assert not first.exists() and second.exists()
+  cache.release(second)
+
+def test_bounds_stay_out_of_the_key(tmp_path, compiles):
+  cache = make_cache(tmp_path)
+  dzn = DZN_DIR / "enunciado.dzn"
+  paths = []
+  for objective in (12.5, 9.25):
+    bounds = [heuristic.write_bound_model(objective, tmp_path / f"h{objective}.mzn"),
+              flow_solver.write_bound_model(1.0, tmp_path / f"f{objective}.mzn")]
+    fzn, _ = cache.compile(MODEL, dzn, extra_models=bounds)
+    paths.append(fzn)
+    text = fzn.read_text(encoding='utf-8')
+    assert text.index("float_le(X_INTRODUCED_7, ") < text.index("solve")
+    assert text.index(", X_INTRODUCED_7);") < text.index("solve")
+  assert len(compiles) == 1 and (cache.hits, cache.misses) == (1, 1)
+  assert paths[0] != paths[1] and paths[0].parent == paths[1].parent
+  for fzn in paths:
+    cache.release(fzn)
+    assert not fzn.exists()
+  assert (paths[0].parent / FZN_NAME).exists()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del motor nativo (native_solver.py)"""
+
+import json
+import math
+from pathlib import Path
+
+import pytest
+
+import native_solver
+from reference import DZN_DIR, OBJECTIVE_TOL
+from utils import parse_dzn_file
+from verifier import verify
+
+OPTIMA = json.loads((Path(__file__).parent / "optima.json").read_text(encoding='utf-8'))
+
+def failing_lp(monkeypatch, every):
+  """Hace que una de cada every relajaciones no converja"""
+  original = native_solver.lp_relaxation
+  calls = [0]
+  def lp_relaxation(*args, **kwargs):
+    calls[0] += 1
+    return None if calls[0] % every == 0 else original(*args, **kwargs)
+  monkeypatch.setattr(native_solver, 'lp_relaxation', lp_relaxation)
+
+@pytest.mark.parametrize("name", ["Prueba11.dzn", "Prueba15.dzn", "Prueba24.dzn"])
+def test_unresolved_nodes_are_not_optimal(monkeypatch, name):
+  failing_lp(monkeypatch, 3)
+  data = parse_dzn_file(DZN_DIR / name)
+  result = native_solver.solve(data)
+  assert verify(data, result['x'], result['f'], result['extremismo_total']).ok
+  assert result['status'] == 'SATISFIED'
+  assert math.isfinite(result['bound'])
+  assert result['bound'] <= OPTIMA[name] + OBJECTIVE_TOL <= result['extremismo_total'] + 2 * OBJECTIVE_TOL
+
+def test_unresolved_root(monkeypatch):
+  failing_lp(monkeypatch, 1)
+  data = parse_dzn_file(DZN_DIR / "enunciado.dzn")
+  result = native_solver.solve(data)
+  assert result['status'] == 'SATISFIED'
+  assert math.isfinite(result['bound'])
+  assert result['bound'] <= OPTIMA["enunciado.dzn"] + OBJECTIVE_TOL
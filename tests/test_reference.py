@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Motores contra el óptimo de referencia: los óptimos guardados en optima.json
+(calculados con reference.milp_optimum) para cada instancia de DatosDZN/ y
+los casos borde ct = 0, maxM = 0 y sin población
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import dp_solver
+import flow_solver
+import heuristic
+import native_solver
+from presolve import presolve
+from reference import DZN_DIR, milp_optimum, OBJECTIVE_TOL
+from utils import parse_dzn_file
+from verifier import verify
+
+# Óptimo de cada instancia de DatosDZN/
+OPTIMA = json.loads((Path(__file__).parent / "optima.json").read_text(encoding='utf-8'))
+
+FILES = sorted(DZN_DIR.glob("*.dzn"))
+
+def edge_cases():
+  """enunciado.dzn con ct = 0, con maxM = 0 y con p = 0"""
+  data = parse_dzn_file(DZN_DIR / "enunciado.dzn").to_dict()
+  return {
+    'ct=0': dict(data, ct=0.0),
+    'maxM=0': dict(data, maxM=0),
+    'p=0': dict(data, p=[0] * data['m'])
+  }
+
+EDGES = edge_cases()
+
+# (datos, óptimo guardado) de las instancias del proyecto y los casos borde
+# (None: se calcula con el MILP)
+CASES = ([pytest.param(parse_dzn_file(path), OPTIMA.get(path.name), id=path.stem) for path in FILES] +
+         [pytest.param(data, None, id=name) for name, data in EDGES.items()])
+
+def reference(data, optimum):
+  """Óptimo de referencia: el guardado, o el del MILP en los casos borde"""
+  return optimum if optimum is not None else milp_optimum(data)
+
+def assert_feasible(data, result):
+  check = verify(data, result['x'], result['f'], result['extremismo_total'])
+  assert check.ok, check.summary()
+
+def test_optima_cover_every_file():
+  assert sorted(OPTIMA) == sorted(path.name for path in FILES)
+
+@pytest.mark.parametrize("path", FILES, ids=lambda path: path.stem)
+def test_stored_optimum(path):
+  assert milp_optimum(parse_dzn_file(path)) == pytest.approx(OPTIMA[path.name], abs=OBJECTIVE_TOL)
+
+def test_edge_values():
+  data = EDGES['maxM=0']
+  assert milp_optimum(data) == pytest.approx(float(np.dot(data['p'], data['ext'])))
+  assert milp_optimum(EDGES['p=0']) == 0.0
+
+@pytest.mark.parametrize("data, optimum", CASES)
+def test_native(data, optimum):
+  optimum = reference(data, optimum)
+  result = native_solver.solve(data)
+  assert_feasible(data, result)
+  assert result['status'] == 'OPTIMAL'
+  assert result['extremismo_total'] == pytest.approx(optimum, abs=OBJECTIVE_TOL)
+  assert result['bound'] <= result['extremismo_total'] + OBJECTIVE_TOL
+
+@pytest.mark.parametrize("data, optimum", CASES)
+def test_flow(data, optimum):
+  optimum = reference(data, optimum)
+  result = flow_solver.solve(data)
+  assert_feasible(data, result)
+  assert result['bound'] <= optimum + OBJECTIVE_TOL
+  assert result['extremismo_total'] >= optimum - OBJECTIVE_TOL
+
+@pytest.mark.parametrize("data, optimum", CASES)
+def test_heuristic(data, optimum):
+  optimum = reference(data, optimum)
+  result = heuristic.solve(data, time_limit=0.2)
+  assert_feasible(data, result)
+  assert result['extremismo_total'] >= optimum - OBJECTIVE_TOL
+
+@pytest.mark.parametrize("name", sorted(EDGES))
+def test_dp_edges(name):
+  data = EDGES[name]
+  result = dp_solver.solve(data)
+  assert_feasible(data, result)
+  assert result['extremismo_total'] == pytest.approx(milp_optimum(data), abs=OBJECTIVE_TOL)
+
+@pytest.mark.parametrize("data, optimum", CASES)
+def test_presolve_keeps_optimum(data, optimum):
+  optimum = reference(data, optimum)
+  reduction = presolve(data)
+  if reduction.reduced is None:
+    assert reduction.fixed == pytest.approx(optimum, abs=OBJECTIVE_TOL)
+    return
+  reduced = milp_optimum(reduction.reduced, reduction.distances, reduction.bounds, reduction.fixed)
+  assert reduced == pytest.approx(optimum, abs=OBJECTIVE_TOL)
+
+@pytest.mark.parametrize("data, optimum", CASES)
+def test_verifier(data, optimum):
+  optimum = reference(data, optimum)
+  result = native_solver.solve(data)
+  check = verify(data, result['x'], result['f'], result['extremismo_total'])
+  assert check.ok
+  assert check.objective == pytest.approx(optimum, abs=OBJECTIVE_TOL)
+  assert check.distance <= data['maxM'] and check.cost <= data['ct'] + 1e-9
+
+def test_verifier_reports_violations():
+  data = parse_dzn_file(DZN_DIR / "enunciado.dzn")
+  m = data.m
+  x = np.zeros((m, m), dtype=np.int64)
+  x[0, 0] = 1
+  assert [number for number, _ in verify(data, x).violations] == [2]
+  x = np.zeros((m, m), dtype=np.int64)
+  x[0, m - 1] = data.p[0] + 1
+  numbers = {number for number, _ in verify(data, x).violations}
+  assert 1 in numbers and 5 in numbers
+  x = np.zeros((m, m), dtype=np.int64)
+  assert [number for number, _ in verify(data, x, objective=-1.0).violations] == [0]